@@ -1,268 +1,157 @@
 import os
-import sqlite3
-from flask import Flask, render_template, request, flash, send_file, session
-from fpdf import FPDF
-from datetime import datetime
+import click
+from flask import Flask, render_template, request, flash, send_file, session, redirect, url_for, jsonify, Response, stream_with_context
+import io
+import itertools
+import tempfile
 from werkzeug.security import generate_password_hash, check_password_hash
 from file_processor import FileProcessor
+from image_processor import IMAGE_EXTENSIONS
+from config import Config
+from database import Database
+from migrations import migrate
+from calculation_store import CalculationStore, WriteBehindWriter
+from jobs import JobQueue, JOB_DONE, JOB_ERROR, save_upload
+from rules_backfill import RulesBackfill
+from pension_calculator import calculate_greek_pension
+from pension_batch import calculate_pension_batch, read_batch_profiles, write_batch_csv
+from pension_scenarios import run_scenarios
+from csv_import import import_template_csv
+from json_import import iter_json_records, iter_profiles, iter_ndjson_results, profile_from_record
+from report_cache import ReportCache, report_key
+from pdf_report import create_pdf_report, report_renderer
+from backends import capabilities
+from metrics import metrics
 
 app = Flask(__name__)
 app.config['SECRET_KEY'] = 'your-secret-key-here-change-in-production'
-app.config['DATABASE'] = 'pension_calculator.db'
-app.config['UPLOAD_FOLDER'] = 'uploads'
-app.config['MAX_CONTENT_LENGTH'] = 16 * 1024 * 1024
+app.config['DATABASE_URL'] = Config.DATABASE_URL
+app.config['UPLOAD_FOLDER'] = Config.JOB_UPLOAD_FOLDER
+app.config['MAX_CONTENT_LENGTH'] = Config.MAX_UPLOAD_MB * 1024 * 1024
 
-os.makedirs('static/results', exist_ok=True)
-os.makedirs('uploads', exist_ok=True)
+db = Database(app.config['DATABASE_URL'])
+# Η ουρά εργασιών μένει πάντα σε τοπικό SQLite (το ίδιο αρχείο, όταν η βάση είναι SQLite)
+app.config['DATABASE'] = db.sqlite_path or 'pension_calculator.db'
+calculation_store = CalculationStore(db, storage=Config.CALCULATION_STORAGE)
+calculation_writer = WriteBehindWriter(
+    calculation_store,
+    max_batch=Config.CALCULATION_FLUSH_SIZE,
+    flush_interval=Config.CALCULATION_FLUSH_INTERVAL
+) if Config.CALCULATION_WRITE_BEHIND else None
 
-def get_db_connection():
-    conn = sqlite3.connect(app.config['DATABASE'])
-    conn.row_factory = sqlite3.Row
-    return conn
+os.makedirs(app.config['UPLOAD_FOLDER'], exist_ok=True)
+
+job_queue = JobQueue(app.config['DATABASE'], max_workers=Config.JOB_WORKERS,
+                     stale_after=Config.JOB_STALE_SECONDS)
+rules_backfill = RulesBackfill(
+    db,
+    chunk_size=Config.RULES_BACKFILL_CHUNK_SIZE,
+    pause=Config.RULES_BACKFILL_PAUSE_MS / 1000
+)
+report_cache = ReportCache(
+    app.config['SECRET_KEY'],
+    max_entries=Config.REPORT_CACHE_MAX_ENTRIES,
+    max_bytes=Config.REPORT_CACHE_MAX_MB * 1024 * 1024,
+    max_age=Config.REPORT_LINK_MAX_AGE
+)
 
 def init_db():
-    conn = get_db_connection()
-    conn.execute('''
-        CREATE TABLE IF NOT EXISTS users (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            email TEXT UNIQUE NOT NULL,
-            password_hash TEXT NOT NULL,
-            full_name TEXT,
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-        )
-    ''')
-    conn.execute('''
-        CREATE TABLE IF NOT EXISTS calculations (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            user_id INTEGER,
-            gender TEXT NOT NULL,
-            birth_year INTEGER NOT NULL,
-            current_age INTEGER NOT NULL,
-            insurance_years INTEGER NOT NULL,
-            heavy_work_years INTEGER DEFAULT 0,
-            salary REAL NOT NULL,
-            fund TEXT NOT NULL,
-            children INTEGER DEFAULT 0,
-            basic_pension REAL NOT NULL,
-            national_pension REAL NOT NULL,
-            social_benefit REAL NOT NULL,
-            children_benefit REAL NOT NULL,
-            total_pension REAL NOT NULL,
-            replacement_rate REAL NOT NULL,
-            retirement_age INTEGER NOT NULL,
-            years_remaining INTEGER NOT NULL,
-            eligible_for_early BOOLEAN NOT NULL,
-            eligible_for_heavy BOOLEAN NOT NULL,
-            required_years_full INTEGER NOT NULL,
-            required_years_early INTEGER NOT NULL,
-            required_heavy_years INTEGER NOT NULL,
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            FOREIGN KEY (user_id) REFERENCES users (id)
-        )
-    ''')
-    conn.commit()
-    conn.close()
-
-def calculate_retirement_age(birth_year, gender, heavy_work_years):
-    if heavy_work_years >= 15:
-        return 58
-    if birth_year <= 1955:
-        return 65 if gender == 'male' else 60
-    elif birth_year <= 1965:
-        return 67 if gender == 'male' else 62
-    else:
-        return 67
-
-def calculate_replacement_rate(insurance_years, fund):
-    fund_rates = {
-        'ika': {40: 0.80, 35: 0.70, 30: 0.60, 25: 0.50, 20: 0.45, 15: 0.40},
-        'efka': {40: 0.80, 35: 0.70, 30: 0.60, 25: 0.50, 20: 0.45, 15: 0.40},
-        'oaee': {40: 0.65, 35: 0.55, 30: 0.45, 25: 0.40, 20: 0.35, 15: 0.30},
-        'etaa': {40: 0.70, 35: 0.60, 30: 0.50, 25: 0.45, 20: 0.40, 15: 0.35},
-        'other': {40: 0.75, 35: 0.65, 30: 0.55, 25: 0.45, 20: 0.40, 15: 0.35}
-    }
-    rates = fund_rates.get(fund, fund_rates['ika'])
-    for years_threshold, rate in sorted(rates.items(), reverse=True):
-        if insurance_years >= years_threshold:
-            return rate
-    return 0.25
-
-def check_full_pension_eligibility(current_age, insurance_years, retirement_age):
-    return (current_age >= retirement_age and insurance_years >= 15)
-
-def check_early_pension_eligibility(current_age, insurance_years, heavy_work_years):
-    if heavy_work_years >= 15:
-        return (current_age >= 55 and insurance_years >= 25)
-    return (current_age >= 62 and insurance_years >= 35)
-
-def check_heavy_work_pension_eligibility(heavy_work_years):
-    return heavy_work_years >= 15
-
-def calculate_national_pension(insurance_years, basic_pension):
-    if insurance_years >= 15:
-        return 384.0
-    return 0.0
-
-def calculate_social_benefit(total_pension_before_benefits):
-    if total_pension_before_benefits < 800:
-        return 150.0
-    return 0.0
-
-def calculate_children_benefit(children):
-    return children * 50.0
-
-def calculate_early_reduction(years_early):
-    return years_early * 0.06
-
-def calculate_greek_pension(form_data):
-    gender = form_data['gender']
-    birth_year = int(form_data['birth_year'])
-    current_age = int(form_data['current_age'])
-    insurance_years = int(form_data['insurance_years'])
-    heavy_work_years = int(form_data.get('heavy_work_years', 0))
-    salary = float(form_data['salary'])
-    fund = form_data['fund']
-    children = int(form_data.get('children', 0))
-    
-    retirement_age = calculate_retirement_age(birth_year, gender, heavy_work_years)
-    years_remaining = max(0, retirement_age - current_age)
-    
-    eligible_for_full = check_full_pension_eligibility(current_age, insurance_years, retirement_age)
-    eligible_for_early = check_early_pension_eligibility(current_age, insurance_years, heavy_work_years)
-    eligible_for_heavy = check_heavy_work_pension_eligibility(heavy_work_years)
-    
-    replacement_rate = calculate_replacement_rate(insurance_years, fund)
-    basic_pension = salary * replacement_rate
-    
-    national_pension = calculate_national_pension(insurance_years, basic_pension)
-    social_benefit = calculate_social_benefit(basic_pension + national_pension)
-    children_benefit = calculate_children_benefit(children)
-    
-    if eligible_for_early and not eligible_for_full:
-        reduction_rate = calculate_early_reduction(years_remaining)
-        basic_pension *= (1 - reduction_rate)
-    
-    total_pension = basic_pension + national_pension + social_benefit + children_benefit
-    
-    return {
-        'basic_pension': round(basic_pension, 2),
-        'national_pension': round(national_pension, 2),
-        'social_benefit': round(social_benefit, 2),
-        'children_benefit': round(children_benefit, 2),
-        'total_pension': round(total_pension, 2),
-        'replacement_rate': round(replacement_rate * 100, 1),
-        'retirement_age': retirement_age,
-        'years_remaining': years_remaining,
-        'eligible_for_full': eligible_for_full,
-        'eligible_for_early': eligible_for_early,
-        'eligible_for_heavy': eligible_for_heavy,
-        'required_years_full': max(0, 15 - insurance_years),
-        'required_years_early': max(0, 35 - insurance_years),
-        'required_heavy_years': max(0, 15 - heavy_work_years),
-        'gender': gender,
-        'birth_year': birth_year,
-        'current_age': current_age,
-        'insurance_years': insurance_years,
-        'heavy_work_years': heavy_work_years,
-        'salary': salary,
-        'fund': fund,
-        'children': children,
-        'data_source': form_data.get('data_source', 'Χειροκίνητη εισαγωγή')
-    }
-
-def create_pdf_report(pension_data):
-    pdf = FPDF()
-    pdf.add_page()
-    pdf.set_font('Arial', 'B', 16)
-    pdf.cell(200, 10, 'SYNTAXIOLOGOS - ΑΝΑΛΥΤΙΚΗ ΕΚΘΕΣΗ ΣΥΝΤΑΞΗΣ', 0, 1, 'C')
-    pdf.ln(10)
-    
-    pdf.set_font('Arial', 'B', 12)
-    pdf.cell(200, 10, 'ΣΤΟΙΧΕΙΑ ΑΣΦΑΛΙΣΜΕΝΟΥ:', 0, 1)
-    pdf.set_font('Arial', '', 11)
-    pdf.cell(200, 8, f"Πηγή δεδομένων: {pension_data.get('data_source', 'Χειροκίνητη εισαγωγή')}", 0, 1)
-    pdf.cell(200, 8, f"Φύλο: {pension_data['gender']}", 0, 1)
-    pdf.cell(200, 8, f"Έτος γέννησης: {pension_data['birth_year']}", 0, 1)
-    pdf.cell(200, 8, f"Τρέχουσα ηλικία: {pension_data['current_age']} ετών", 0, 1)
-    pdf.cell(200, 8, f"Έτη ασφάλισης: {pension_data['insurance_years']}", 0, 1)
-    if pension_data.get('insurance_days'):
-        pdf.cell(200, 8, f"Ημέρες ασφάλισης: {pension_data['insurance_days']}", 0, 1)
-    pdf.cell(200, 8, f"Έτη βαρέας εργασίας: {pension_data['heavy_work_years']}", 0, 1)
-    pdf.cell(200, 8, f"Μισθός: {pension_data['salary']} €", 0, 1)
-    pdf.cell(200, 8, f"Ταμείο: {pension_data['fund']}", 0, 1)
-    pdf.cell(200, 8, f"Παιδιά: {pension_data['children']}", 0, 1)
-    
-    pdf.ln(10)
-    pdf.set_font('Arial', 'B', 12)
-    pdf.cell(200, 10, 'ΥΠΟΛΟΓΙΣΜΟΣ ΣΥΝΤΑΞΗΣ:', 0, 1)
-    pdf.set_font('Arial', '', 11)
-    pdf.cell(200, 8, f"Βασική σύνταξη: {pension_data['basic_pension']} €", 0, 1)
-    pdf.cell(200, 8, f"Εθνική σύνταξη: {pension_data['national_pension']} €", 0, 1)
-    pdf.cell(200, 8, f"Επίδομα κοινωνικής ασφάλισης: {pension_data['social_benefit']} €", 0, 1)
-    pdf.cell(200, 8, f"Επίδομα τέκνων: {pension_data['children_benefit']} €", 0, 1)
-    pdf.cell(200, 8, f"ΣΥΝΟΛΙΚΗ ΣΥΝΤΑΞΗ: {pension_data['total_pension']} €", 0, 1)
-    pdf.cell(200, 8, f"Ποσοστό αντικατάστασης: {pension_data['replacement_rate']}%", 0, 1)
-    pdf.cell(200, 8, f"Ηλικία συνταξιοδότησης: {pension_data['retirement_age']}", 0, 1)
-    pdf.cell(200, 8, f"Έτη που απομένουν: {pension_data['years_remaining']}", 0, 1)
-    
-    pdf.ln(10)
-    pdf.set_font('Arial', 'B', 12)
-    pdf.cell(200, 10, 'ΔΙΚΑΙΟΛΟΓΗΣΗ:', 0, 1)
-    pdf.set_font('Arial', '', 11)
-    pdf.cell(200, 8, f"Πλήρης σύνταξη: {'ΝΑΙ' if pension_data['eligible_for_full'] else 'ΟΧΙ'}", 0, 1)
-    pdf.cell(200, 8, f"Προνομιακή σύνταξη: {'ΝΑΙ' if pension_data['eligible_for_early'] else 'ΟΧΙ'}", 0, 1)
-    pdf.cell(200, 8, f"Σύνταξη βαρέας εργασίας: {'ΝΑΙ' if pension_data['eligible_for_heavy'] else 'ΟΧΙ'}", 0, 1)
-    
-    if not pension_data['eligible_for_full']:
-        pdf.ln(5)
-        pdf.set_font('Arial', 'B', 11)
-        pdf.cell(200, 8, "ΑΠΑΙΤΟΥΜΕΝΑ ΓΙΑ ΠΛΗΡΗ ΣΥΝΤΑΞΗ:", 0, 1)
-        pdf.set_font('Arial', '', 10)
-        pdf.cell(200, 6, f"Επιπλέον έτη ασφάλισης: {pension_data['required_years_full']}", 0, 1)
-        pdf.cell(200, 6, f"Επιπλέον έτη βαρέας εργασίας: {pension_data['required_heavy_years']}", 0, 1)
-    
-    pdf.ln(15)
-    pdf.set_font('Arial', 'I', 10)
-    pdf.cell(200, 8, f"Ημερομηνία υπολογισμού: {datetime.now().strftime('%d/%m/%Y %H:%M')}", 0, 1)
-    pdf.cell(200, 8, "ΣΥΝΤΑΞΙΟΛΟΓΟΣ - Σύστημα Αυτόματων Υπολογισμών Σύνταξης", 0, 1)
-    
-    filename = f"static/results/pension_report_{datetime.now().strftime('%Y%m%d_%H%M%S')}.pdf"
-    pdf.output(filename)
-    return filename
+    """Σχήμα βάσης και ουράς εργασιών - δεν τρέχει στο import (βλ. 'flask migrate')"""
+    applied = migrate(db)
+    job_queue.init_schema()
+    return applied
+
+def sweep_uploads():
+    """Στην εκκίνηση: διαγραφή ανεβασμένων αρχείων που έμειναν από εργασίες που δεν
+    ολοκληρώθηκαν (μόνο στον φάκελο των εργασιών, JOB_UPLOAD_FOLDER)"""
+    return job_queue.sweep_uploads(app.config['UPLOAD_FOLDER'])
+
+def warm_up():
+    """Ό,τι αξίζει να γίνει μία φορά πριν από το fork των workers (gunicorn preload):
+    έλεγχος/φόρτωση των backends εξαγωγής και των γραμματοσειρών των αναφορών"""
+    backends = capabilities()
+    report_renderer.warm_up()
+    return backends
+
+@app.cli.command('migrate')
+def migrate_command():
+    """Εφαρμογή των εκκρεμών migrations και δημιουργία του πίνακα εργασιών"""
+    applied = init_db()
+    print(f"✅ Migrations: {', '.join(map(str, applied))}" if applied else "✅ Το σχήμα είναι ενημερωμένο")
+
+def _print_backfill(state):
+    percent = 100 * state['processed'] / state['total'] if state['total'] else 100
+    print(f"♻️  {state['rules_version']}: {state['processed']}/{state['total']} ({percent:.1f}%), "
+          f"ενημερώθηκαν {state['updated']}, σφάλματα {state['errors']} - {state['status']}")
+
+@app.cli.command('rules-backfill')
+@click.option('--status', 'show_status', is_flag=True, help='Μόνο η πρόοδος, χωρίς επανυπολογισμό')
+def rules_backfill_command(show_status):
+    """Επανυπολογισμός των αποθηκευμένων υπολογισμών με τους τρέχοντες κανόνες.
+    Ασφαλές να διακοπεί: η επόμενη εκτέλεση συνεχίζει από το τελευταίο chunk."""
+    if show_status:
+        state = rules_backfill.status()
+        if state is None:
+            print(f"ℹ️ Δεν έχει ξεκινήσει επανυπολογισμός για τους κανόνες {rules_backfill.rules_tag}")
+        else:
+            _print_backfill(state)
+        return
+    rules_backfill.run(progress=_print_backfill)
+
+def calculate_pension(profile):
+    with metrics.timer('calculate'):
+        return calculate_greek_pension(profile)
+
+def render_report(pension_data):
+    with metrics.timer('pdf_report'):
+        return create_pdf_report(pension_data)
+
+def report_url(pension_data):
+    """Link λήψης της αναφοράς - το PDF δημιουργείται μόνο όταν ζητηθεί"""
+    # Το ιστορικό περιόδων δεν χρειάζεται στην αναφορά και θα μεγάλωνε πολύ το link
+    report_data = {key: value for key, value in pension_data.items() if key != 'insurance_history'}
+    return url_for('download_file', token=report_cache.token_for(report_data))
 
 def save_calculation_to_db(user_id, pension_data):
-    conn = get_db_connection()
-    conn.execute('''
-        INSERT INTO calculations 
-        (user_id, gender, birth_year, current_age, insurance_years, heavy_work_years, 
-         salary, fund, children, basic_pension, national_pension, social_benefit, 
-         children_benefit, total_pension, replacement_rate, retirement_age, years_remaining,
-         eligible_for_early, eligible_for_heavy, required_years_full, required_years_early, required_heavy_years)
-        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-    ''', (
-        user_id, pension_data['gender'], pension_data['birth_year'], pension_data['current_age'],
-        pension_data['insurance_years'], pension_data['heavy_work_years'], pension_data['salary'],
-        pension_data['fund'], pension_data['children'], pension_data['basic_pension'],
-        pension_data['national_pension'], pension_data['social_benefit'], pension_data['children_benefit'],
-        pension_data['total_pension'], pension_data['replacement_rate'], pension_data['retirement_age'],
-        pension_data['years_remaining'], pension_data['eligible_for_early'], pension_data['eligible_for_heavy'],
-        pension_data['required_years_full'], pension_data['required_years_early'], pension_data['required_heavy_years']
-    ))
-    conn.commit()
-    calculation_id = conn.execute('SELECT last_insert_rowid()').fetchone()[0]
-    conn.close()
-    return calculation_id
-
-def get_user_calculations(user_id):
-    conn = get_db_connection()
-    calculations = conn.execute('''
-        SELECT * FROM calculations 
-        WHERE user_id = ? 
-        ORDER BY created_at DESC
-        LIMIT 10
-    ''', (user_id,)).fetchall()
-    conn.close()
-    return calculations
+    """Με write-behind επιστρέφει Future με το id, αλλιώς το id"""
+    if calculation_writer is not None:
+        return calculation_writer.save(user_id, pension_data)
+    return calculation_store.save(user_id, pension_data)
+
+def import_csv_upload(file):
+    """Υπολογισμός όλων των γραμμών ενός CSV προτύπου σε αρχείο αποτελεσμάτων στον δίσκο"""
+    os.makedirs(Config.IMPORT_RESULTS_DIR, exist_ok=True)
+    with tempfile.NamedTemporaryFile('w', dir=Config.IMPORT_RESULTS_DIR, suffix='.csv', delete=False,
+                                     encoding='utf-8', newline='') as output:
+        try:
+            summary = import_template_csv(file.stream, output, chunk_size=Config.CSV_IMPORT_CHUNK_SIZE)
+        except Exception:
+            output.close()
+            os.remove(output.name)
+            raise
+    return summary, output.name
+
+def send_import_results(result_path):
+    # Το αρχείο αποτελεσμάτων είναι μιας χρήσης: διαγράφεται αμέσως και η λήψη
+    # διαβάζει από τον ανοιχτό descriptor, οπότε δεν μένει τίποτα στον δίσκο
+    result_file = open(result_path, 'rb')
+    os.remove(result_path)
+    return send_file(result_file, mimetype='text/csv', as_attachment=True,
+                     download_name='pension_import_results.csv')
+
+def ndjson_response(profiles):
+    """Αποτελέσματα ως NDJSON stream: κάθε προφίλ γράφεται στην απάντηση μόλις υπολογιστεί"""
+    return Response(
+        stream_with_context(iter_ndjson_results(profiles)),
+        mimetype='application/x-ndjson',
+        headers={'Content-Disposition': 'attachment; filename=pension_results.ndjson'}
+    )
+
+def get_user_calculations(user_id, cursor=None):
+    # Ο χρήστης πρέπει να βλέπει και τους υπολογισμούς που δεν έχουν γραφτεί ακόμα
+    if calculation_writer is not None:
+        calculation_writer.flush()
+    return calculation_store.history_page(user_id, cursor, limit=Config.HISTORY_PAGE_SIZE)
 
 @app.route('/')
 def home():
@@ -291,8 +180,8 @@ def manual_calculation():
         form_data['salary'] = float(form_data['salary'])
         form_data['children'] = int(form_data['children'])
         
-        pension_data = calculate_greek_pension(form_data)
-        pdf_report = create_pdf_report(pension_data)
+        pension_data = calculate_pension(form_data)
+        pdf_report = report_url(pension_data)
         
         if 'user_id' in session:
             save_calculation_to_db(session['user_id'], pension_data)
@@ -319,12 +208,41 @@ def upload_file():
         if file:
             filename = file.filename.lower()
             
-            # Έλεγχος για PDF e-ΕΦΚΑ
-            if filename.endswith('.pdf'):
-                flash('🔍 Επεξεργασία PDF e-ΕΦΚΑ... Παρακαλώ περιμένετε')
-            
-            file_content = file.read()
-            extracted_data = FileProcessor.process_file(file_content, file.filename)
+            # Τα PDF e-ΕΦΚΑ και οι εικόνες (OCR) επεξεργάζονται στο παρασκήνιο,
+            # εκτός αν έχουν ήδη αναλυθεί
+            if filename.endswith('.pdf') or filename.endswith(IMAGE_EXTENSIONS):
+                file_path = save_upload(file, app.config['UPLOAD_FOLDER'])
+                extracted_data = FileProcessor.get_cached_extraction(file_path)
+                if extracted_data is None:
+                    job_id = job_queue.enqueue(
+                        file_path, file.filename,
+                        user_id=session.get('user_id'),
+                        data_source=('Αυτόματη ανάλυση PDF e-ΕΦΚΑ' if filename.endswith('.pdf')
+                                     else 'Αρχείο εικόνας/άλλο')
+                    )
+                    return redirect(url_for('job_page', job_id=job_id))
+                # Ίδιο περιεχόμενο υπάρχει ήδη στο cache - δεν κρατάμε δεύτερο αντίγραφο
+                os.remove(file_path)
+            elif filename.endswith('.csv'):
+                # Όλες οι γραμμές υπολογίζονται· με μία μόνο γραμμή δείχνουμε τη σελίδα αποτελεσμάτων
+                summary, result_path = import_csv_upload(file)
+                if summary['rows'] != 1 or summary['first_profile'] is None:
+                    return send_import_results(result_path)
+                os.remove(result_path)
+                extracted_data = summary['first_profile']
+            elif filename.endswith('.json'):
+                # Ένα προφίλ -> σελίδα αποτελεσμάτων, πολλά (array / NDJSON) -> NDJSON stream
+                profiles = iter_profiles(iter_json_records(file.stream))
+                first = next(profiles, None)
+                if first is None:
+                    raise ValueError('Το αρχείο JSON δεν περιέχει προφίλ')
+                second = next(profiles, None)
+                if second is not None:
+                    return ndjson_response(itertools.chain([first, second], profiles))
+                extracted_data = profile_from_record(first)
+            else:
+                # Άγνωστη μορφή: απόρριψη χωρίς να διαβαστεί το αρχείο
+                raise Exception("Μη υποστηριζόμενη μορφή αρχείου")
             
             # Προσθήκη πηγής δεδομένων
             if filename.endswith('.pdf'):
@@ -336,8 +254,8 @@ def upload_file():
             else:
                 extracted_data['data_source'] = 'Αρχείο εικόνας/άλλο'
             
-            pension_data = calculate_greek_pension(extracted_data)
-            pdf_report = create_pdf_report(pension_data)
+            pension_data = calculate_pension(extracted_data)
+            pdf_report = report_url(pension_data)
             
             if 'user_id' in session:
                 save_calculation_to_db(session['user_id'], pension_data)
@@ -347,6 +265,107 @@ def upload_file():
         flash(f'Σφάλμα επεξεργασίας αρχείου: {str(e)}')
         return render_template('upload.html')
 
+@app.route('/batch', methods=['POST'])
+def batch_calculation():
+    """Μαζικός υπολογισμός: CSV/JSON είσοδος, CSV/JSON έξοδος"""
+    try:
+        input_format = 'json'
+        if 'file' in request.files and request.files['file'].filename:
+            file = request.files['file']
+            if file.filename.lower().endswith('.csv'):
+                input_format = 'csv'
+            profiles = read_batch_profiles(file.read(), file.filename)
+        else:
+            payload = request.get_json(force=True)
+            profiles = payload if isinstance(payload, list) else payload.get('profiles', [])
+        
+        results = calculate_pension_batch(profiles)
+        
+        if request.args.get('format', input_format) == 'csv':
+            return Response(
+                write_batch_csv(results),
+                mimetype='text/csv',
+                headers={'Content-Disposition': 'attachment; filename=pension_batch.csv'}
+            )
+        return jsonify({'count': len(results), 'results': results})
+    except Exception as e:
+        return jsonify({'error': f'Σφάλμα μαζικού υπολογισμού: {str(e)}'}), 400
+
+@app.route('/import/csv', methods=['POST'])
+def import_csv():
+    """Μαζική εισαγωγή CSV προτύπου: αρχείο αποτελεσμάτων με μία γραμμή ανά γραμμή εισόδου"""
+    file = request.files.get('file')
+    if file is None or not file.filename:
+        return jsonify({'error': 'Δεν επιλέχθηκε αρχείο'}), 400
+    try:
+        summary, result_path = import_csv_upload(file)
+    except Exception as e:
+        return jsonify({'error': f'Σφάλμα εισαγωγής CSV: {str(e)}'}), 400
+    response = send_import_results(result_path)
+    response.headers['X-Import-Rows'] = str(summary['rows'])
+    response.headers['X-Import-Errors'] = str(summary['errors'])
+    return response
+
+@app.route('/import/json', methods=['POST'])
+def import_json():
+    """Μαζική εισαγωγή JSON array / NDJSON (αρχείο ή σώμα αιτήματος), απάντηση σε NDJSON"""
+    file = request.files.get('file')
+    stream = file.stream if file is not None and file.filename else request.stream
+    return ndjson_response(iter_profiles(iter_json_records(stream)))
+
+@app.route('/scenarios', methods=['POST'])
+def scenario_sweep():
+    """Σενάρια "τι θα γινόταν αν": βασικό προφίλ + εύρη τιμών, όλο το πλέγμα σε μία απάντηση.
+    Δεν δημιουργεί PDF· αποθηκεύει στο ιστορικό μόνο με "persist": true."""
+    try:
+        payload = request.get_json(force=True)
+        results = run_scenarios(payload['profile'], payload.get('sweep', {}))
+        
+        if payload.get('persist') and 'user_id' in session:
+            for result in results:
+                if 'error' not in result:
+                    save_calculation_to_db(session['user_id'], result)
+        
+        return jsonify({'count': len(results), 'results': results})
+    except Exception as e:
+        return jsonify({'error': f'Σφάλμα υπολογισμού σεναρίων: {str(e)}'}), 400
+
+@app.route('/jobs/<job_id>')
+def job_page(job_id):
+    """Σελίδα αναμονής / αποτελεσμάτων εργασίας εξαγωγής"""
+    job = job_queue.get(job_id)
+    if job is None:
+        flash('Η εργασία δεν βρέθηκε')
+        return render_template('upload.html')
+    
+    if job['status'] == JOB_ERROR:
+        flash(f"Σφάλμα επεξεργασίας αρχείου: {job['error']}")
+        return render_template('upload.html')
+    
+    if job['status'] != JOB_DONE:
+        return render_template('job_status.html', job=job, poll_interval=Config.JOB_POLL_INTERVAL)
+    
+    try:
+        pension_data = calculate_pension(job_queue.get_result(job_id))
+        pdf_report = report_url(pension_data)
+        
+        # Αποθήκευση μόνο στην πρώτη προβολή του αποτελέσματος
+        if job['user_id'] and job_queue.mark_delivered(job_id):
+            save_calculation_to_db(job['user_id'], pension_data)
+        
+        return render_template('results.html', pension_data=pension_data, pdf_report=pdf_report)
+    except Exception as e:
+        flash(f'Σφάλμα επεξεργασίας αρχείου: {str(e)}')
+        return render_template('upload.html')
+
+@app.route('/jobs/<job_id>/status')
+def job_status(job_id):
+    status = job_queue.get_status(job_id)
+    if status is None:
+        return jsonify({'error': 'not found'}), 404
+    status['result_url'] = url_for('job_page', job_id=job_id)
+    return jsonify(status)
+
 @app.route('/csv-template')
 def csv_template():
     """Σελίδα με το πρότυπο CSV"""
@@ -359,16 +378,12 @@ def register():
         password = request.form['password']
         full_name = request.form.get('full_name', '')
         try:
-            conn = get_db_connection()
-            existing_user = conn.execute('SELECT id FROM users WHERE email = ?', (email,)).fetchone()
+            existing_user = db.query_one('SELECT id FROM users WHERE email = ?', (email,))
             if existing_user:
                 flash('Το email χρησιμοποιείται ήδη')
                 return render_template('register.html')
             password_hash = generate_password_hash(password)
-            conn.execute('INSERT INTO users (email, password_hash, full_name) VALUES (?, ?, ?)', (email, password_hash, full_name))
-            conn.commit()
-            user_id = conn.execute('SELECT last_insert_rowid()').fetchone()[0]
-            conn.close()
+            user_id = db.insert('INSERT INTO users (email, password_hash, full_name) VALUES (?, ?, ?)', (email, password_hash, full_name))
             session['user_id'] = user_id
             session['user_email'] = email
             flash('Επιτυχής εγγραφή!')
@@ -384,9 +399,7 @@ def login():
         email = request.form['email']
         password = request.form['password']
         try:
-            conn = get_db_connection()
-            user = conn.execute('SELECT * FROM users WHERE email = ?', (email,)).fetchone()
-            conn.close()
+            user = db.query_one('SELECT * FROM users WHERE email = ?', (email,))
             if user and check_password_hash(user['password_hash'], password):
                 session['user_id'] = user['id']
                 session['user_email'] = user['email']
@@ -411,20 +424,50 @@ def history():
     if 'user_id' not in session:
         flash('Παρακαλώ συνδεθείτε για να δείτε το ιστορικό')
         return render_template('login.html')
-    calculations = get_user_calculations(session['user_id'])
-    return render_template('history.html', calculations=calculations)
+    calculations, next_cursor = get_user_calculations(session['user_id'], request.args.get('before'))
+    return render_template(
+        'history.html', calculations=calculations, next_cursor=next_cursor,
+        total_calculations=calculation_store.count(session['user_id'])
+    )
 
-@app.route('/download/<filename>')
-def download_file(filename):
-    return send_file(filename, as_attachment=True)
+@app.route('/download/<token>')
+def download_file(token):
+    pension_data = report_cache.load_token(token)
+    if pension_data is None:
+        return "Μη έγκυρος σύνδεσμος αναφοράς", 404
+    key = report_key(pension_data)
+    # Ο browser που έχει ήδη την αναφορά του cache δεν χρειάζεται ούτε τα bytes
+    etag = report_cache.etag_for(key)
+    if etag is not None and etag in request.if_none_match:
+        response = Response(status=304)
+        response.set_etag(etag)
+        return response
+    pdf_bytes, etag = report_cache.get_or_render(key, pension_data, render_report)
+    response = send_file(
+        io.BytesIO(pdf_bytes), mimetype='application/pdf', as_attachment=True,
+        download_name='pension_report.pdf', etag=etag, max_age=Config.REPORT_CACHE_MAX_AGE
+    )
+    response.cache_control.public = False
+    response.cache_control.private = True
+    return response
 
 @app.route('/healthz')
 def health_check():
     return "OK", 200
 
+@app.route('/metrics')
+def metrics_endpoint():
+    """Μετρήσεις σε μορφή Prometheus: χρόνοι ανά στάδιο, σελίδες, χαρακτήρες,
+    cache hits και πεδία ανά tier (μαζί με όσα μέτρησαν οι workers εξαγωγής)"""
+    try:
+        job_queue.update_metrics()
+        rules_backfill.update_metrics()
+    except Exception as e:
+        print(f"Metrics error: {e}")
+    return Response(metrics.render(), mimetype='text/plain; version=0.0.4')
+
 if __name__ == '__main__':
+    init_db()
+    sweep_uploads()
     port = int(os.environ.get('PORT', 8000))
     app.run(debug=True, host='0.0.0.0', port=port)
-
-with app.app_context():
-    init_db()
\ No newline at end of file
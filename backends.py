@@ -0,0 +1,37 @@
+import importlib
+from functools import lru_cache
+
+# Προαιρετικά backends εξαγωγής: φορτώνονται στην πρώτη χρήση, όχι στο import
+# του file_processor, ώστε η εκκίνηση (workers, CLI) να μην πληρώνει το κόστος τους
+EXTRACTION_BACKENDS = {
+    'pdfplumber': 'pdfplumber',
+    'pytesseract': 'pytesseract',
+    'pdf2image': 'pdf2image',
+    'PIL.Image': 'Pillow',
+    'PIL.ImageOps': 'Pillow',
+    'PIL.ImageSequence': 'Pillow',
+}
+
+_reported = set()
+
+
+@lru_cache(maxsize=None)
+def optional_module(name):
+    """Το module, ή None αν δεν είναι εγκατεστημένο. Ο έλεγχος γίνεται μία φορά ανά process."""
+    try:
+        return importlib.import_module(name)
+    except ImportError:
+        label = EXTRACTION_BACKENDS.get(name, name)
+        if label not in _reported:
+            _reported.add(label)
+            print(f"⚠️  {label} not available")
+        return None
+
+
+def available(*names):
+    return all(optional_module(name) is not None for name in names)
+
+
+def capabilities():
+    """Ποια backends υπάρχουν (φορτώνει όσα δεν έχουν φορτωθεί ακόμα)"""
+    return {name: optional_module(name) is not None for name in EXTRACTION_BACKENDS}
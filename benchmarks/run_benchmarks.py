@@ -0,0 +1,415 @@
+"""Benchmarks του Συνταξιολόγου: εξαγωγή PDF, ανάλυση κειμένου, υπολογισμός,
+αναφορές PDF, SQLite και Flask routes υπό ταυτόχρονη φόρτωση.
+
+    python benchmarks/run_benchmarks.py --output bench.json
+    python benchmarks/run_benchmarks.py --quick --compare baseline.json --max-regression 0.2
+
+Τα αποτελέσματα γράφονται σε JSON. Με --compare κάθε benchmark συγκρίνεται με
+το αντίστοιχο του baseline στη βασική του μέτρηση και ο κωδικός εξόδου είναι 1
+αν κάποιο χειροτέρεψε περισσότερο από --max-regression. Ο κωδικός είναι 1 και
+όταν ο efka_extractor είναι πιο αργός από τα αρχικά διαδοχικά regex
+(reference_efka_analysis) περισσότερο από --max-regression."""
+import argparse
+import atexit
+import contextlib
+import io
+import json
+import os
+import platform
+import random
+import re
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SAMPLES_DIR = os.path.join(REPO_DIR, 'uploads')
+START_DIR = os.getcwd()
+
+# Όλα τα αρχεία του benchmark (βάση, extraction cache, uploads) σε προσωρινό φάκελο
+WORK_DIR = tempfile.mkdtemp(prefix='pension-bench-')
+atexit.register(shutil.rmtree, WORK_DIR, True)
+os.environ.setdefault('DATABASE_URL', f"sqlite:///{os.path.join(WORK_DIR, 'bench.db')}")
+os.environ.setdefault('EXTRACTION_CACHE_PATH', os.path.join(WORK_DIR, 'extraction_cache.db'))
+os.environ.setdefault('IMPORT_RESULTS_DIR', os.path.join(WORK_DIR, 'import_results'))
+sys.path.insert(0, REPO_DIR)
+os.chdir(WORK_DIR)
+
+# Οι modules τυπώνουν πρόοδο (emoji prints) - εκτός της εξόδου του benchmark
+with contextlib.redirect_stdout(io.StringIO()):
+    import file_processor
+    from file_processor import FileProcessor
+    from efka_patterns import efka_extractor
+    from pension_calculator import calculate_greek_pension, calculate_profile_terms
+    from pension_batch import calculate_pension_batch, compare_with_scalar
+    from pdf_report import create_pdf_report
+    from database import Database
+    from migrations import migrate
+    from calculation_store import CalculationStore
+    from pension_rules import RULES
+    from backends import capabilities
+
+FUNDS = ('ika', 'oaee', 'tsmede', 'other')
+
+
+def _percentile(sorted_values, fraction):
+    index = min(len(sorted_values) - 1, int(round(fraction * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def summarize(durations, items_per_call=1):
+    """Σύνοψη χρόνων (δευτερόλεπτα ανά κλήση) σε ms και ρυθμό"""
+    ordered = sorted(durations)
+    total = sum(ordered)
+    return {
+        'calls': len(ordered),
+        'mean_ms': round(total / len(ordered) * 1000, 4),
+        'p50_ms': round(_percentile(ordered, 0.50) * 1000, 4),
+        'p95_ms': round(_percentile(ordered, 0.95) * 1000, 4),
+        'p99_ms': round(_percentile(ordered, 0.99) * 1000, 4),
+        'min_ms': round(ordered[0] * 1000, 4),
+        'ops_per_sec': round(len(ordered) * items_per_call / total, 2) if total else None,
+    }
+
+
+def measure(func, repeat, warmup=1, items_per_call=1):
+    with contextlib.redirect_stdout(io.StringIO()):
+        for _ in range(warmup):
+            func()
+        durations = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            func()
+            durations.append(time.perf_counter() - start)
+    return summarize(durations, items_per_call)
+
+
+def random_profiles(count, seed=42):
+    rng = random.Random(seed)
+    profiles = []
+    for _ in range(count):
+        birth_year = rng.randint(1955, 2000)
+        profiles.append({
+            'gender': rng.choice(('male', 'female')),
+            'birth_year': birth_year,
+            'current_age': 2025 - birth_year,
+            'insurance_years': rng.randint(0, 45),
+            'heavy_work_years': rng.choice((0, 0, 0, 5, 15)),
+            'salary': round(rng.uniform(500, 5000), 2),
+            'fund': rng.choice(FUNDS),
+            'children': rng.randint(0, 4),
+            'data_source': 'Benchmark',
+        })
+    return profiles
+
+
+def synthetic_efka_text(target_chars, seed=7):
+    """Κείμενο που μοιάζει με βεβαίωση e-ΕΦΚΑ: θόρυβος με αριθμούς και, στο τέλος, τα πεδία"""
+    rng = random.Random(seed)
+    noise = [
+        'ΕΡΓΟΔΟΤΗΣ ΑΕ ΠΕΡΙΟΔΟΣ {m:02d}/{y} ΑΠΟΔΟΧΕΣ {a},{c:02d} ΚΩΔ {k}',
+        'ΠΑΚΕΤΟ ΚΑΛΥΨΗΣ {k} ΕΙΔΙΚΟΤΗΤΑ {k}{m} ΤΥΠΟΣ {m}',
+        'Σελίδα {m} από {y} - Ηλεκτρονική υπηρεσία e-ΕΦΚΑ',
+    ]
+    lines = []
+    size = 0
+    while size < target_chars:
+        line = rng.choice(noise).format(m=rng.randint(1, 12), y=rng.randint(1985, 2024),
+                                        a=rng.randint(100, 3000), c=rng.randint(0, 99),
+                                        k=rng.randint(100, 999))
+        lines.append(line)
+        size += len(line) + 1
+    lines += ['ΗΜΕΡΕΣ ΑΣΦΑΛΙΣΗΣ: 8123', 'ΜΙΣΘΟΣ: 1450,50', 'ΕΤΟΣ ΓΕΝΝΗΣΗΣ: 1968', 'ΦΥΛΟ: ΑΡΣΕΝ']
+    return '\n'.join(lines)
+
+
+# Τα αρχικά patterns της ανάλυσης e-ΕΦΚΑ, ένα re.search ανά pattern με σειρά προτεραιότητας
+REFERENCE_PATTERNS = {
+    'insurance_days': [r'ΗΜΕΡΕΣ[\s:]*(\d{4,5})', r'(\d{4,5})\s*ΗΜΕΡ', r'DAYS[\s:]*(\d{4,5})',
+                       r'INSURANCE[\s:]*(\d{4,5})', r'(\d{4,5})'],
+    'salary': [r'ΜΙΣΘΟΣ[\s:]*(\d+[,.]?\d*)', r'(\d{3,4}[,.]\d{2})\s*ΕΥΡ', r'SALARY[\s:]*(\d+[,.]?\d*)',
+               r'(\d{3,4}[,.]\d{2})\s*EURO', r'(\d{3,4}[,.]\d{2})'],
+    'birth_year': [r'ΓΕΝΝΗΣΗΣ[\s:]*(\d{4})', r'BIRTH[\s:]*(\d{4})', r'(19[5-9]\d)'],
+}
+REFERENCE_RANGES = {
+    'insurance_days': (int, 1000, 40000),
+    'salary': (lambda raw: float(raw.replace(',', '.')), 100, 10000),
+    'birth_year': (int, 1950, 2000),
+}
+
+
+def reference_efka_analysis(text):
+    """Η ανάλυση κειμένου πριν από τον efka_extractor - μέτρο σύγκρισης για το gate"""
+    data = {}
+    clean_text = text.upper().replace('\n', ' ')
+    for field, patterns in REFERENCE_PATTERNS.items():
+        parse, low, high = REFERENCE_RANGES[field]
+        for pattern in patterns:
+            match = re.search(pattern, clean_text)
+            if match and low <= parse(match.group(1)) <= high:
+                data[field] = parse(match.group(1))
+                break
+    if 'ΑΡΣΕΝ' in clean_text or 'MALE' in clean_text:
+        data['gender'] = 'male'
+    elif 'ΘΗΛΥ' in clean_text or 'FEMALE' in clean_text:
+        data['gender'] = 'female'
+    return data
+
+
+@contextlib.contextmanager
+def ocr_disabled():
+    """process_pdf χωρίς OCR: μόνο text layer και basic patterns"""
+    saved = file_processor.ocr_available
+    file_processor.ocr_available = lambda: False
+    try:
+        yield
+    finally:
+        file_processor.ocr_available = saved
+
+
+def bench_pdf_extraction(quick):
+    results = {}
+    samples = sorted(name for name in os.listdir(SAMPLES_DIR) if name.lower().endswith('.pdf')) \
+        if os.path.isdir(SAMPLES_DIR) else []
+    with contextlib.redirect_stdout(io.StringIO()):
+        ocr_available = file_processor.ocr_available()
+    for name in samples[:1] if quick else samples:
+        with open(os.path.join(SAMPLES_DIR, name), 'rb') as f:
+            content = f.read()
+        with ocr_disabled():
+            results[f'pdf_extraction.no_ocr.{name}'] = measure(
+                lambda: FileProcessor.process_pdf(content), repeat=3 if quick else 10)
+        if ocr_available:
+            results[f'pdf_extraction.ocr.{name}'] = measure(
+                lambda: FileProcessor.process_pdf(content), repeat=1 if quick else 3, warmup=0)
+        else:
+            results[f'pdf_extraction.ocr.{name}'] = {'skipped': 'pytesseract/pdf2image not available'}
+    return results
+
+
+def bench_efka_analysis(quick):
+    results = {}
+    sizes = (10_000, 1_000_000) if quick else (10_000, 100_000, 1_000_000, 5_000_000)
+    for size in sizes:
+        text = synthetic_efka_text(size)
+        result = measure(lambda: FileProcessor._smart_efka_analysis(text), repeat=3 if quick else 10)
+        result['mb_per_sec'] = round(len(text) / 1e6 / (result['mean_ms'] / 1000), 2)
+        results[f'efka_analysis.{size // 1000}k_chars'] = result
+
+    # efka_extractor έναντι των αρχικών regex, με τα πεδία στο τέλος και στην αρχή του κειμένου
+    for size in sizes:
+        text = synthetic_efka_text(size)
+        fields_first = '\n'.join(text.splitlines()[-4:] + text.splitlines()[:-4])
+        for placement, sample in (('fields_last', text), ('fields_first', fields_first)):
+            repeat = 3 if quick else 10
+            result = measure(lambda: efka_extractor.extract(sample), repeat=repeat)
+            reference = measure(lambda: reference_efka_analysis(sample), repeat=repeat)
+            result['mb_per_sec'] = round(len(sample) / 1e6 / (result['mean_ms'] / 1000), 2)
+            result['reference_min_ms'] = reference['min_ms']
+            result['speedup_vs_reference'] = round(reference['min_ms'] / result['min_ms'], 2)
+            results[f'efka_extractor.{size // 1000}k_chars.{placement}'] = result
+    return results
+
+
+def bench_calculation(quick):
+    count = 20_000 if quick else 200_000
+    profiles = random_profiles(count)
+
+    def scalar_all():
+        for profile in profiles:
+            calculate_greek_pension(dict(profile))
+
+    def scalar_cold():
+        calculate_profile_terms.cache_clear()
+        scalar_all()
+
+    results = {
+        'calculate_greek_pension.cold': measure(scalar_cold, repeat=3, warmup=0, items_per_call=count),
+        'calculate_greek_pension.warm': measure(scalar_all, repeat=3, items_per_call=count),
+        'calculate_pension_batch': measure(lambda: calculate_pension_batch(profiles),
+                                           repeat=3, items_per_call=count),
+    }
+    # Ο batch κώδικας πρέπει να δίνει ακριβώς τα αποτελέσματα του βαθμωτού
+    results['calculate_pension_batch']['mismatches'] = len(compare_with_scalar(profiles[:5000]))
+    return results
+
+
+def bench_pdf_report(quick):
+    pension_data = calculate_greek_pension(random_profiles(1)[0])
+    return {'create_pdf_report': measure(lambda: create_pdf_report(pension_data),
+                                         repeat=10 if quick else 50)}
+
+
+def bench_database(quick):
+    count = 2_000 if quick else 20_000
+    db = Database(f"sqlite:///{os.path.join(WORK_DIR, 'bench_store.db')}")
+    migrate(db)
+    store = CalculationStore(db)
+    calculations = [calculate_greek_pension(profile) for profile in random_profiles(count)]
+    single = calculations[:min(count, 500)]
+
+    singles = iter(single)
+    results = {
+        'sqlite.insert_single': measure(lambda: store.save(1, next(singles)),
+                                        repeat=len(single) - 1),
+        'sqlite.insert_batch': measure(lambda: store.save_many([(2, data) for data in calculations]),
+                                       repeat=1, warmup=0, items_per_call=count),
+    }
+    # Σελίδες ιστορικού σε όλο το βάθος, με keyset pagination
+    pages = []
+    cursor = None
+    while True:
+        start = time.perf_counter()
+        _, cursor = store.history_page(2, cursor, limit=10)
+        pages.append(time.perf_counter() - start)
+        if cursor is None or len(pages) >= 500:
+            break
+    results['sqlite.history_page'] = summarize(pages)
+    return results
+
+
+def bench_routes(quick, concurrency):
+    with contextlib.redirect_stdout(io.StringIO()):
+        from app import app, report_cache
+    app.config['TESTING'] = True
+    profile = random_profiles(1)[0]
+    form = {key: str(value) for key, value in profile.items() if key != 'data_source'}
+    batch = {'profiles': random_profiles(100, seed=3)}
+    download_path = f"/download/{report_cache.token_for(calculate_greek_pension(dict(profile)))}"
+    requests_per_worker = 20 if quick else 200
+
+    routes = {
+        'healthz': lambda client: client.get('/healthz'),
+        'manual': lambda client: client.post('/manual', data=form),
+        'batch_100': lambda client: client.post('/batch', json=batch),
+        'download_report': lambda client: client.get(download_path),
+        'scenarios': lambda client: client.post('/scenarios', json={
+            'profile': profile, 'sweep': {'salary': {'start': 800, 'stop': 3000, 'step': 200},
+                                          'retirement_age': [62, 65, 67]}}),
+    }
+
+    def worker(call):
+        client = app.test_client()
+        durations = []
+        for _ in range(requests_per_worker):
+            start = time.perf_counter()
+            response = call(client)
+            durations.append(time.perf_counter() - start)
+            if response.status_code >= 400:
+                raise RuntimeError(f'HTTP {response.status_code}')
+        return durations
+
+    results = {}
+    with contextlib.redirect_stdout(io.StringIO()):
+        for name, call in routes.items():
+            worker(call)
+            start = time.perf_counter()
+            with ThreadPoolExecutor(max_workers=concurrency) as executor:
+                durations = [d for batch_durations in executor.map(worker, [call] * concurrency)
+                             for d in batch_durations]
+            elapsed = time.perf_counter() - start
+            result = summarize(durations)
+            # Με ταυτόχρονους clients ο ρυθμός μετριέται στον πραγματικό χρόνο
+            result['ops_per_sec'] = round(len(durations) / elapsed, 2)
+            result['concurrency'] = concurrency
+            results[f'route.{name}'] = result
+    return results
+
+
+SUITES = {
+    'pdf_extraction': bench_pdf_extraction,
+    'efka_analysis': bench_efka_analysis,
+    'calculation': bench_calculation,
+    'pdf_report': bench_pdf_report,
+    'database': bench_database,
+    'routes': bench_routes,
+}
+
+
+def _git_revision():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=REPO_DIR,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(results, baseline, max_regression):
+    """Σύγκριση στο ops_per_sec (μεγαλύτερο = καλύτερο): λίστα με ό,τι χειροτέρεψε"""
+    regressions = []
+    for name, result in results.items():
+        previous = baseline.get('results', {}).get(name)
+        if not previous or not result.get('ops_per_sec') or not previous.get('ops_per_sec'):
+            continue
+        change = result['ops_per_sec'] / previous['ops_per_sec'] - 1
+        status = 'REGRESSION' if change < -max_regression else 'ok'
+        print(f"{status:>10}  {name}: {previous['ops_per_sec']} -> {result['ops_per_sec']} ops/s "
+              f"({change:+.1%})")
+        if status != 'ok':
+            regressions.append(name)
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmarks εξαγωγής, υπολογισμού, αναφορών και βάσης')
+    parser.add_argument('--output', default='benchmark_results.json')
+    parser.add_argument('--quick', action='store_true', help='μικρότερα μεγέθη, για CI')
+    parser.add_argument('--suite', action='append', choices=sorted(SUITES),
+                        help='μόνο αυτά τα suites (επαναλαμβανόμενο)')
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument('--compare', metavar='BASELINE_JSON')
+    parser.add_argument('--max-regression', type=float, default=0.2,
+                        help='μέγιστη αποδεκτή πτώση ops/s έναντι του baseline (0.2 = 20%%)')
+    args = parser.parse_args(argv)
+
+    results = {}
+    for name in args.suite or SUITES:
+        print(f"▶ {name}")
+        suite = SUITES[name]
+        suite_results = suite(args.quick, args.concurrency) if name == 'routes' else suite(args.quick)
+        for bench_name, result in suite_results.items():
+            print(f"   {bench_name}: {json.dumps(result, ensure_ascii=False)}")
+        results.update(suite_results)
+
+    report = {
+        'meta': {
+            'timestamp': datetime.now().isoformat(timespec='seconds'),
+            'git_revision': _git_revision(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'cpu_count': os.cpu_count(),
+            'quick': args.quick,
+            'rules_version': RULES.tag,
+            'backends': capabilities(),
+        },
+        'results': results,
+    }
+    output = os.path.join(START_DIR, args.output)
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2, ensure_ascii=False)
+    print(f"📄 {output}")
+
+    failed = [name for name, result in results.items() if result.get('mismatches')]
+    if failed:
+        print(f"❌ Διαφορές batch/βαθμωτού υπολογισμού: {', '.join(failed)}")
+        return 1
+    slower = [name for name, result in results.items()
+              if result.get('speedup_vs_reference', 1) < 1 - args.max_regression]
+    if slower:
+        print(f"❌ Ο efka_extractor είναι πιο αργός από τα αρχικά regex: {', '.join(slower)}")
+        return 1
+    if args.compare:
+        with open(os.path.join(START_DIR, args.compare), encoding='utf-8') as f:
+            regressions = compare(results, json.load(f), args.max_regression)
+        if regressions:
+            print(f"❌ {len(regressions)} benchmarks χειροτέρεψαν πάνω από {args.max_regression:.0%}")
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,222 @@
+import atexit
+import logging
+import os
+import threading
+import time
+from concurrent.futures import Future
+
+from database import SQLITE
+from insurance_history import InsuranceHistory
+from metrics import metrics
+from migrations import INPUT_COLUMNS, DERIVED_COLUMNS, HISTORY_COLUMN
+from pension_calculator import calculate_greek_pension
+from pension_rules import RULES
+
+STORAGE_FULL = 'full'
+STORAGE_INPUTS = 'inputs'
+
+logger = logging.getLogger(__name__)
+
+
+def encode_cursor(calculation):
+    """Θέση στο ιστορικό για keyset pagination: (created_at, id) της τελευταίας γραμμής"""
+    return f"{calculation['created_at']}|{calculation['id']}"
+
+
+def decode_cursor(cursor):
+    created_at, _, calculation_id = cursor.rpartition('|')
+    return created_at, int(calculation_id)
+
+
+class CalculationStore:
+    """Αποθήκευση και ανάγνωση υπολογισμών.
+
+    Με storage='inputs' γράφονται μόνο οι είσοδοι και το rules_version· τα παράγωγα
+    πεδία υπολογίζονται ξανά στην ανάγνωση. Οι γραμμές με αποθηκευμένα παράγωγα
+    πεδία (storage='full' ή παλαιότερες) επιστρέφονται όπως είναι.
+    Το ιστορικό περιόδων αποθηκεύεται packed (BLOB) και επιστρέφεται ως base64."""
+
+    def __init__(self, db, storage=STORAGE_FULL):
+        if storage not in (STORAGE_FULL, STORAGE_INPUTS):
+            raise ValueError(f'Άγνωστος τρόπος αποθήκευσης: {storage}')
+        self.db = db
+        self.storage = storage
+        columns = ['user_id', 'rules_version'] + INPUT_COLUMNS
+        if storage == STORAGE_FULL:
+            columns += DERIVED_COLUMNS
+        columns.append(HISTORY_COLUMN)
+        self._columns = columns
+        self._insert_sql = (
+            f"INSERT INTO calculations ({', '.join(columns)}) "
+            f"VALUES ({', '.join('?' * len(columns))})"
+        )
+
+    def _row_values(self, user_id, pension_data):
+        history = pension_data.get(HISTORY_COLUMN)
+        values = {
+            'user_id': user_id,
+            'rules_version': RULES.tag,
+            HISTORY_COLUMN: InsuranceHistory.coerce(history).pack() if history else None,
+        }
+        return tuple(values[column] if column in values else pension_data[column]
+                     for column in self._columns)
+
+    def save(self, user_id, pension_data):
+        with metrics.timer('db_insert'):
+            return self.db.insert(self._insert_sql, self._row_values(user_id, pension_data))
+
+    def save_many(self, calculations):
+        """Πολλές εγγραφές [(user_id, pension_data), ...] σε μία συναλλαγή (ένα fsync).
+        Τα ids έρχονται από κάθε INSERT (lastrowid / RETURNING id), στη σειρά εισόδου."""
+        ids = []
+        with metrics.timer('db_batch_insert'), self.db.transaction() as conn:
+            for user_id, pension_data in calculations:
+                values = self._row_values(user_id, pension_data)
+                if self.db.backend == SQLITE:
+                    ids.append(conn.execute(self._insert_sql, values).lastrowid)
+                else:
+                    ids.append(self.db.run(conn, self._insert_sql + ' RETURNING id', values).fetchone()['id'])
+        return ids
+
+    @staticmethod
+    def _record(row):
+        calculation = dict(row)
+        if calculation.get(HISTORY_COLUMN) is not None:
+            calculation[HISTORY_COLUMN] = InsuranceHistory.unpack(calculation[HISTORY_COLUMN]).to_text()
+        if calculation['total_pension'] is None:
+            recomputed = calculate_greek_pension(calculation)
+            recomputed.pop('data_source')
+            calculation.update(recomputed)
+        return calculation
+
+    def history_page(self, user_id, cursor=None, limit=10):
+        """Μία σελίδα ιστορικού (νεότεροι πρώτα) και ο cursor της επόμενης, ή None.
+        Keyset pagination πάνω στο index (user_id, created_at, id): κάθε σελίδα κοστίζει
+        το ίδιο, όσο παλιά κι αν είναι."""
+        if cursor:
+            created_at, calculation_id = decode_cursor(cursor)
+            rows = self.db.query_all('''
+                SELECT * FROM calculations
+                WHERE user_id = ? AND (created_at < ? OR (created_at = ? AND id < ?))
+                ORDER BY created_at DESC, id DESC
+                LIMIT ?
+            ''', (user_id, created_at, created_at, calculation_id, limit + 1))
+        else:
+            rows = self.db.query_all('''
+                SELECT * FROM calculations
+                WHERE user_id = ?
+                ORDER BY created_at DESC, id DESC
+                LIMIT ?
+            ''', (user_id, limit + 1))
+
+        calculations = [self._record(row) for row in rows[:limit]]
+        next_cursor = encode_cursor(calculations[-1]) if len(rows) > limit else None
+        return calculations, next_cursor
+
+    def count(self, user_id):
+        row = self.db.query_one('SELECT COUNT(*) AS total FROM calculations WHERE user_id = ?', (user_id,))
+        return row['total']
+
+
+class WriteBehindWriter:
+    """Ασύγχρονη αποθήκευση υπολογισμών: οι εγγραφές μπαίνουν σε buffer στη μνήμη
+    και γράφονται σε batches από ένα background thread, όταν μαζευτούν max_batch
+    ή περάσουν flush_interval δευτερόλεπτα. Το save() επιστρέφει Future με το id.
+    Ένα batch που αποτυγχάνει ξαναδοκιμάζεται (retries φορές, με αυξανόμενη αναμονή)
+    και μετά γράφεται γραμμή-γραμμή, ώστε μία κακή εγγραφή να μη χάνει τις υπόλοιπες.
+    Στο κλείσιμο του process (atexit) γράφεται ό,τι έχει μείνει."""
+
+    def __init__(self, store, max_batch=100, flush_interval=1.0, retries=3, retry_delay=0.1):
+        self.store = store
+        self.max_batch = max_batch
+        self.flush_interval = flush_interval
+        self.retries = retries
+        self.retry_delay = retry_delay
+        self._pending = []
+        self._condition = threading.Condition()
+        self._flush_lock = threading.Lock()
+        self._thread = None
+        self._pid = None
+        self._closed = False
+        atexit.register(self.close)
+
+    def _ensure_thread(self):
+        # Το thread ξεκινά στο process που γράφει (μετά το fork των gunicorn workers)
+        if self._thread is None or self._pid != os.getpid():
+            self._pending = []
+            self._pid = os.getpid()
+            self._thread = threading.Thread(target=self._run, name='calculation-writer', daemon=True)
+            self._thread.start()
+
+    def save(self, user_id, pension_data):
+        future = Future()
+        with self._condition:
+            if self._closed:
+                future.set_result(self.store.save(user_id, pension_data))
+                return future
+            self._ensure_thread()
+            self._pending.append((user_id, pension_data, future))
+            if len(self._pending) >= self.max_batch:
+                self._condition.notify()
+        return future
+
+    def _run(self):
+        while True:
+            with self._condition:
+                deadline = time.monotonic() + self.flush_interval
+                while not self._closed and len(self._pending) < self.max_batch:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._condition.wait(remaining)
+                closed = self._closed
+            self.flush()
+            if closed:
+                return
+
+    def flush(self):
+        """Εγγραφή όλων των εκκρεμών υπολογισμών τώρα (π.χ. πριν από ανάγνωση ιστορικού)"""
+        with self._flush_lock:
+            with self._condition:
+                batch, self._pending = self._pending, []
+            if not batch:
+                return
+            ids = self._save_batch(batch)
+            if ids is None:
+                self._save_rows(batch)
+                return
+            for (_, _, future), calculation_id in zip(batch, ids):
+                future.set_result(calculation_id)
+
+    def _save_batch(self, batch):
+        """Τα ids του batch, ή None αν όλες οι προσπάθειες απέτυχαν. Η συναλλαγή
+        γίνεται rollback σε σφάλμα, οπότε η επανάληψη δεν διπλογράφει."""
+        calculations = [(user_id, data) for user_id, data, _ in batch]
+        for attempt in range(self.retries):
+            try:
+                return self.store.save_many(calculations)
+            except Exception as e:
+                logger.warning('Calculation batch write failed (%d rows, attempt %d/%d): %s',
+                               len(batch), attempt + 1, self.retries, e)
+                if attempt < self.retries - 1:
+                    time.sleep(self.retry_delay * 2 ** attempt)
+        return None
+
+    def _save_rows(self, batch):
+        logger.error('Calculation batch write failed %d times, saving %d rows one by one',
+                     self.retries, len(batch))
+        for user_id, pension_data, future in batch:
+            try:
+                future.set_result(self.store.save(user_id, pension_data))
+            except Exception as e:
+                logger.exception('Calculation write failed for user %s', user_id)
+                future.set_exception(e)
+
+    def close(self):
+        with self._condition:
+            self._closed = True
+            self._condition.notify()
+            thread = self._thread if self._pid == os.getpid() else None
+        if thread is not None:
+            thread.join(timeout=10)
+        self.flush()
@@ -2,8 +2,19 @@ import os
 
 class Config:
     SECRET_KEY = os.environ.get('SECRET_KEY') or 'dev-secret-key-12345-change-in-production'
-    SQLALCHEMY_DATABASE_URI = os.environ.get('DATABASE_URL') or 'sqlite:///pension_calculator.db'
+    DATABASE_URL = os.environ.get('DATABASE_URL') or 'sqlite:///pension_calculator.db'
+    SQLALCHEMY_DATABASE_URI = DATABASE_URL
+    # 'full': αποθήκευση και των παράγωγων πεδίων, 'inputs': μόνο είσοδοι + rules_version
+    CALCULATION_STORAGE = os.environ.get('CALCULATION_STORAGE') or 'full'
+    HISTORY_PAGE_SIZE = int(os.environ.get('HISTORY_PAGE_SIZE') or 10)
+    # Write-behind αποθήκευση υπολογισμών σε batches
+    CALCULATION_WRITE_BEHIND = os.environ.get('CALCULATION_WRITE_BEHIND', 'true').lower() == 'true'
+    CALCULATION_FLUSH_SIZE = int(os.environ.get('CALCULATION_FLUSH_SIZE') or 100)
+    CALCULATION_FLUSH_INTERVAL = float(os.environ.get('CALCULATION_FLUSH_INTERVAL') or 1.0)
     SQLALCHEMY_TRACK_MODIFICATIONS = False
+    # Migrations μία φορά στο master του gunicorn (gunicorn.conf.py), πριν από το fork.
+    # Με False το σχήμα ενημερώνεται μόνο με 'flask --app app migrate' (π.χ. rolling deploys)
+    MIGRATE_ON_START = os.environ.get('MIGRATE_ON_START', 'true').lower() == 'true'
     
     # Email Configuration
     MAIL_SERVER = os.environ.get('MAIL_SERVER') or 'smtp.gmail.com'
@@ -12,3 +23,60 @@ class Config:
     MAIL_USERNAME = os.environ.get('MAIL_USERNAME')
     MAIL_PASSWORD = os.environ.get('MAIL_PASSWORD')
     MAIL_DEFAULT_SENDER = os.environ.get('MAIL_DEFAULT_SENDER') or 'noreply@pensioncalculator.com'
+
+    # Background Extraction Jobs
+    JOB_WORKERS = int(os.environ.get('JOB_WORKERS') or 2)
+    JOB_POLL_INTERVAL = int(os.environ.get('JOB_POLL_INTERVAL') or 2)
+    JOB_STALE_SECONDS = int(os.environ.get('JOB_STALE_SECONDS') or 900)
+    # Τα αρχεία των εργασιών μένουν μόνο ως την εξαγωγή· ο φάκελος καθαρίζεται στην εκκίνηση
+    JOB_UPLOAD_FOLDER = os.environ.get('JOB_UPLOAD_FOLDER') or os.path.join('uploads', 'jobs')
+
+    # OCR
+    OCR_WORKERS = int(os.environ.get('OCR_WORKERS') or os.cpu_count() or 2)
+    OCR_MAX_PAGES_PER_REQUEST = int(os.environ.get('OCR_MAX_PAGES_PER_REQUEST') or 4)
+    # Εικόνες: όριο pixels πριν από την αποκωδικοποίηση, μέγιστη πλευρά για OCR, σελίδες TIFF
+    IMAGE_MAX_PIXELS = int(os.environ.get('IMAGE_MAX_PIXELS') or 40000000)
+    IMAGE_OCR_MAX_SIDE = int(os.environ.get('IMAGE_OCR_MAX_SIDE') or 2500)
+    IMAGE_MAX_FRAMES = int(os.environ.get('IMAGE_MAX_FRAMES') or 20)
+
+    # Metrics: με πολλούς gunicorn workers οι μετρητές αθροίζονται σε κοινό αρχείο SQLite
+    METRICS_DB_PATH = os.environ.get('METRICS_DB_PATH') or 'metrics.db'
+    METRICS_PUBLISH_SECONDS = float(os.environ.get('METRICS_PUBLISH_SECONDS') or 5.0)
+
+    # Extraction Cache
+    EXTRACTION_CACHE_PATH = os.environ.get('EXTRACTION_CACHE_PATH') or 'extraction_cache.db'
+    EXTRACTION_CACHE_MAX_ENTRIES = int(os.environ.get('EXTRACTION_CACHE_MAX_ENTRIES') or 5000)
+    EXTRACTION_CACHE_MAX_MB = int(os.environ.get('EXTRACTION_CACHE_MAX_MB') or 256)
+    EXTRACTION_CACHE_MAX_AGE_DAYS = int(os.environ.get('EXTRACTION_CACHE_MAX_AGE_DAYS') or 30)
+    # Ιστορικό περιόδων από βεβαιώσεις e-ΕΦΚΑ. Διαβάζει όλες τις σελίδες του πίνακα,
+    # αντί να σταματά μόλις βρεθούν τα βασικά πεδία, γι' αυτό είναι εκτός από προεπιλογή
+    INSURANCE_HISTORY_EXTRACTION = os.environ.get('INSURANCE_HISTORY_EXTRACTION', 'false').lower() == 'true'
+
+    # Pension Rules (versioned JSON rule tables)
+    PENSION_RULES_PATH = os.environ.get('PENSION_RULES_PATH')
+    # Επανυπολογισμός αποθηκευμένων υπολογισμών μετά από αλλαγή κανόνων ('flask rules-backfill')
+    RULES_BACKFILL_CHUNK_SIZE = int(os.environ.get('RULES_BACKFILL_CHUNK_SIZE') or 500)
+    RULES_BACKFILL_PAUSE_MS = int(os.environ.get('RULES_BACKFILL_PAUSE_MS') or 50)
+
+    # Scenario Sweeps (what-if)
+    SCENARIO_MAX_POINTS = int(os.environ.get('SCENARIO_MAX_POINTS') or 2000)
+
+    # PDF Reports (rendered in memory on download, LRU cached per process)
+    REPORT_CACHE_MAX_ENTRIES = int(os.environ.get('REPORT_CACHE_MAX_ENTRIES') or 200)
+    REPORT_CACHE_MAX_MB = int(os.environ.get('REPORT_CACHE_MAX_MB') or 32)
+    REPORT_CACHE_MAX_AGE = int(os.environ.get('REPORT_CACHE_MAX_AGE') or 3600)
+    # Διάρκεια ισχύος του υπογεγραμμένου link λήψης (δευτερόλεπτα)
+    REPORT_LINK_MAX_AGE = int(os.environ.get('REPORT_LINK_MAX_AGE') or 86400)
+    REPORT_FONT_PATH = os.environ.get('REPORT_FONT_PATH') or '/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf'
+    REPORT_BOLD_FONT_PATH = os.environ.get('REPORT_BOLD_FONT_PATH') or '/usr/share/fonts/truetype/dejavu/DejaVuSans-Bold.ttf'
+
+    # SQLite tuning (WAL mode is always on)
+    SQLITE_BUSY_TIMEOUT_MS = int(os.environ.get('SQLITE_BUSY_TIMEOUT_MS') or 5000)
+    SQLITE_CACHE_SIZE_KB = int(os.environ.get('SQLITE_CACHE_SIZE_KB') or 20000)
+    SQLITE_MMAP_SIZE_MB = int(os.environ.get('SQLITE_MMAP_SIZE_MB') or 256)
+    SQLITE_STATEMENT_CACHE = int(os.environ.get('SQLITE_STATEMENT_CACHE') or 256)
+
+    # CSV Import (template format, streamed in chunks)
+    MAX_UPLOAD_MB = int(os.environ.get('MAX_UPLOAD_MB') or 64)
+    CSV_IMPORT_CHUNK_SIZE = int(os.environ.get('CSV_IMPORT_CHUNK_SIZE') or 5000)
+    IMPORT_RESULTS_DIR = os.environ.get('IMPORT_RESULTS_DIR') or 'import_results'
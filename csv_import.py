@@ -0,0 +1,116 @@
+import csv
+import io
+import itertools
+from datetime import datetime
+
+from pension_batch import BATCH_OUTPUT_FIELDS, calculate_pension_batch
+
+# Στήλες του προτύπου /csv-template
+CSV_TEMPLATE_COLUMNS = [
+    'amka', 'first_name', 'last_name', 'birth_date', 'start_date', 'end_date',
+    'employer', 'insurance_days', 'salary_amount', 'fund_code'
+]
+REQUIRED_COLUMNS = ('amka', 'birth_date', 'insurance_days', 'salary_amount')
+
+CSV_DATA_SOURCE = 'Αρχείο CSV'
+
+# Στήλες του αρχείου αποτελεσμάτων: ταυτότητα γραμμής + ό,τι βγάζει το /batch
+IMPORT_OUTPUT_FIELDS = ['row', 'amka'] + BATCH_OUTPUT_FIELDS
+
+DEFAULT_CHUNK_SIZE = 5000
+
+
+def _parse_date(value, field):
+    try:
+        return datetime.strptime(value.strip(), '%Y-%m-%d')
+    except ValueError:
+        raise ValueError(f'Μη έγκυρη ημερομηνία στο {field}: {value!r} (αναμένεται YYYY-MM-DD)')
+
+
+def gender_from_amka(amka):
+    """Το 10ο ψηφίο του ΑΜΚΑ είναι μονό για άνδρες και ζυγό για γυναίκες"""
+    return 'male' if int(amka[9]) % 2 else 'female'
+
+
+def profile_from_template_row(row, current_year=None):
+    """Γραμμή του προτύπου CSV -> προφίλ για το calculate_greek_pension (ValueError αν είναι άκυρη)"""
+    missing = [column for column in REQUIRED_COLUMNS if not (row.get(column) or '').strip()]
+    if missing:
+        raise ValueError(f"Λείπουν πεδία: {', '.join(missing)}")
+
+    amka = row['amka'].strip()
+    if len(amka) != 11 or not amka.isdigit():
+        raise ValueError(f'Μη έγκυρος ΑΜΚΑ: {amka!r}')
+
+    birth_year = _parse_date(row['birth_date'], 'birth_date').year
+    try:
+        insurance_days = int(row['insurance_days'].strip())
+    except ValueError:
+        raise ValueError(f"Μη έγκυρες ημέρες ασφάλισης: {row['insurance_days']!r}")
+    try:
+        salary = float(row['salary_amount'].strip().replace(',', '.'))
+    except ValueError:
+        raise ValueError(f"Μη έγκυρος μισθός: {row['salary_amount']!r}")
+    if insurance_days < 0 or salary < 0:
+        raise ValueError('Οι ημέρες ασφάλισης και ο μισθός δεν μπορεί να είναι αρνητικοί')
+
+    current_year = current_year or datetime.now().year
+    return {
+        'gender': gender_from_amka(amka),
+        'birth_year': birth_year,
+        'current_age': current_year - birth_year,
+        # Ίδια μετατροπή ημερών σε έτη με την εξαγωγή από PDF e-ΕΦΚΑ
+        'insurance_years': round(insurance_days / 365, 1),
+        'heavy_work_years': 0,
+        'salary': salary,
+        'fund': (row.get('fund_code') or 'ika').strip().lower(),
+        'children': 0,
+        'data_source': CSV_DATA_SOURCE,
+    }
+
+
+def iter_template_rows(stream):
+    """Lazy ανάγνωση CSV από binary stream: (αριθμός γραμμής, dict) χωρίς να φορτώνεται όλο το αρχείο"""
+    text = io.TextIOWrapper(stream, encoding='utf-8-sig', newline='')
+    reader = csv.DictReader(text)
+    missing = [column for column in REQUIRED_COLUMNS if column not in (reader.fieldnames or [])]
+    if missing:
+        raise ValueError(f"Το CSV δεν ακολουθεί το πρότυπο - λείπουν στήλες: {', '.join(missing)}")
+    # Γραμμή 1 είναι η κεφαλίδα
+    return enumerate(reader, start=2)
+
+
+def import_template_csv(stream, output, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Υπολογισμός σύνταξης για κάθε γραμμή του CSV, σε chunks σταθερού μεγέθους.
+    Τα αποτελέσματα γράφονται στο text stream output καθώς προχωρά η ανάγνωση,
+    οπότε η μνήμη δεν εξαρτάται από το μέγεθος του αρχείου. Επιστρέφει σύνοψη."""
+    writer = csv.DictWriter(output, fieldnames=IMPORT_OUTPUT_FIELDS, extrasaction='ignore')
+    writer.writeheader()
+    current_year = datetime.now().year
+    summary = {'rows': 0, 'errors': 0, 'first_profile': None}
+
+    rows = iter_template_rows(stream)
+    while True:
+        chunk = list(itertools.islice(rows, chunk_size))
+        if not chunk:
+            break
+
+        records = [None] * len(chunk)
+        profiles, positions = [], []
+        for i, (line_number, row) in enumerate(chunk):
+            records[i] = {'row': line_number, 'amka': (row.get('amka') or '').strip()}
+            try:
+                profiles.append(profile_from_template_row(row, current_year))
+                positions.append(i)
+            except ValueError as e:
+                records[i]['error'] = str(e)
+                summary['errors'] += 1
+
+        if profiles and summary['first_profile'] is None:
+            summary['first_profile'] = profiles[0]
+        for position, result in zip(positions, calculate_pension_batch(profiles)):
+            records[position].update(result)
+
+        writer.writerows(records)
+        summary['rows'] += len(chunk)
+    return summary
@@ -0,0 +1,179 @@
+import os
+import re
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from functools import lru_cache
+from urllib.parse import urlparse
+
+from config import Config
+
+# Graceful import: το PostgreSQL είναι προαιρετικό backend
+try:
+    import psycopg2
+    import psycopg2.extras
+    POSTGRES_AVAILABLE = True
+except ImportError:
+    POSTGRES_AVAILABLE = False
+
+SQLITE = 'sqlite'
+POSTGRES = 'postgresql'
+
+# Πόσες φορές ξαναδοκιμάζεται μια εγγραφή όταν η βάση παραμένει κλειδωμένη
+# μετά το busy_timeout (π.χ. checkpoint του WAL από άλλο worker)
+WRITE_RETRIES = 3
+
+# Ό,τι μετράει για τα placeholders: string literals, quoted ονόματα, σχόλια, '?' και '%'
+_SQL_TOKENS = re.compile(r"'(?:[^']|'')*'|\"(?:[^\"]|\"\")*\"|--[^\n]*|/\*.*?\*/|[?%]", re.S)
+
+
+def connect_sqlite(path, timeout_ms=None):
+    """Σύνδεση SQLite με WAL και ρυθμισμένα pragmas - κοινή για όλες τις βάσεις της εφαρμογής"""
+    timeout_ms = Config.SQLITE_BUSY_TIMEOUT_MS if timeout_ms is None else timeout_ms
+    conn = sqlite3.connect(
+        path, timeout=timeout_ms / 1000,
+        cached_statements=Config.SQLITE_STATEMENT_CACHE,
+        check_same_thread=False
+    )
+    conn.row_factory = sqlite3.Row
+    conn.execute('PRAGMA journal_mode=WAL')
+    # Με WAL, το NORMAL δεν χάνει δεδομένα σε crash της εφαρμογής, μόνο σε διακοπή ρεύματος
+    conn.execute('PRAGMA synchronous=NORMAL')
+    conn.execute(f'PRAGMA busy_timeout={int(timeout_ms)}')
+    conn.execute(f'PRAGMA cache_size={-int(Config.SQLITE_CACHE_SIZE_KB)}')
+    conn.execute(f'PRAGMA mmap_size={int(Config.SQLITE_MMAP_SIZE_MB) * 1024 * 1024}')
+    conn.execute('PRAGMA temp_store=MEMORY')
+    return conn
+
+
+@lru_cache(maxsize=512)
+def postgres_sql(sql, with_params=True):
+    """Το SQLite SQL της εφαρμογής στη διάλεκτο του psycopg2: '?' -> '%s' έξω από
+    literals και σχόλια. Με παραμέτρους το psycopg2 διαβάζει κάθε '%' ως format,
+    ακόμα και μέσα σε literal, οπότε τότε όλα τα '%' γίνονται '%%'."""
+    sql = sql.replace('INTEGER PRIMARY KEY AUTOINCREMENT', 'SERIAL PRIMARY KEY')
+
+    def replace(match):
+        token = match.group(0)
+        if token == '?':
+            return '%s'
+        return token.replace('%', '%%') if with_params else token
+
+    return _SQL_TOKENS.sub(replace, sql)
+
+
+def parse_database_url(url):
+    """(backend, στόχος σύνδεσης) από DATABASE_URL - sqlite:///file.db ή postgresql://..."""
+    parsed = urlparse(url)
+    scheme = parsed.scheme.split('+')[0]
+    if scheme == SQLITE:
+        # sqlite:///relative.db -> relative.db, sqlite:////abs/path.db -> /abs/path.db
+        path = url.split(':///', 1)[1] if ':///' in url else parsed.path
+        return SQLITE, path or ':memory:'
+    if scheme in ('postgres', POSTGRES):
+        return POSTGRES, url
+    raise ValueError(f'Μη υποστηριζόμενη βάση δεδομένων: {parsed.scheme}')
+
+
+class Database:
+    """Πρόσβαση στη βάση με μία σύνδεση ανά thread και ανά process.
+
+    Η σύνδεση ανοίγει μία φορά και ξαναχρησιμοποιείται, οπότε και τα prepared
+    statements του sqlite3 (cached_statements) μένουν ζεστά μεταξύ των requests.
+    Μετά από fork (gunicorn --preload) ο κάθε worker ανοίγει δική του σύνδεση."""
+
+    def __init__(self, url):
+        self.url = url
+        self.backend, self.target = parse_database_url(url)
+        if self.backend == POSTGRES and not POSTGRES_AVAILABLE:
+            raise RuntimeError('Το DATABASE_URL δείχνει PostgreSQL αλλά το psycopg2 δεν είναι εγκατεστημένο')
+        self._local = threading.local()
+
+    @property
+    def sqlite_path(self):
+        return self.target if self.backend == SQLITE else None
+
+    def _connect(self):
+        if self.backend == SQLITE:
+            return connect_sqlite(self.target)
+        conn = psycopg2.connect(self.target, cursor_factory=psycopg2.extras.RealDictCursor)
+        return conn
+
+    def connection(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = self._connect()
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def close(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None and self._local.pid == os.getpid():
+            conn.close()
+        self._local.conn = None
+
+    def run(self, conn, sql, params=()):
+        """Εκτέλεση πάνω σε σύνδεση που έχει ήδη ανοιχτή συναλλαγή (βλ. transaction)"""
+        if self.backend == SQLITE:
+            return conn.execute(sql, params)
+        cursor = conn.cursor()
+        if params:
+            cursor.execute(postgres_sql(sql), params)
+        else:
+            cursor.execute(postgres_sql(sql, with_params=False))
+        return cursor
+
+    def query_all(self, sql, params=()):
+        conn = self.connection()
+        rows = self.run(conn, sql, params).fetchall()
+        if self.backend == POSTGRES:
+            conn.rollback()
+        return rows
+
+    def query_one(self, sql, params=()):
+        conn = self.connection()
+        row = self.run(conn, sql, params).fetchone()
+        if self.backend == POSTGRES:
+            conn.rollback()
+        return row
+
+    @contextmanager
+    def transaction(self):
+        """Εγγραφή ως μία συναλλαγή: commit στο τέλος, rollback σε σφάλμα.
+        Στο SQLite ξεκινά με BEGIN IMMEDIATE, ώστε το lock εγγραφής να παίρνεται αμέσως
+        (με αναμονή busy_timeout) και όχι στη μέση της συναλλαγής."""
+        conn = self.connection()
+        for attempt in range(WRITE_RETRIES):
+            try:
+                if self.backend == SQLITE:
+                    conn.execute('BEGIN IMMEDIATE')
+                break
+            except sqlite3.OperationalError as e:
+                if 'locked' not in str(e) or attempt == WRITE_RETRIES - 1:
+                    raise
+                time.sleep(0.05 * (attempt + 1))
+        try:
+            yield conn
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+
+    def execute(self, sql, params=()):
+        with self.transaction() as conn:
+            self.run(conn, sql, params)
+
+    def executescript(self, statements):
+        with self.transaction() as conn:
+            for sql in statements:
+                self.run(conn, sql, ())
+
+    def insert(self, sql, params=()):
+        """INSERT που επιστρέφει το id της νέας γραμμής"""
+        with self.transaction() as conn:
+            if self.backend == SQLITE:
+                return conn.execute(sql, params).lastrowid
+            cursor = self.run(conn, sql + ' RETURNING id', params)
+            return cursor.fetchone()['id']
@@ -0,0 +1,314 @@
+import re
+import threading
+from collections import namedtuple
+from datetime import datetime
+
+# Κανόνας εξαγωγής. Για κάθε πεδίο ισχύει η σειρά των κανόνων στον πίνακα, όπως
+# στα αρχικά re.search: μετρά μόνο το πρώτο match κάθε κανόνα στο κείμενο και κερδίζει
+# ο πρώτος κανόνας που αυτό δίνει έγκυρη τιμή (confidence: μόνο πληροφορία για τον χρήστη).
+# Με ετικέτα (anchor, π.χ. 'ΗΜΕΡΕΣ') ο κανόνας ελέγχεται μόνο εκεί όπου βρέθηκε η ετικέτα:
+# το pattern είτε αρχίζει από την ετικέτα είτε τελειώνει σε αυτή (π.χ. '(\d{4,5})\s*ΗΜΕΡ',
+# οπότε ψάχνεται από το τελευταίο γράμμα πριν από την ετικέτα ως εδώ - το κομμάτι πριν
+# από την ετικέτα δεν πρέπει να ταιριάζει σε γράμματα). Με anchor None (αριθμός χωρίς
+# ετικέτα) ψάχνεται από τη μηχανή regex μόνο όταν φτάσει η σειρά του.
+# Αν το pattern έχει group, η τιμή είναι το group(1), αλλιώς η σταθερή value.
+EfkaRule = namedtuple('EfkaRule', ['field', 'anchor', 'pattern', 'label', 'confidence', 'value'])
+EfkaRule.__new__.__defaults__ = (None,)
+
+FieldCandidate = namedtuple('FieldCandidate', ['field', 'value', 'position', 'confidence', 'label'])
+
+NUMERIC_ANCHOR = None
+
+# Δύο σκόπιμες διαφορές από τα αρχικά regex:
+# - Τα κεφαλαία φωνήεντα των patterns δέχονται και την τονισμένη μορφή τους
+#   ('ΗΜΕΡΕΣ' ταιριάζει και με 'ΗΜΈΡΕΣ', όπως βγαίνει το 'Ημέρες' από το upper()),
+#   χωρίς επιπλέον πέρασμα στο κείμενο.
+# - Ετικέτα που βρίσκεται ολόκληρη μέσα σε μεγαλύτερη ετικέτα δεν διαβάζεται μόνη της:
+#   το 'FEMALE' δίνει female (τα αρχικά έβρισκαν το 'MALE' μέσα του και έδιναν male).
+_GREEK_VOWEL_CLASSES = {
+    'Α': '[ΑΆ]', 'Ε': '[ΕΈ]', 'Η': '[ΗΉ]', 'Ι': '[ΙΊΪ]',
+    'Ο': '[ΟΌ]', 'Υ': '[ΥΎΫ]', 'Ω': '[ΩΏ]',
+}
+_GREEK_ACCENTS = str.maketrans('ΆΈΉΊΌΎΏΪΫ', 'ΑΕΗΙΟΥΩΙΥ')
+
+# Το τελευταίο γράμμα ενός παραθύρου: μετά από αυτό αρχίζουν οι κανόνες που τελειώνουν σε ετικέτα
+_LAST_LETTER = re.compile(r'[^\W\d_](?=[\W\d_]*\Z)')
+# Αρχικό μέγεθος του παραθύρου όπου ψάχνεται το γράμμα (διπλασιάζεται αν δεν βρεθεί)
+LETTER_LOOKBACK = 64
+
+# Πρώτο capturing group ενός pattern: '(' που δεν είναι escaped ούτε '(?...'
+_CAPTURING_GROUP = re.compile(r'(?<!\\)\((?!\?)')
+
+EFKA_RULES = [
+    # Ημέρες ασφάλισης
+    EfkaRule('insurance_days', 'ΗΜΕΡΕΣ', r'ΗΜΕΡΕΣ[\s:]*(\d{4,5})', 'Greek', 0.9),
+    EfkaRule('insurance_days', 'ΗΜΕΡ', r'(\d{4,5})\s*ΗΜΕΡ', 'Greek', 0.8),
+    EfkaRule('insurance_days', 'DAYS', r'DAYS[\s:]*(\d{4,5})', 'English', 0.9),
+    EfkaRule('insurance_days', 'INSURANCE', r'INSURANCE[\s:]*(\d{4,5})', 'English', 0.6),
+    EfkaRule('insurance_days', NUMERIC_ANCHOR, r'(\d{4,5})', 'Generic', 0.2),
+    # Μισθός
+    EfkaRule('salary', 'ΜΙΣΘΟΣ', r'ΜΙΣΘΟΣ[\s:]*(\d+[,.]?\d*)', 'Greek', 0.9),
+    EfkaRule('salary', 'ΕΥΡ', r'(\d{3,4}[,.]\d{2})\s*ΕΥΡ', 'Greek', 0.8),
+    EfkaRule('salary', 'SALARY', r'SALARY[\s:]*(\d+[,.]?\d*)', 'English', 0.9),
+    EfkaRule('salary', 'EURO', r'(\d{3,4}[,.]\d{2})\s*EURO', 'English', 0.8),
+    EfkaRule('salary', NUMERIC_ANCHOR, r'(\d{3,4}[,.]\d{2})', 'Generic', 0.2),
+    # Έτος γέννησης
+    EfkaRule('birth_year', 'ΓΕΝΝΗΣΗΣ', r'ΓΕΝΝΗΣΗΣ[\s:]*(\d{4})', 'Greek', 0.9),
+    EfkaRule('birth_year', 'BIRTH', r'BIRTH[\s:]*(\d{4})', 'English', 0.9),
+    EfkaRule('birth_year', NUMERIC_ANCHOR, r'(19[5-9]\d)', 'Generic', 0.2),
+    # Φύλο
+    EfkaRule('gender', 'ΑΡΣΕΝ', r'ΑΡΣΕΝ', 'Greek', 0.9, 'male'),
+    EfkaRule('gender', 'MALE', r'MALE', 'English', 0.9, 'male'),
+    EfkaRule('gender', 'ΘΗΛΥ', r'ΘΗΛΥ', 'Greek', 0.8, 'female'),
+    EfkaRule('gender', 'FEMALE', r'FEMALE', 'English', 0.8, 'female'),
+]
+
+
+def _parse_insurance_days(raw):
+    days = int(raw)
+    return days if 1000 <= days <= 40000 else None
+
+
+def _parse_salary(raw):
+    salary = float(raw.replace(',', '.'))
+    return salary if 100 <= salary <= 10000 else None
+
+
+def _parse_birth_year(raw):
+    year = int(raw)
+    return year if 1950 <= year <= 2000 else None
+
+
+# Μετατροπή + έλεγχος εύρους ανά πεδίο (None = άκυρη τιμή)
+FIELD_PARSERS = {
+    'insurance_days': _parse_insurance_days,
+    'salary': _parse_salary,
+    'birth_year': _parse_birth_year,
+    'gender': lambda raw: raw,
+}
+
+
+def _identity(raw):
+    return raw
+
+
+def _accent_insensitive(pattern):
+    # Οι κανόνες δεν χρησιμοποιούν ελληνικά φωνήεντα μέσα σε [...] - αρκεί απλή αντικατάσταση
+    return ''.join(_GREEK_VOWEL_CLASSES.get(char, char) for char in pattern)
+
+
+def _label_variants(label):
+    """Η ετικέτα ως εναλλακτικές που αρχίζουν όλες με σταθερό χαρακτήρα ('ΗΜΕΡΕΣ' ->
+    'ΗΜΕΡΕΣ', 'ΉΜΕΡΕΣ'), ώστε η μηχανή regex να προσπερνά στη C ό,τι δεν αρχίζει ετικέτα"""
+    first, rest = label[0], _accent_insensitive(re.escape(label[1:]))
+    firsts = _GREEK_VOWEL_CLASSES.get(first, first).strip('[]')
+    return [re.escape(char) + rest for char in firsts]
+
+
+def _named_value(pattern, group):
+    """Το πρώτο capturing group του pattern (ή όλο το pattern) ως named group"""
+    if re.search(_CAPTURING_GROUP, pattern):
+        return re.sub(_CAPTURING_GROUP, f'(?P<{group}>', pattern, count=1)
+    return f'(?P<{group}>{pattern})'
+
+
+class EfkaFieldExtractor:
+    """Μηχανή εξαγωγής πεδίων e-ΕΦΚΑ με patterns compiled μία φορά.
+
+    Όλες οι ετικέτες είναι ένα regex (alternation): η μηχανή regex βρίσκει τις
+    ετικέτες και μόνο εκεί τρέχει Python (κανόνες της ετικέτας και parse), ώσπου να
+    βρεθεί το πρώτο match κάθε κανόνα που χρειάζεται. Οι κανόνες χωρίς ετικέτα (σκέτοι
+    αριθμοί) ψάχνονται μόνο για πεδία όπου δεν έδωσε τιμή κανένας προηγούμενος κανόνας."""
+
+    def __init__(self, rules):
+        self._rules = list(rules)
+        self._lock = threading.Lock()
+        self._compile()
+
+    @staticmethod
+    def _combine(indexed_rules):
+        """Όλοι οι κανόνες μιας ετικέτας σε ένα regex: κάθε κανόνας ως προαιρετικό lookahead
+        με δικό του named group, ώστε ένα match() να τους δοκιμάζει όλους"""
+        parts = [f'(?:(?={_named_value(_accent_insensitive(rule.pattern), f"r{index}")})|)'
+                 for index, rule in indexed_rules]
+        regex = re.compile(''.join(parts))
+        groups = tuple(regex.groupindex[f'r{index}'] for index, _ in indexed_rules)
+        return regex, [index for index, _ in indexed_rules], groups
+
+    @staticmethod
+    def _single(rule, suffix=''):
+        """Ένας κανόνας για search(), με την τιμή στο group 'value' (με suffix '\\Z' το
+        match πρέπει να τελειώνει στο endpos, δηλαδή στην ετικέτα)"""
+        return re.compile(f"(?:{_named_value(_accent_insensitive(rule.pattern), 'value')}){suffix}")
+
+    def _compile(self):
+        by_anchor = {}
+        field_rules = {}
+        numeric = {}
+        for index, rule in enumerate(self._rules):
+            field_rules.setdefault(rule.field, []).append(index)
+            if rule.anchor is NUMERIC_ANCHOR:
+                numeric[index] = self._single(rule)
+                continue
+            label = self.normalize(rule.anchor)
+            leading, trailing = by_anchor.setdefault(label, ([], []))
+            pattern = self.normalize(rule.pattern)
+            if pattern.startswith(label):
+                leading.append((index, rule))
+            elif pattern.endswith(label):
+                trailing.append((index, rule))
+            else:
+                raise ValueError(f'Ο κανόνας {rule.pattern} δεν αρχίζει ούτε τελειώνει στην ετικέτα {rule.anchor}')
+
+        # Μεγαλύτερες ετικέτες πρώτα, ώστε στην ίδια θέση να βρίσκεται η μεγαλύτερη
+        labels = sorted(by_anchor, key=len, reverse=True)
+        alternatives = [variant for label in labels for variant in _label_variants(label)]
+
+        # Στη θέση μιας ετικέτας ισχύουν και οι κανόνες των ετικετών που είναι πρόθεμά της
+        # ('ΗΜΕΡ' μέσα στο 'ΗΜΕΡΕΣ')
+        self._anchor_rules = {}
+        for label in labels:
+            prefixes = [other for other in labels if label.startswith(other)]
+            leading = sorted(rule for other in prefixes for rule in by_anchor[other][0])
+            trailing = [(len(other), index, self._single(rule, r'\Z'))
+                        for other in prefixes for index, rule in by_anchor[other][1]]
+            self._anchor_rules[label] = (self._combine(leading) if leading else None, trailing)
+        self._label_regex = re.compile('|'.join(alternatives)) if alternatives else None
+        self._field_rules = field_rules
+        self._numeric = numeric
+
+    def register_rule(self, rule):
+        """Προσθήκη νέας ετικέτας e-ΕΦΚΑ χωρίς επιπλέον πέρασμα στο κείμενο.
+        Ο κανόνας μπαίνει τελευταίος στη σειρά προτεραιότητας του πεδίου του"""
+        with self._lock:
+            self._rules.append(rule)
+            self._compile()
+
+    @staticmethod
+    def normalize(text):
+        return text.upper().translate(_GREEK_ACCENTS)
+
+    def _candidate(self, index, raw, position):
+        """Η υποψήφια τιμή ενός match του κανόνα index, ή None αν είναι εκτός ορίων"""
+        rule = self._rules[index]
+        value = FIELD_PARSERS.get(rule.field, _identity)(raw if rule.value is None else rule.value)
+        if value is None:
+            return None
+        return FieldCandidate(rule.field, value, position, rule.confidence, rule.label)
+
+    @staticmethod
+    def _after_last_letter(clean_text, position):
+        """Η θέση μετά από το τελευταίο γράμμα πριν από το position (0 αν δεν υπάρχει)"""
+        lookback = LETTER_LOOKBACK
+        while True:
+            low = max(0, position - lookback)
+            letter = _LAST_LETTER.search(clean_text, low, position)
+            if letter is not None:
+                return letter.end()
+            if low == 0:
+                return 0
+            lookback *= 2
+
+    def _scan_labels(self, clean_text):
+        """Το πρώτο match κάθε κανόνα με ετικέτα, με τη σειρά του κειμένου, ως
+        (index, υποψήφια τιμή ή None αν η τιμή του είναι εκτός ορίων)"""
+        if self._label_regex is None:
+            return
+        anchor_rules = self._anchor_rules
+        found = set()
+        covered = 0
+        anchor = self._label_regex.search(clean_text)
+        while anchor is not None:
+            position, end = anchor.span()
+            # Οι εμφανίσεις μπορεί να επικαλύπτονται ('DAYSALARY'), εκτός από ετικέτα
+            # ολόκληρη μέσα σε προηγούμενη μεγαλύτερη ('MALE' στο 'FEMALE')
+            if end > covered:
+                covered = end
+                leading, trailing = anchor_rules[anchor.group().translate(_GREEK_ACCENTS)]
+                start = None
+                for label_length, index, regex in trailing:
+                    if index in found:
+                        continue
+                    if start is None:
+                        start = self._after_last_letter(clean_text, position)
+                    match = regex.search(clean_text, start, position + label_length)
+                    if match is not None:
+                        found.add(index)
+                        yield index, self._candidate(index, match.group('value'), match.start())
+                if leading is not None:
+                    regex, indices, groups = leading
+                    match = regex.match(clean_text, position)
+                    values = match.group(*groups) if len(groups) > 1 else (match.group(groups[0]),)
+                    for index, raw in zip(indices, values):
+                        if raw is not None and index not in found:
+                            found.add(index)
+                            yield index, self._candidate(index, raw, position)
+            anchor = self._label_regex.search(clean_text, position + 1)
+
+    def _search_numeric(self, index, clean_text):
+        match = self._numeric[index].search(clean_text)
+        return self._candidate(index, match.group('value'), match.start()) if match is not None else None
+
+    def _decide(self, field, clean_text, first, best, complete):
+        """Ο πρώτος κανόνας του πεδίου που το πρώτο του match δίνει έγκυρη τιμή.
+        False όσο κάποιος προηγούμενος κανόνας με ετικέτα μπορεί ακόμα να βρεθεί
+        (complete: η σάρωση των ετικετών τελείωσε, ό,τι δεν βρέθηκε δεν υπάρχει)"""
+        for index in self._field_rules[field]:
+            if index not in first:
+                if index in self._numeric:
+                    first[index] = self._search_numeric(index, clean_text)
+                elif complete:
+                    continue
+                else:
+                    return False
+            if first[index] is not None:
+                best[field] = first[index]
+                return True
+        return True
+
+    def find_candidates(self, text):
+        """Το πρώτο match κάθε κανόνα που δίνει έγκυρη τιμή, με θέση και βαθμό εμπιστοσύνης"""
+        clean_text = text.upper()
+        candidates = [candidate for _, candidate in self._scan_labels(clean_text)]
+        candidates.extend(self._search_numeric(index, clean_text) for index in self._numeric)
+        candidates = [candidate for candidate in candidates if candidate is not None]
+        candidates.sort(key=lambda candidate: candidate.position)
+        return candidates
+
+    def find_best(self, text):
+        """Η τιμή κάθε πεδίου με τη σειρά προτεραιότητας των κανόνων: οι ετικέτες
+        σταματούν μόλις αποφασιστούν όλα τα πεδία"""
+        clean_text = text.upper()
+        first = {}
+        best = {}
+        pending = set(self._field_rules)
+        for index, candidate in self._scan_labels(clean_text):
+            first[index] = candidate
+            field = self._rules[index].field
+            if field in pending and self._decide(field, clean_text, first, best, False):
+                pending.discard(field)
+                if not pending:
+                    break
+        for field in pending:
+            self._decide(field, clean_text, first, best, True)
+        return best
+
+    def extract(self, text):
+        """Πεδία e-ΕΦΚΑ (με παράγωγα πεδία) και η υποψήφια τιμή που επιλέχθηκε για το καθένα"""
+        best = self.find_best(text)
+        data = {}
+        if 'insurance_days' in best:
+            data['insurance_days'] = best['insurance_days'].value
+            data['insurance_years'] = round(best['insurance_days'].value / 365, 1)
+        if 'salary' in best:
+            data['salary'] = best['salary'].value
+        if 'birth_year' in best:
+            data['birth_year'] = best['birth_year'].value
+            data['current_age'] = datetime.now().year - best['birth_year'].value
+        for field, candidate in best.items():
+            if field not in data and field not in ('insurance_days', 'birth_year'):
+                data[field] = candidate.value
+        return data, best
+
+
+efka_extractor = EfkaFieldExtractor(EFKA_RULES)
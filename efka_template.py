@@ -0,0 +1,260 @@
+import re
+from collections import namedtuple
+from datetime import datetime
+
+from efka_patterns import EfkaFieldExtractor, FIELD_PARSERS
+from insurance_history import DAYS_PER_MONTH, InsuranceHistory
+
+# Template μιας βεβαίωσης e-ΕΦΚΑ (layout του pdfplumber):
+#  - signature: φράσεις που αναγνωρίζουν το έγγραφο στην επικεφαλίδα της 1ης σελίδας
+#  - header_fraction: τι ποσοστό του ύψους της σελίδας είναι η επικεφαλίδα
+#  - label_fields: (πεδίο, ετικέτα) - η τιμή είναι δεξιά της ετικέτας, στην ίδια γραμμή
+#  - period_column / days_column / earnings_column: επικεφαλίδες στηλών του πίνακα
+#    περιόδων ασφάλισης (αρχή περιόδου, ημέρες, αποδοχές)
+#  - total_row: η πρώτη στήλη της γραμμής συνόλων
+#  - newest_first: οι περίοδοι είναι ταξινομημένες από την πιο πρόσφατη
+EfkaTemplate = namedtuple('EfkaTemplate', [
+    'name', 'signature', 'header_fraction', 'label_fields',
+    'period_column', 'days_column', 'earnings_column', 'total_row', 'newest_first'
+])
+
+EFKA_TEMPLATES = [
+    EfkaTemplate(
+        name='efka_insurance_record',
+        signature=('ΑΣΦΑΛΙΣΤΙΚΟ ΙΣΤΟΡΙΚΟ', 'ΑΤΟΜΙΚΟΣ ΛΟΓΑΡΙΑΣΜΟΣ', 'ΒΕΒΑΙΩΣΗ ΑΣΦΑΛΙΣΤΙΚΟΥ ΧΡΟΝΟΥ'),
+        header_fraction=0.35,
+        label_fields=(
+            ('birth_year', 'ΗΜΕΡΟΜΗΝΙΑ ΓΕΝΝΗΣΗΣ'),
+            ('gender', 'ΦΥΛΟ'),
+            ('insurance_days', 'ΣΥΝΟΛΟ ΗΜΕΡΩΝ ΑΣΦΑΛΙΣΗΣ'),
+        ),
+        period_column='ΑΠΟ',
+        days_column='ΗΜΕΡΕΣ',
+        earnings_column='ΑΠΟΔΟΧΕΣ',
+        total_row='ΣΥΝΟΛΟ',
+        newest_first=True,
+    ),
+]
+
+# Ανοχή (pt) για λέξεις στην ίδια γραμμή και πόσες λέξεις μετά την ετικέτα είναι η τιμή
+LINE_TOLERANCE = 3
+VALUE_WORDS = 3
+# Απόκλιση (κλάσμα) ημερών ιστορικού από το σύνολο της βεβαίωσης που γίνεται δεκτή
+HISTORY_DAYS_TOLERANCE = 0.01
+
+_DATE = re.compile(r'\d{1,2}[/.-]\d{1,2}[/.-](\d{4})')
+_YEAR = re.compile(r'(?<!\d)(\d{4})(?!\d)')
+_NUMBER = re.compile(r'\d[\d.,]*')
+# Αρχή περιόδου: 01/03/2015, 03/2015 ή 03-2015 -> (μήνας, έτος)
+_PERIOD = re.compile(r'(?:\d{1,2}[/.-])?(\d{1,2})[/.-](\d{4})')
+
+
+def _normalize(text):
+    return EfkaFieldExtractor.normalize(text or '').strip(' :')
+
+
+def _greek_number(text):
+    """'1.234,56' / '1234,56' / '1234.56' -> '1234.56' (str για τους FIELD_PARSERS)"""
+    match = _NUMBER.search(text or '')
+    if not match:
+        return None
+    raw = match.group().rstrip('.,')
+    if ',' in raw:
+        raw = raw.replace('.', '').replace(',', '.')
+    elif raw.count('.') > 1 or re.fullmatch(r'\d{1,3}\.\d{3}', raw):
+        raw = raw.replace('.', '')
+    return raw
+
+
+def _parse_period(text):
+    match = _PERIOD.search(text or '')
+    if not match:
+        return None
+    month, year = int(match.group(1)), int(match.group(2))
+    return (year, month) if 1 <= month <= 12 else None
+
+
+def _parse_label_value(field, text):
+    """Τιμή δίπλα σε ετικέτα -> έγκυρη τιμή πεδίου ή None (ίδιοι έλεγχοι εύρους με τα regex)"""
+    if field == 'gender':
+        value = _normalize(text)
+        if value.startswith(('ΑΡ', 'ΑΝΔ', 'MALE', 'M')):
+            return 'male'
+        if value.startswith(('ΘΗΛ', 'ΓΥΝ', 'FEMALE', 'F')):
+            return 'female'
+        return None
+    if field == 'birth_year':
+        match = _DATE.search(text) or _YEAR.search(text)
+        raw = match.group(1) if match else None
+    else:
+        raw = _greek_number(text)
+    if raw is None:
+        return None
+    try:
+        return FIELD_PARSERS[field](raw)
+    except ValueError:
+        return None
+
+
+def _crop(page, start, end):
+    """Λωρίδα της σελίδας σε όλο το πλάτος, από start έως end (κλάσματα του ύψους)"""
+    x0, top, x1, bottom = page.bbox
+    height = bottom - top
+    return page.crop((x0, top + start * height, x1, top + end * height))
+
+
+def _lines(words):
+    """Λέξεις του pdfplumber ομαδοποιημένες σε γραμμές (από πάνω προς τα κάτω, αριστερά προς δεξιά)"""
+    lines = []
+    for word in sorted(words, key=lambda word: (word['top'], word['x0'])):
+        if lines and abs(lines[-1][0]['top'] - word['top']) <= LINE_TOLERANCE:
+            lines[-1].append(word)
+        else:
+            lines.append([word])
+    return [sorted(line, key=lambda word: word['x0']) for line in lines]
+
+
+def _find_label_values(lines, label_fields):
+    """Για κάθε ετικέτα: το κείμενο των VALUE_WORDS λέξεων δεξιά της, στην ίδια γραμμή"""
+    found = {}
+    for field, label in label_fields:
+        tokens = label.split()
+        for line in lines:
+            texts = [_normalize(word['text']) for word in line]
+            for start in range(len(texts) - len(tokens) + 1):
+                if texts[start:start + len(tokens)] == tokens:
+                    value_words = line[start + len(tokens):start + len(tokens) + VALUE_WORDS]
+                    value = _parse_label_value(field, ' '.join(word['text'] for word in value_words))
+                    if value is not None:
+                        found[field] = value
+                    break
+            if field in found:
+                break
+    return found
+
+
+class TemplateTableState:
+    """Άθροισμα του πίνακα περιόδων σε όσες σελίδες διαβάστηκαν και, αν ζητήθηκε,
+    το ιστορικό ανά περίοδο"""
+
+    def __init__(self, collect_history=False):
+        self.period_column = None
+        self.days_column = None
+        self.earnings_column = None
+        self.days_sum = 0
+        self.total_days = None
+        self.latest_salary = None
+        self.history = InsuranceHistory() if collect_history else None
+
+
+def _cell(row, index):
+    return row[index] if index is not None and index < len(row) else None
+
+
+def _column(texts, title):
+    # Σύγκριση λέξεων, όχι substring: το 'ΑΠΟ' δεν πρέπει να ταιριάζει στο 'ΑΠΟΔΟΧΕΣ'
+    return next((index for index, text in enumerate(texts) if title in text.split()), None)
+
+
+def _read_table(table, template, state):
+    for row in table:
+        texts = [_normalize(cell) for cell in row]
+        days_column = _column(texts, template.days_column)
+        earnings_column = _column(texts, template.earnings_column)
+        if days_column is not None and earnings_column is not None and days_column != earnings_column:
+            # Η κεφαλίδα επαναλαμβάνεται σε κάθε σελίδα
+            state.days_column, state.earnings_column = days_column, earnings_column
+            state.period_column = _column(texts, template.period_column)
+            continue
+        if state.days_column is None:
+            continue
+        first = next((text for text in texts if text), '')
+        days_raw = _greek_number(_cell(row, state.days_column))
+        if first.startswith(template.total_row):
+            if days_raw is not None:
+                state.total_days = int(float(days_raw))
+            continue
+        if days_raw is None:
+            continue
+        days = int(float(days_raw))
+        state.days_sum += days
+        earnings_raw = _greek_number(_cell(row, state.earnings_column))
+        if state.history is not None:
+            period = _parse_period(_cell(row, state.period_column))
+            if period is not None:
+                earnings = float(earnings_raw) if earnings_raw is not None else 0.0
+                state.history.append(period[0], period[1], days, earnings)
+        if days > 0 and earnings_raw is not None:
+            monthly = round(float(earnings_raw) / days * DAYS_PER_MONTH, 2)
+            if state.latest_salary is None or not template.newest_first:
+                state.latest_salary = monthly
+
+
+def _finish(data, state):
+    if 'insurance_days' not in data:
+        days = state.total_days if state.total_days is not None else state.days_sum
+        value = FIELD_PARSERS['insurance_days'](str(days)) if days else None
+        if value is not None:
+            data['insurance_days'] = value
+    if 'salary' not in data and state.latest_salary is not None:
+        value = FIELD_PARSERS['salary'](str(state.latest_salary))
+        if value is not None:
+            data['salary'] = value
+    # Το ιστορικό καθορίζει τα έτη ασφάλισης στον υπολογισμό: κρατιέται μόνο αν
+    # καλύπτει το σύνολο ημερών της βεβαίωσης (όχι πίνακας που διαβάστηκε μισός)
+    if state.history and 'insurance_days' in data:
+        expected = data['insurance_days']
+        if abs(sum(state.history.days) - expected) <= HISTORY_DAYS_TOLERANCE * expected:
+            data['insurance_history'] = state.history.to_text()
+
+
+def match_template(first_page, templates=EFKA_TEMPLATES):
+    """Το template της βεβαίωσης (από την επικεφαλίδα της 1ης σελίδας) και οι γραμμές της, ή (None, None)"""
+    for template in templates:
+        header = _crop(first_page, 0, template.header_fraction)
+        lines = _lines(header.extract_words())
+        header_text = '\n'.join(' '.join(_normalize(word['text']) for word in line) for line in lines)
+        if any(signature in header_text for signature in template.signature):
+            return template, lines
+    return None, None
+
+
+def extract_template_fields(pages, templates=EFKA_TEMPLATES, collect_history=False):
+    """Εξαγωγή πεδίων από βεβαίωση e-ΕΦΚΑ με γνωστό layout: ετικέτες μόνο στην
+    επικεφαλίδα της 1ης σελίδας, πίνακες περιόδων μόνο κάτω από αυτή, και τέλος
+    ανάγνωσης μόλις βρεθούν όλα τα πεδία. Επιστρέφει (πεδία, σελίδες που διαβάστηκαν).
+    Αν το έγγραφο δεν αναγνωρίζεται, ({}, 1) μετά από μία μόνο επικεφαλίδα.
+    Με collect_history διαβάζονται όλες οι σελίδες του πίνακα, ώστε το
+    'insurance_history' (base64, βλ. InsuranceHistory) να έχει όλες τις περιόδους."""
+    pages = iter(pages)
+    first_page = next(pages, None)
+    if first_page is None:
+        return {}, 0
+    template, header_lines = match_template(first_page, templates)
+    if template is None:
+        return {}, 1
+
+    data = _find_label_values(header_lines, template.label_fields)
+    state = TemplateTableState(collect_history)
+    pages_read = 0
+    page = first_page
+    while page is not None:
+        pages_read += 1
+        start = template.header_fraction if page is first_page else 0
+        for table in _crop(page, start, 1).extract_tables():
+            _read_table(table, template, state)
+        # Το άθροισμα ημερών χρειάζεται όλες τις σελίδες - εκτός αν υπάρχει ήδη σύνολο,
+        # και ο μισθός είναι τελικός μόνο αν η πιο πρόσφατη περίοδος είναι πρώτη
+        days_known = 'insurance_days' in data or state.total_days is not None
+        salary_known = state.latest_salary is not None and template.newest_first
+        history_pending = state.history is not None and state.period_column is not None
+        if days_known and salary_known and 'birth_year' in data and not history_pending:
+            break
+        page = next(pages, None)
+
+    _finish(data, state)
+    if 'insurance_days' in data:
+        data['insurance_years'] = round(data['insurance_days'] / 365, 1)
+    if 'birth_year' in data:
+        data['current_age'] = datetime.now().year - data['birth_year']
+    return data, pages_read
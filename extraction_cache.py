@@ -0,0 +1,129 @@
+import hashlib
+import json
+import threading
+import time
+
+from database import connect_sqlite
+
+HASH_CHUNK_SIZE = 1024 * 1024
+
+
+def content_hash(file_content):
+    """SHA-256 του περιεχομένου αρχείου"""
+    return hashlib.sha256(file_content).hexdigest()
+
+
+def file_content_hash(file_path):
+    """SHA-256 αρχείου στο δίσκο, σε chunks ώστε να μη φορτώνεται όλο στη μνήμη"""
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class ExtractionCache:
+    """Cache αποτελεσμάτων εξαγωγής με κλειδί (hash περιεχομένου, έκδοση extractor)"""
+
+    def __init__(self, db_path, max_entries=5000, max_bytes=256 * 1024 * 1024,
+                 max_age_days=30, evict_every=50):
+        self.db_path = db_path
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.max_age_seconds = max_age_days * 24 * 3600
+        self.evict_every = evict_every
+        self._schema_ready = False
+        self._puts = 0
+        self._lock = threading.Lock()
+
+    def _connect(self):
+        conn = connect_sqlite(self.db_path, timeout_ms=30000)
+        if not self._schema_ready:
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS extraction_cache (
+                    content_hash TEXT NOT NULL,
+                    extractor_version TEXT NOT NULL,
+                    fields TEXT NOT NULL,
+                    size INTEGER NOT NULL,
+                    created_at REAL NOT NULL,
+                    last_access REAL NOT NULL,
+                    hits INTEGER DEFAULT 0,
+                    PRIMARY KEY (content_hash, extractor_version)
+                )
+            ''')
+            conn.execute('''
+                CREATE INDEX IF NOT EXISTS idx_extraction_cache_last_access
+                ON extraction_cache (last_access)
+            ''')
+            conn.commit()
+            self._schema_ready = True
+        return conn
+
+    def get(self, digest, extractor_version):
+        """Επιστρέφει τα αποθηκευμένα πεδία ή None"""
+        conn = self._connect()
+        try:
+            row = conn.execute('''
+                SELECT fields, created_at FROM extraction_cache
+                WHERE content_hash = ? AND extractor_version = ?
+            ''', (digest, extractor_version)).fetchone()
+            if row is None:
+                return None
+            now = time.time()
+            if now - row[1] > self.max_age_seconds:
+                return None
+            conn.execute('''
+                UPDATE extraction_cache SET last_access = ?, hits = hits + 1
+                WHERE content_hash = ? AND extractor_version = ?
+            ''', (now, digest, extractor_version))
+            conn.commit()
+            return json.loads(row[0])
+        finally:
+            conn.close()
+
+    def put(self, digest, extractor_version, fields):
+        fields_json = json.dumps(fields, ensure_ascii=False)
+        size = len(fields_json)
+        now = time.time()
+        conn = self._connect()
+        try:
+            conn.execute('''
+                INSERT OR REPLACE INTO extraction_cache
+                (content_hash, extractor_version, fields, size, created_at, last_access)
+                VALUES (?, ?, ?, ?, ?, ?)
+            ''', (digest, extractor_version, fields_json, size, now, now))
+            conn.commit()
+        finally:
+            conn.close()
+
+        with self._lock:
+            self._puts += 1
+            should_evict = self._puts % self.evict_every == 0
+        if should_evict:
+            self.evict()
+
+    def evict(self):
+        """Διαγραφή ληγμένων εγγραφών και των λιγότερο πρόσφατων πάνω από τα όρια"""
+        conn = self._connect()
+        try:
+            conn.execute('DELETE FROM extraction_cache WHERE created_at < ?',
+                         (time.time() - self.max_age_seconds,))
+            conn.execute('''
+                DELETE FROM extraction_cache WHERE rowid IN (
+                    SELECT rowid FROM extraction_cache
+                    ORDER BY last_access DESC
+                    LIMIT -1 OFFSET ?
+                )
+            ''', (self.max_entries,))
+            conn.execute('''
+                DELETE FROM extraction_cache WHERE rowid IN (
+                    SELECT entry_rowid FROM (
+                        SELECT rowid AS entry_rowid,
+                               SUM(size) OVER (ORDER BY last_access DESC) AS running_size
+                        FROM extraction_cache
+                    ) WHERE running_size > ?
+                )
+            ''', (self.max_bytes,))
+            conn.commit()
+        finally:
+            conn.close()
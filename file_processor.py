@@ -1,59 +1,122 @@
 import json
 import csv
 import io
+import mmap
+import os
 import re
+import threading
+from collections import deque
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 
-# Graceful imports για Render compatibility
-try:
-    import pdfplumber
-    PDFPLUMBER_AVAILABLE = True
-except ImportError:
-    PDFPLUMBER_AVAILABLE = False
-    print("⚠️  pdfplumber not available")
+from config import Config
+from extraction_cache import ExtractionCache, content_hash, file_content_hash
+from efka_patterns import efka_extractor
+from efka_template import extract_template_fields
+from pdf_scanner import scan_pdf_bytes
+from csv_import import iter_template_rows, profile_from_template_row
+from json_import import iter_json_records, iter_profiles, profile_from_record
+from image_processor import ImageProcessor, IMAGE_EXTENSIONS
+from backends import available, optional_module
+from metrics import metrics, PAGES, EXTRACTED_CHARS, EXTRACTED_FIELDS, EXTRACTION_CACHE
 
-try:
-    import pytesseract
-    PYTESSERACT_AVAILABLE = True
-except ImportError:
-    PYTESSERACT_AVAILABLE = False
-    print("⚠️  pytesseract not available")
+# Τα backends εξαγωγής (pdfplumber, pytesseract, pdf2image) φορτώνονται στην πρώτη
+# χρήση - graceful: χωρίς αυτά η εξαγωγή συνεχίζει με τα basic patterns
+def text_layer_available():
+    return available('pdfplumber')
 
-try:
-    from pdf2image import convert_from_bytes
-    PDF2IMAGE_AVAILABLE = True
-except ImportError:
-    PDF2IMAGE_AVAILABLE = False
-    print("⚠️  pdf2image not available")
+def ocr_available():
+    return available('pytesseract', 'pdf2image')
+
+# Ρυθμίσεις OCR: μία συνδυασμένη γλώσσα, μία rasterization ανά σελίδα
+OCR_LANGUAGES = 'ell+eng'
+OCR_DPI = 200
+
+# Tiered εξαγωγή: τα πεδία που αρκούν για να σταματήσει η ανάλυση
+REQUIRED_FIELDS = ('insurance_days', 'salary', 'birth_year')
+TIER_TEMPLATE = 'template'
+TIER_TEXT_LAYER = 'text_layer'
+TIER_OCR = 'ocr'
+TIER_BASIC_PATTERNS = 'basic_patterns'
+
+def _bytes_in_range(low, high, convert):
+    def accept(raw):
+        value = convert(raw.replace(b',', b'.'))
+        return value if low <= value <= high else None
+    return accept
+
+# Patterns του basic tier - compiled μία φορά, πάνω σε bytes
+BASIC_BYTE_PATTERNS = {
+    'insurance_days': (re.compile(rb'(?<!\d)(\d{4,5})(?!\d)'), _bytes_in_range(1000, 40000, int)),
+    'salary': (re.compile(rb'(?<!\d)(\d{3,4}[,.]\d{2})(?!\d)'), _bytes_in_range(100, 10000, float)),
+    'birth_year': (re.compile(rb'(?<!\d)(19[5-9]\d)(?!\d)'), _bytes_in_range(1950, 2000, int)),
+}
+
+# Αλλάζει σε κάθε αλλαγή της λογικής εξαγωγής, ώστε να ακυρώνεται το cache
+EXTRACTOR_VERSION = '2025.10-9'
+# Με το ιστορικό περιόδων αλλάζει το αποτέλεσμα, οπότε είναι μέρος του κλειδιού του cache
+CACHE_VERSION = f'{EXTRACTOR_VERSION}+history' if Config.INSURANCE_HISTORY_EXTRACTION else EXTRACTOR_VERSION
+
+extraction_cache = ExtractionCache(
+    Config.EXTRACTION_CACHE_PATH,
+    max_entries=Config.EXTRACTION_CACHE_MAX_ENTRIES,
+    max_bytes=Config.EXTRACTION_CACHE_MAX_MB * 1024 * 1024,
+    max_age_days=Config.EXTRACTION_CACHE_MAX_AGE_DAYS
+)
+
+# Κοινό OCR pool ανά process. Threads αρκούν: το pdftoppm και το tesseract
+# τρέχουν ως εξωτερικά processes, οπότε η παραλληλία είναι πραγματική.
+_ocr_executor = None
+_ocr_executor_lock = threading.Lock()
+
+def _get_ocr_executor():
+    global _ocr_executor
+    with _ocr_executor_lock:
+        if _ocr_executor is None:
+            # Κάθε tesseract σε ένα thread, αλλιώς το OpenMP υπερφορτώνει τους πυρήνες
+            os.environ.setdefault('OMP_THREAD_LIMIT', '1')
+            _ocr_executor = ThreadPoolExecutor(max_workers=Config.OCR_WORKERS,
+                                               thread_name_prefix='ocr')
+        return _ocr_executor
+
+@contextmanager
+def map_file(file_path):
+    """Read-only mmap ενός αρχείου: οι extractors διαβάζουν από τις σελίδες του
+    page cache, χωρίς αντίγραφο του περιεχομένου στη μνήμη του process"""
+    with open(file_path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            yield b''
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+            yield buffer
+
+def _open_stream(file_content, file_path):
+    return open(file_path, 'rb') if file_path else io.BytesIO(file_content)
 
 class FileProcessor:
     """Επεξεργαστής αρχείων - Πραγματική έκδοση με PDF processing"""
     
     @staticmethod
-    def process_csv(file_content):
-        """Επεξεργασία CSV αρχείου"""
+    def process_csv(file_content, file_path=None):
+        """Επεξεργασία CSV αρχείου (πρότυπο /csv-template): το προφίλ της πρώτης έγκυρης γραμμής.
+        Για υπολογισμό όλων των γραμμών βλ. csv_import.import_template_csv"""
         try:
-            content = file_content.decode('utf-8')
-            csv_reader = csv.DictReader(io.StringIO(content))
-            data = list(csv_reader)
-            
-            return {
-                'gender': 'male',
-                'birth_year': 1980,
-                'current_age': 45,
-                'insurance_years': 20,
-                'salary': 1500,
-                'heavy_work_years': 0,
-                'children': 0,
-                'fund': 'ika',
-                'data_source': 'CSV File'
-            }
+            with _open_stream(file_content, file_path) as stream:
+                for line_number, row in iter_template_rows(stream):
+                    try:
+                        return profile_from_template_row(row)
+                    except ValueError as e:
+                        print(f"⚠️  CSV γραμμή {line_number}: {e}")
+            raise ValueError('Δεν βρέθηκε έγκυρη γραμμή')
         except Exception as e:
             raise Exception(f"Σφάλμα ανάγνωσης CSV: {str(e)}")
     
     @staticmethod
-    def process_pdf(file_content):
-        """ΠΡΑΓΜΑΤΙΚΗ Επεξεργασία PDF e-ΕΦΚΑ με graceful fallbacks"""
+    def process_pdf(file_content, file_path=None):
+        """ΠΡΑΓΜΑΤΙΚΗ Επεξεργασία PDF e-ΕΦΚΑ με graceful fallbacks.
+        Με file_path, το pdfplumber και το pdftoppm διαβάζουν απευθείας το αρχείο
+        και το file_content (mmap) χρησιμοποιείται μόνο από τα basic patterns."""
         try:
             print("🔍 Επεξεργασία PDF e-ΕΦΚΑ...")
             
@@ -73,37 +136,56 @@ class FileProcessor:
             }
             
             extracted_data = {}
+            field_sources = {}
             
-            # 1. PDFPlumber extraction (αν είναι διαθέσιμο)
-            if PDFPLUMBER_AVAILABLE:
-                pdf_text = FileProcessor._extract_with_pdfplumber(file_content)
+            # 1. Text layer με PDFPlumber (φθηνό - τα περισσότερα e-ΕΦΚΑ είναι ψηφιακά):
+            #    πρώτα το template e-ΕΦΚΑ (περιοχές/πίνακες), όλο το κείμενο μόνο αν λείπουν πεδία
+            page_texts = []
+            if text_layer_available():
+                template_data, page_texts = FileProcessor._extract_with_pdfplumber(file_content, file_path)
+                if template_data:
+                    print(f"📐 Template e-ΕΦΚΑ: {', '.join(template_data)}")
+                    FileProcessor._merge_missing(extracted_data, field_sources, template_data, TIER_TEMPLATE)
+                pdf_text = "\n".join(text for text in page_texts if text)
                 if pdf_text:
                     print(f"📄 PDFPlumber: {len(pdf_text)} χαρακτήρες")
-                    extracted_data.update(FileProcessor._smart_efka_analysis(pdf_text))
+                    metrics.inc(EXTRACTED_CHARS, len(pdf_text), tier=TIER_TEXT_LAYER)
+                    FileProcessor._merge_missing(
+                        extracted_data, field_sources,
+                        FileProcessor._smart_efka_analysis(pdf_text), TIER_TEXT_LAYER
+                    )
             
-            # 2. OCR extraction (αν είναι διαθέσιμο)
-            if PYTESSERACT_AVAILABLE and PDF2IMAGE_AVAILABLE:
-                # English OCR
-                english_ocr = FileProcessor._extract_with_ocr(file_content, 'eng')
-                if english_ocr:
-                    print(f"🔤 English OCR: {len(english_ocr)} χαρακτήρες")
-                    extracted_data.update(FileProcessor._smart_efka_analysis(english_ocr))
-                
-                # Greek OCR  
-                greek_ocr = FileProcessor._extract_with_ocr(file_content, 'ell')
-                if greek_ocr:
-                    print(f"🇬🇷 Greek OCR: {len(greek_ocr)} χαρακτήρες")
-                    extracted_data.update(FileProcessor._smart_efka_analysis(greek_ocr))
+            # 2. OCR μόνο αν λείπουν πεδία - και μόνο στις σελίδες χωρίς κείμενο
+            missing = FileProcessor._missing_fields(extracted_data)
+            if missing and ocr_available():
+                pages_without_text = [i + 1 for i, text in enumerate(page_texts) if not text]
+                # Αν όλες οι σελίδες έχουν κείμενο αλλά λείπουν πεδία, OCR σε όλες
+                ocr_pages = pages_without_text or None
+                ocr_text = FileProcessor._extract_with_ocr(file_content, page_numbers=ocr_pages,
+                                                           file_path=file_path)
+                if ocr_text:
+                    print(f"🔤 OCR ({OCR_LANGUAGES}): {len(ocr_text)} χαρακτήρες για {', '.join(missing)}")
+                    metrics.inc(EXTRACTED_CHARS, len(ocr_text), tier=TIER_OCR)
+                    FileProcessor._merge_missing(
+                        extracted_data, field_sources,
+                        FileProcessor._smart_efka_analysis(ocr_text), TIER_OCR
+                    )
+            elif not missing:
+                print("⚡ Όλα τα πεδία βρέθηκαν στο text layer - παράλειψη OCR")
             
-            # 3. Basic pattern matching από raw bytes (πάντα διαθέσιμο)
-            basic_data = FileProcessor._extract_basic_patterns(file_content)
-            extracted_data.update(basic_data)
+            # 3. Basic pattern matching από raw bytes (πάντα διαθέσιμο) για ό,τι λείπει ακόμα
+            if FileProcessor._missing_fields(extracted_data):
+                FileProcessor._merge_missing(
+                    extracted_data, field_sources,
+                    FileProcessor._extract_basic_patterns(file_content), TIER_BASIC_PATTERNS
+                )
             
             # 4. Συγχώνευση αποτελεσμάτων
             if FileProcessor._is_valid_insurance_data(extracted_data):
                 final_data = {**base_data, **extracted_data}
                 final_data['source'] = 'pdf_auto_extracted'
                 final_data['note'] = 'Αυτόματη εξαγωγή με πολλαπλές τεχνικές'
+                final_data['field_sources'] = field_sources
                 print("🎯 Βρέθηκαν δεδομένα από PDF!")
                 return final_data
             else:
@@ -116,32 +198,95 @@ class FileProcessor:
             return FileProcessor._get_pdf_fallback()
     
     @staticmethod
-    def _extract_with_pdfplumber(pdf_content):
-        """Εξαγωγή κειμένου με PDFPlumber"""
+    def _extract_with_pdfplumber(pdf_content, file_path=None):
+        """Εξαγωγή με PDFPlumber: (πεδία από το template e-ΕΦΚΑ, κείμενο ανά σελίδα).
+        Το κείμενο ('' για σελίδα χωρίς text layer) διαβάζεται μόνο αν το template
+        δεν βρήκε όλα τα βασικά πεδία - αλλιώς η λίστα σελίδων είναι κενή."""
         try:
-            text = ""
-            with pdfplumber.open(io.BytesIO(pdf_content)) as pdf:
-                for page in pdf.pages:
-                    page_text = page.extract_text()
-                    if page_text:
-                        text += page_text + "\n"
-            return text
+            source = file_path or io.BytesIO(pdf_content)
+            with optional_module('pdfplumber').open(source) as pdf:
+                try:
+                    with metrics.timer('template'):
+                        template_data, pages_read = extract_template_fields(
+                            pdf.pages, collect_history=Config.INSURANCE_HISTORY_EXTRACTION)
+                    metrics.inc(PAGES, pages_read, tier=TIER_TEMPLATE)
+                except Exception as e:
+                    print(f"Template e-ΕΦΚΑ error: {e}")
+                    template_data = {}
+                if not FileProcessor._missing_fields(template_data):
+                    return template_data, []
+                with metrics.timer('pdfplumber'):
+                    page_texts = [page.extract_text() or "" for page in pdf.pages]
+            metrics.inc(PAGES, len(page_texts), tier=TIER_TEXT_LAYER)
+            return template_data, page_texts
         except Exception as e:
             print(f"PDFPlumber error: {e}")
-            return ""
+            return {}, []
     
     @staticmethod
-    def _extract_with_ocr(pdf_content, lang):
-        """Εξαγωγή κειμένου με OCR"""
+    def _missing_fields(data):
+        """Βασικά πεδία που δεν έχουν βρεθεί ακόμα"""
+        return [field for field in REQUIRED_FIELDS if field not in data]
+    
+    @staticmethod
+    def _merge_missing(extracted_data, field_sources, new_data, tier):
+        """Συμπλήρωση μόνο των πεδίων που λείπουν, με καταγραφή του tier που τα βρήκε"""
+        for field, value in new_data.items():
+            if field not in extracted_data:
+                extracted_data[field] = value
+                field_sources[field] = tier
+                metrics.inc(EXTRACTED_FIELDS, tier=tier, field=field)
+    
+    @staticmethod
+    def _ocr_pdf_page(pdf_content, page_number, lang, dpi=OCR_DPI, file_path=None):
+        """Rasterization + OCR μίας σελίδας - τρέχει σε thread του OCR pool.
+        Με file_path το pdftoppm ανοίγει το αρχείο (το convert_from_bytes γράφει
+        πρώτα όλο το PDF σε προσωρινό αρχείο, σε κάθε σελίδα)."""
+        pdf2image = optional_module('pdf2image')
+        with metrics.timer('rasterize'):
+            if file_path:
+                images = pdf2image.convert_from_path(file_path, dpi=dpi,
+                                                     first_page=page_number, last_page=page_number)
+            else:
+                images = pdf2image.convert_from_bytes(pdf_content, dpi=dpi,
+                                                      first_page=page_number, last_page=page_number)
         try:
-            text = ""
-            images = convert_from_bytes(pdf_content, dpi=200)
-            
-            for i, image in enumerate(images):
-                page_text = pytesseract.image_to_string(image, lang=lang, config='--psm 6')
-                text += page_text + "\n"
-            
+            with metrics.timer('ocr', lang=lang):
+                text = "\n".join(
+                    optional_module('pytesseract').image_to_string(image, lang=lang, config='--psm 6')
+                    for image in images
+                )
+            metrics.inc(PAGES, tier=TIER_OCR)
             return text
+        finally:
+            for image in images:
+                image.close()
+    
+    @staticmethod
+    def _extract_with_ocr(pdf_content, lang=OCR_LANGUAGES, page_numbers=None, file_path=None):
+        """Εξαγωγή κειμένου με OCR - παράλληλα ανά σελίδα, με σειρά σελίδων"""
+        try:
+            if page_numbers is None:
+                pdf2image = optional_module('pdf2image')
+                info = (pdf2image.pdfinfo_from_path(file_path) if file_path
+                        else pdf2image.pdfinfo_from_bytes(pdf_content))
+                page_count = info['Pages']
+                page_numbers = range(1, page_count + 1)
+            
+            # Το πολύ OCR_MAX_PAGES_PER_REQUEST σελίδες σε εξέλιξη ανά αίτημα,
+            # ώστε ένα μεγάλο PDF να μη δεσμεύει όλο το pool
+            executor = _get_ocr_executor()
+            in_flight = deque()
+            page_texts = []
+            for page_number in page_numbers:
+                if len(in_flight) >= Config.OCR_MAX_PAGES_PER_REQUEST:
+                    page_texts.append(in_flight.popleft().result())
+                in_flight.append(executor.submit(
+                    FileProcessor._ocr_pdf_page, pdf_content, page_number, lang, file_path=file_path
+                ))
+            while in_flight:
+                page_texts.append(in_flight.popleft().result())
+            return "\n".join(page_texts)
         except Exception as e:
             print(f"OCR error ({lang}): {e}")
             return ""
@@ -151,34 +296,28 @@ class FileProcessor:
         """Βασική εξαγωγή patterns από raw bytes (χωρίς dependencies)"""
         try:
             data = {}
-            content_str = str(file_content)
+            # Bytes regexes στα literal strings των content streams (και των FlateDecode), χωρίς str()
+            with metrics.timer('basic_patterns'):
+                found = scan_pdf_bytes(file_content, BASIC_BYTE_PATTERNS)
             
-            # Αναζήτηση αριθμών
             # Ημέρες ασφάλισης (4-5 ψηφία)
-            days_match = re.search(r'(\d{4,5})', content_str)
-            if days_match:
-                days = int(days_match.group(1))
-                if 1000 <= days <= 40000:
-                    data['insurance_days'] = days
-                    data['insurance_years'] = round(days / 365, 1)
-                    print("   ✅ Basic - Ημέρες ασφάλισης")
+            if 'insurance_days' in found:
+                days = found['insurance_days']
+                data['insurance_days'] = days
+                data['insurance_years'] = round(days / 365, 1)
+                print("   ✅ Basic - Ημέρες ασφάλισης")
             
             # Μισθός (αριθμός με δεκαδικά)
-            salary_match = re.search(r'(\d{3,4}[,.]\d{2})', content_str)
-            if salary_match:
-                salary = float(salary_match.group(1).replace(',', '.'))
-                if 100 <= salary <= 10000:
-                    data['salary'] = salary
-                    print("   ✅ Basic - Μισθός")
+            if 'salary' in found:
+                data['salary'] = found['salary']
+                print("   ✅ Basic - Μισθός")
             
             # Έτος γέννησης
-            year_match = re.search(r'(19[5-9]\d)', content_str)
-            if year_match:
-                year = int(year_match.group(1))
-                if 1950 <= year <= 2000:
-                    data['birth_year'] = year
-                    data['current_age'] = datetime.now().year - year
-                    print("   ✅ Basic - Έτος γέννησης")
+            if 'birth_year' in found:
+                year = found['birth_year']
+                data['birth_year'] = year
+                data['current_age'] = datetime.now().year - year
+                print("   ✅ Basic - Έτος γέννησης")
             
             return data
         except Exception as e:
@@ -188,73 +327,21 @@ class FileProcessor:
     @staticmethod
     def _smart_efka_analysis(text):
         """Εξυπνη ανάλυση δεδομένων e-ΕΦΚΑ"""
-        data = {}
-        
-        # Καθαρισμός κειμένου
-        clean_text = text.upper().replace('\n', ' ')
-        
         print("🎯 Ανάλυση δεδομένων e-ΕΦΚΑ...")
         
-        # ΠΑΤΤΕΡΝΑ ΓΙΑ E-ΕΦΚΑ (Ελληνικά + Αγγλικά)
-        patterns = {
-            'insurance_days': [
-                (r'ΗΜΕΡΕΣ[\s:]*(\d{4,5})', 'Greek'),           # Ελληνικά
-                (r'(\d{4,5})\s*ΗΜΕΡ', 'Greek'),               # Ελληνικά  
-                (r'DAYS[\s:]*(\d{4,5})', 'English'),          # Αγγλικά
-                (r'INSURANCE[\s:]*(\d{4,5})', 'English'),     # Αγγλικά
-                (r'(\d{4,5})', 'Generic')                     # Γενικός αριθμός
-            ],
-            'salary': [
-                (r'ΜΙΣΘΟΣ[\s:]*(\d+[,.]?\d*)', 'Greek'),      # Ελληνικά
-                (r'(\d{3,4}[,.]\d{2})\s*ΕΥΡ', 'Greek'),       # Ελληνικά
-                (r'SALARY[\s:]*(\d+[,.]?\d*)', 'English'),    # Αγγλικά
-                (r'(\d{3,4}[,.]\d{2})\s*EURO', 'English'),    # Αγγλικά
-                (r'(\d{3,4}[,.]\d{2})', 'Generic')           # Γενικός αριθμός
-            ],
-            'birth_year': [
-                (r'ΓΕΝΝΗΣΗΣ[\s:]*(\d{4})', 'Greek'),         # Ελληνικά
-                (r'BIRTH[\s:]*(\d{4})', 'English'),           # Αγγλικά
-                (r'(19[5-9]\d)', 'Generic')                  # Γενικός έτος
-            ]
-        }
-        
-        # Εφαρμογή patterns με προτεραιότητα
-        for field, pattern_list in patterns.items():
-            for pattern, lang_type in pattern_list:
-                match = re.search(pattern, clean_text)
-                if match:
-                    value = match.group(1)
-                    
-                    if field == 'insurance_days':
-                        days = int(value)
-                        if 1000 <= days <= 40000:
-                            data['insurance_days'] = days
-                            data['insurance_years'] = round(days / 365, 1)
-                            print(f"   ✅ {lang_type} - Ημέρες ασφάλισης: {days}")
-                            break
-                    
-                    elif field == 'salary':
-                        salary = float(value.replace(',', '.'))
-                        if 100 <= salary <= 10000:
-                            data['salary'] = salary
-                            print(f"   ✅ {lang_type} - Μισθός: {salary}€")
-                            break
-                    
-                    elif field == 'birth_year':
-                        year = int(value)
-                        if 1950 <= year <= 2000:
-                            data['birth_year'] = year
-                            data['current_age'] = datetime.now().year - year
-                            print(f"   ✅ {lang_type} - Έτος γέννησης: {year}")
-                            break
+        # Ένα πέρασμα στο κείμενο με τους precompiled κανόνες του efka_patterns
+        with metrics.timer('analysis'):
+            data, best = efka_extractor.extract(text)
         
-        # Αναγνώριση φύλου
-        if 'ΑΡΣΕΝ' in clean_text or 'MALE' in clean_text:
-            data['gender'] = 'male'
-            print("   ✅ Φύλο: Αρσενικό")
-        elif 'ΘΗΛΥ' in clean_text or 'FEMALE' in clean_text:
-            data['gender'] = 'female'
-            print("   ✅ Φύλο: Θηλυκό")
+        field_labels = {
+            'insurance_days': ('Ημέρες ασφάλισης', ''),
+            'salary': ('Μισθός', '€'),
+            'birth_year': ('Έτος γέννησης', ''),
+            'gender': ('Φύλο', ''),
+        }
+        for field, candidate in best.items():
+            name, unit = field_labels.get(field, (field, ''))
+            print(f"   ✅ {candidate.label} - {name}: {candidate.value}{unit}")
         
         return data
     
@@ -285,52 +372,79 @@ class FileProcessor:
         }
 
     @staticmethod
-    def process_json(file_content):
-        """Επεξεργασία JSON αρχείου"""
+    def process_json(file_content, file_path=None):
+        """Επεξεργασία JSON αρχείου: το πρώτο προφίλ (object, array ή NDJSON).
+        Για υπολογισμό όλων των records βλ. json_import.iter_ndjson_results"""
         try:
-            data = json.loads(file_content.decode('utf-8'))
-            return {
-                'gender': data.get('gender', 'male'),
-                'birth_year': data.get('birth_year', 1980),
-                'current_age': data.get('current_age', 45),
-                'insurance_years': data.get('insurance_years', 20),
-                'salary': data.get('salary', 1500),
-                'heavy_work_years': 0,
-                'children': 0,
-                'fund': 'ika',
-                'data_source': 'JSON File'
-            }
+            with _open_stream(file_content, file_path) as stream:
+                for record in iter_profiles(iter_json_records(stream)):
+                    return profile_from_record(record)
+            raise ValueError('Το αρχείο δεν περιέχει προφίλ')
         except Exception as e:
             raise Exception(f"Σφάλμα ανάγνωσης JSON: {str(e)}")
 
     @staticmethod
-    def process_file(file_content, filename):
-        """Κύρια μέθοδος επεξεργασίας αρχείου"""
+    def process_path(file_path, filename):
+        """Επεξεργασία αρχείου που είναι ήδη στον δίσκο (uploads/), μέσω mmap:
+        κανένα στάδιο δεν φορτώνει ολόκληρο το αρχείο σε bytes"""
+        with map_file(file_path) as buffer:
+            return FileProcessor.process_file(buffer, filename, file_path=file_path)
+
+    @staticmethod
+    def process_file(file_content, filename, file_path=None):
+        """Κύρια μέθοδος επεξεργασίας αρχείου. Το file_content μπορεί να είναι bytes
+        ή mmap· με file_path οι extractors που το υποστηρίζουν διαβάζουν το αρχείο."""
         filename_lower = filename.lower()
         
         if filename_lower.endswith('.csv'):
-            return FileProcessor.process_csv(file_content)
+            return FileProcessor.process_csv(file_content, file_path)
         elif filename_lower.endswith('.pdf'):
-            return FileProcessor.process_pdf(file_content)
+            return FileProcessor._process_cached(file_content, lambda content: FileProcessor.process_pdf(
+                content, file_path
+            ), 'extract_pdf')
         elif filename_lower.endswith('.json'):
-            return FileProcessor.process_json(file_content)
-        elif any(filename_lower.endswith(fmt) for fmt in ['.jpg', '.jpeg', '.png', '.bmp', '.tiff', '.webp']):
-            return FileProcessor._get_image_fallback()
+            return FileProcessor.process_json(file_content, file_path)
+        elif filename_lower.endswith(IMAGE_EXTENSIONS):
+            return FileProcessor._process_cached(file_content, lambda content: ImageProcessor.process_file(
+                content, filename, lang=OCR_LANGUAGES, executor=_get_ocr_executor(), file_path=file_path
+            ), 'extract_image')
         else:
             raise Exception("Μη υποστηριζόμενη μορφή αρχείου")
     
     @staticmethod
-    def _get_image_fallback():
-        """Fallback για εικόνες"""
-        return {
-            'gender': 'male',
-            'birth_year': 1980,
-            'current_age': 45,
-            'insurance_years': 20,
-            'salary': 1500,
-            'heavy_work_years': 0,
-            'children': 0,
-            'fund': 'ika',
-            'data_source': 'Image File',
-            'note': 'Image processing requires additional libraries'
-        }
\ No newline at end of file
+    def _process_cached(file_content, processor, stage):
+        """Εκτέλεση extractor μόνο αν το ίδιο περιεχόμενο δεν έχει ήδη αναλυθεί"""
+        digest = content_hash(file_content)
+        try:
+            cached = extraction_cache.get(digest, CACHE_VERSION)
+        except Exception as e:
+            print(f"Extraction cache error: {e}")
+            cached = None
+        if cached is not None:
+            print("⚡ Cache hit - το αρχείο έχει ήδη αναλυθεί")
+            metrics.inc(EXTRACTION_CACHE, result='hit')
+            return cached
+        metrics.inc(EXTRACTION_CACHE, result='miss')
+        
+        with metrics.timer(stage):
+            data = processor(file_content)
+        # Τα fallbacks λόγω σφάλματος δεν αποθηκεύονται, ώστε να ξαναδοκιμαστούν
+        if not str(data.get('source', '')).endswith('_fallback'):
+            try:
+                extraction_cache.put(digest, CACHE_VERSION, data)
+            except Exception as e:
+                print(f"Extraction cache error: {e}")
+        return data
+    
+    @staticmethod
+    def get_cached_extraction(file_path):
+        """Αποτέλεσμα από το cache για αρχείο στο δίσκο, ή None"""
+        try:
+            cached = extraction_cache.get(file_content_hash(file_path), CACHE_VERSION)
+        except Exception as e:
+            print(f"Extraction cache error: {e}")
+            return None
+        # Τα misses μετριούνται από την εργασία που ακολουθεί (_process_cached)
+        if cached is not None:
+            metrics.inc(EXTRACTION_CACHE, result='hit')
+        return cached
@@ -0,0 +1,47 @@
+# Το bind ($PORT) και το πλήθος workers ($WEB_CONCURRENCY) τα διαβάζει το ίδιο το gunicorn.
+# Η εφαρμογή φορτώνεται μία φορά στο master και οι workers γίνονται fork με
+# έτοιμα imports, backends και γραμματοσειρές (copy-on-write)
+preload_app = True
+
+
+def on_starting(server):
+    """Στο master, πριν από το fork: migrations (μία φορά ανά deploy) και warm-up"""
+    from config import Config
+    from app import db, init_db, sweep_uploads, warm_up
+    from metrics import MetricsStore
+
+    if Config.MIGRATE_ON_START:
+        applied = init_db()
+        # Καμία σύνδεση του master δεν περνά στους workers μέσω fork
+        db.close()
+        if applied:
+            server.log.info("Applied migrations: %s", ', '.join(map(str, applied)))
+    removed = sweep_uploads()
+    if removed:
+        server.log.info("Removed %d orphaned upload(s)", removed)
+    backends = warm_up()
+    server.log.info("Extraction backends: %s",
+                    ', '.join(name for name, ok in backends.items() if ok) or 'none')
+    # Οι μετρητές ξεκινούν από το μηδέν σε κάθε εκκίνηση του server
+    MetricsStore(Config.METRICS_DB_PATH).clear()
+
+
+def post_fork(server, worker):
+    """Στον worker: χωρίς τις μετρήσεις του master, και με κοινό άθροισμα με
+    τους άλλους workers, ώστε ένα scrape να βλέπει όλο τον server"""
+    from config import Config
+    from metrics import metrics, MetricsStore
+
+    metrics.reset()
+    metrics.share(MetricsStore(Config.METRICS_DB_PATH), Config.METRICS_PUBLISH_SECONDS)
+
+
+def worker_exit(server, worker):
+    # Οι υπολογισμοί που περιμένουν στο write-behind buffer γράφονται πριν κλείσει ο worker
+    from app import calculation_writer, job_queue
+    from metrics import metrics
+
+    if calculation_writer is not None:
+        calculation_writer.close()
+    job_queue.shutdown()
+    metrics.publish()
@@ -0,0 +1,154 @@
+import base64
+import struct
+import sys
+from array import array
+from collections import namedtuple
+
+from backends import optional_module
+
+# Ημέρες ασφάλισης ενός πλήρους μήνα (ΙΚΑ): μισθός μήνα = ημερομίσθιο x 25
+DAYS_PER_MONTH = 25
+# Ο συντάξιμος μισθός είναι ο μέσος όρος αποδοχών από το 2002 (ν. 4387/2016)
+CAREER_AVERAGE_FROM_YEAR = 2002
+
+# Packed μορφή: header (magic, έκδοση, πλήθος περιόδων) και μετά οι τρεις στήλες
+# διαδοχικά, little-endian: περίοδοι uint32, ημέρες uint16, αποδοχές float64
+HISTORY_MAGIC = b'IH'
+HISTORY_FORMAT_VERSION = 1
+_HEADER = struct.Struct('<2sBI')
+_UINT32 = next(typecode for typecode in 'IL' if array(typecode).itemsize == 4)
+_COLUMNS = (('periods', _UINT32), ('days', 'H'), ('earnings', 'd'))
+
+CareerSummary = namedtuple('CareerSummary', ['periods', 'total_days', 'insurance_years', 'average_salary'])
+
+
+class InsuranceHistory:
+    """Ιστορικό ασφάλισης ανά περίοδο (μήνα ή διάστημα του e-ΕΦΚΑ) σε στήλες array:
+    αρχή περιόδου (έτος * 12 + μήνας - 1), ημέρες ασφάλισης και αποδοχές.
+    Δεκατέσσερα bytes ανά περίοδο, στη μνήμη και στη βάση (pack/unpack)."""
+
+    __slots__ = ('periods', 'days', 'earnings')
+
+    def __init__(self):
+        self.periods = array(_UINT32)
+        self.days = array('H')
+        self.earnings = array('d')
+
+    def __len__(self):
+        return len(self.periods)
+
+    def append(self, year, month, days, earnings):
+        if not 1 <= month <= 12:
+            raise ValueError(f'Μη έγκυρος μήνας περιόδου: {month}')
+        self.periods.append(int(year) * 12 + int(month) - 1)
+        self.days.append(int(days))
+        self.earnings.append(float(earnings))
+
+    @classmethod
+    def from_periods(cls, periods):
+        """Από λίστα {'year', 'month', 'days', 'earnings'} ή (έτος, μήνας, ημέρες, αποδοχές)"""
+        history = cls()
+        for period in periods:
+            if isinstance(period, dict):
+                history.append(period['year'], period.get('month', 1), period['days'],
+                               period.get('earnings', 0.0))
+            else:
+                history.append(*period)
+        return history
+
+    def pack(self):
+        parts = [_HEADER.pack(HISTORY_MAGIC, HISTORY_FORMAT_VERSION, len(self))]
+        for name, _ in _COLUMNS:
+            column = getattr(self, name)
+            if sys.byteorder == 'big':
+                column = array(column.typecode, column)
+                column.byteswap()
+            parts.append(column.tobytes())
+        return b''.join(parts)
+
+    @classmethod
+    def unpack(cls, blob):
+        view = memoryview(blob)
+        if len(view) < _HEADER.size:
+            raise ValueError('Άκυρο ιστορικό ασφάλισης: πολύ μικρό')
+        magic, version, count = _HEADER.unpack_from(view)
+        if magic != HISTORY_MAGIC or version != HISTORY_FORMAT_VERSION:
+            raise ValueError(f'Άγνωστη μορφή ιστορικού ασφάλισης: {magic!r} v{version}')
+        history = cls()
+        offset = _HEADER.size
+        for name, _ in _COLUMNS:
+            column = getattr(history, name)
+            size = count * column.itemsize
+            if offset + size > len(view):
+                raise ValueError('Άκυρο ιστορικό ασφάλισης: λείπουν δεδομένα')
+            column.frombytes(view[offset:offset + size])
+            if sys.byteorder == 'big':
+                column.byteswap()
+            offset += size
+        return history
+
+    def to_text(self):
+        """Base64 του pack() - για JSON (αποτελέσματα εργασιών, extraction cache)"""
+        return base64.b64encode(self.pack()).decode('ascii')
+
+    @classmethod
+    def coerce(cls, value):
+        """InsuranceHistory από ό,τι μπορεί να φέρει ένα προφίλ: το ίδιο αντικείμενο,
+        packed bytes (βάση), base64 κείμενο (JSON) ή λίστα περιόδων"""
+        if isinstance(value, cls):
+            return value
+        if isinstance(value, (bytes, bytearray, memoryview)):
+            return cls.unpack(value)
+        if isinstance(value, str):
+            return cls.unpack(base64.b64decode(value))
+        return cls.from_periods(value)
+
+    def summary(self, from_year=CAREER_AVERAGE_FROM_YEAR):
+        """Σύνολο ημερών, έτη ασφάλισης και μέσος μηνιαίος μισθός σταδιοδρομίας,
+        σε vectorized περάσματα πάνω στα arrays (χωρίς αντιγραφή, μέσω frombuffer)"""
+        if not len(self):
+            return CareerSummary(0, 0, 0.0, None)
+        first_period = from_year * 12
+        # Χωρίς numpy τα αθροίσματα γίνονται με sum() πάνω στα ίδια arrays
+        np = optional_module('numpy')
+        if np is not None:
+            periods = np.frombuffer(self.periods, dtype=np.uint32)
+            days = np.frombuffer(self.days, dtype=np.uint16)
+            earnings = np.frombuffer(self.earnings, dtype=np.float64)
+            total_days = int(days.sum(dtype=np.int64))
+            recent = periods >= first_period
+            average_days = int(days[recent].sum(dtype=np.int64))
+            average_earnings = float(earnings[recent].sum())
+        else:
+            total_days = sum(self.days)
+            average_days, average_earnings = 0, 0.0
+            for period, days, earnings in zip(self.periods, self.days, self.earnings):
+                if period >= first_period:
+                    average_days += days
+                    average_earnings += earnings
+
+        average_salary = (round(average_earnings / average_days * DAYS_PER_MONTH, 2)
+                          if average_days else None)
+        return CareerSummary(len(self), total_days, round(total_days / 365, 1), average_salary)
+
+
+def history_text(value, history):
+    """Η μορφή του ιστορικού στο αποτέλεσμα: base64, χωρίς νέα κωδικοποίηση αν ήταν ήδη κείμενο"""
+    return value if isinstance(value, str) else history.to_text()
+
+
+def career_inputs(form_data):
+    """Προφίλ με έτη ασφάλισης και μισθό από το ιστορικό περιόδων, αν υπάρχει.
+    Χωρίς ιστορικό επιστρέφεται το ίδιο form_data."""
+    value = form_data.get('insurance_history')
+    if value is None or (not isinstance(value, InsuranceHistory) and not len(value)):
+        return form_data
+    history = InsuranceHistory.coerce(value)
+    summary = history.summary()
+    inputs = dict(form_data)
+    if summary.total_days:
+        inputs['insurance_years'] = summary.insurance_years
+    if summary.average_salary is not None:
+        inputs['salary'] = summary.average_salary
+    inputs['insurance_history'] = history_text(value, history)
+    return inputs
@@ -0,0 +1,266 @@
+import json
+import os
+import re
+import sqlite3
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timedelta
+
+from werkzeug.utils import secure_filename
+
+from database import connect_sqlite
+from file_processor import FileProcessor
+from metrics import metrics, JOBS
+
+JOB_QUEUED = 'queued'
+JOB_RUNNING = 'running'
+JOB_DONE = 'done'
+JOB_ERROR = 'error'
+
+# Όνομα αρχείου του save_upload: <όνομα>_<ημερομηνία>_<ώρα>_<8 hex>.<κατάληξη>
+UPLOAD_NAME = re.compile(r'.+_\d{8}_\d{6}_[0-9a-f]{8}(\.\w+)?$')
+
+
+def _connect(db_path):
+    return connect_sqlite(db_path, timeout_ms=30000)
+
+
+def _init_worker():
+    # Με fork ο worker κληρονομεί τις μετρήσεις του γονικού process - ξεκινά από το μηδέν
+    metrics.reset()
+
+
+def _merge_worker_metrics(future):
+    """Οι μετρήσεις της εργασίας (drain στον worker) προστίθενται στο κύριο process"""
+    if not future.cancelled() and future.exception() is None:
+        metrics.merge(future.result())
+
+
+def _run_job(db_path, job_id):
+    """Εκτέλεση μίας εργασίας εξαγωγής μέσα σε worker process.
+    Επιστρέφει τις μετρήσεις της εργασίας για το /metrics του κύριου process."""
+    try:
+        _execute_job(db_path, job_id)
+    except Exception as e:
+        print(f"Job {job_id} failed: {e}")
+    return metrics.drain()
+
+
+def _remove_upload(file_path):
+    # Τα ανεβασμένα αρχεία είναι προσωπικά δεδομένα: δεν κρατιούνται μετά την εξαγωγή
+    try:
+        os.remove(file_path)
+    except FileNotFoundError:
+        pass
+    except OSError as e:
+        print(f"⚠️  Could not remove upload {file_path}: {e}")
+
+
+def _execute_job(db_path, job_id):
+    conn = _connect(db_path)
+    try:
+        # Ατομική ανάληψη: αν άλλος worker την πήρε ήδη, δεν κάνουμε τίποτα
+        claimed = conn.execute(
+            'UPDATE jobs SET status = ?, started_at = ? WHERE id = ? AND status = ?',
+            (JOB_RUNNING, datetime.now().isoformat(), job_id, JOB_QUEUED)
+        ).rowcount
+        conn.commit()
+        if not claimed:
+            return
+        job = conn.execute('SELECT * FROM jobs WHERE id = ?', (job_id,)).fetchone()
+
+        try:
+            try:
+                with metrics.timer('job'):
+                    extracted_data = FileProcessor.process_path(job['file_path'], job['filename'])
+                conn.execute(
+                    'UPDATE jobs SET status = ?, result = ?, finished_at = ? WHERE id = ?',
+                    (JOB_DONE, json.dumps(extracted_data, ensure_ascii=False),
+                     datetime.now().isoformat(), job_id)
+                )
+            except Exception as e:
+                print(f"Job {job_id} error: {e}")
+                conn.execute(
+                    'UPDATE jobs SET status = ?, error = ?, finished_at = ? WHERE id = ?',
+                    (JOB_ERROR, str(e), datetime.now().isoformat(), job_id)
+                )
+            conn.commit()
+        finally:
+            _remove_upload(job['file_path'])
+    finally:
+        conn.close()
+
+
+class JobQueue:
+    """Ουρά εργασιών εξαγωγής - SQLite ως ουρά, τοπικό process pool ως workers"""
+
+    def __init__(self, db_path, max_workers=2, stale_after=900):
+        self.db_path = db_path
+        self.max_workers = max_workers
+        # Μετά από πόσα δευτερόλεπτα μια εργασία 'running' θεωρείται χαμένη (crash/restart)
+        self.stale_after = stale_after
+        self._executor = None
+
+    def init_schema(self):
+        conn = _connect(self.db_path)
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS jobs (
+                id TEXT PRIMARY KEY,
+                user_id INTEGER,
+                filename TEXT NOT NULL,
+                file_path TEXT NOT NULL,
+                data_source TEXT,
+                status TEXT NOT NULL,
+                result TEXT,
+                error TEXT,
+                delivered BOOLEAN DEFAULT 0,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                started_at TIMESTAMP,
+                finished_at TIMESTAMP
+            )
+        ''')
+        conn.commit()
+        conn.close()
+
+    def _get_executor(self):
+        # Το pool δημιουργείται στην πρώτη χρήση, ώστε να μην κληρονομείται από fork
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self.max_workers, initializer=_init_worker)
+            self.resume_pending()
+        return self._executor
+
+    def _dispatch(self, job_id):
+        self._submit(self._get_executor(), job_id)
+
+    def _submit(self, executor, job_id):
+        executor.submit(_run_job, self.db_path, job_id).add_done_callback(_merge_worker_metrics)
+
+    def enqueue(self, file_path, filename, user_id=None, data_source=None):
+        """Καταχώριση νέας εργασίας και άμεση επιστροφή του job id"""
+        job_id = uuid.uuid4().hex
+        conn = _connect(self.db_path)
+        conn.execute('''
+            INSERT INTO jobs (id, user_id, filename, file_path, data_source, status)
+            VALUES (?, ?, ?, ?, ?, ?)
+        ''', (job_id, user_id, filename, file_path, data_source, JOB_QUEUED))
+        conn.commit()
+        conn.close()
+        self._dispatch(job_id)
+        return job_id
+
+    def resume_pending(self):
+        """Επανυποβολή εργασιών που έμειναν σε αναμονή (π.χ. μετά από restart).
+        Όσες έμειναν 'running' περισσότερο από stale_after (ο worker τους χάθηκε)
+        γυρίζουν πρώτα σε αναμονή."""
+        conn = _connect(self.db_path)
+        cutoff = (datetime.now() - timedelta(seconds=self.stale_after)).isoformat()
+        reset = conn.execute(
+            'UPDATE jobs SET status = ?, started_at = NULL WHERE status = ? AND started_at < ?',
+            (JOB_QUEUED, JOB_RUNNING, cutoff)
+        ).rowcount
+        conn.commit()
+        if reset:
+            print(f"♻️  Re-queued {reset} stale running job(s)")
+        pending = conn.execute(
+            'SELECT id FROM jobs WHERE status = ? ORDER BY created_at', (JOB_QUEUED,)
+        ).fetchall()
+        conn.close()
+        for row in pending:
+            self._submit(self._executor, row['id'])
+
+    def get(self, job_id):
+        conn = _connect(self.db_path)
+        job = conn.execute('SELECT * FROM jobs WHERE id = ?', (job_id,)).fetchone()
+        conn.close()
+        return job
+
+    def get_status(self, job_id):
+        """Κατάσταση εργασίας σε μορφή κατάλληλη για JSON"""
+        job = self.get(job_id)
+        if job is None:
+            return None
+        return {
+            'id': job['id'],
+            'status': job['status'],
+            'filename': job['filename'],
+            'error': job['error'],
+            'created_at': job['created_at'],
+            'finished_at': job['finished_at']
+        }
+
+    def get_result(self, job_id):
+        job = self.get(job_id)
+        if job is None or job['status'] != JOB_DONE:
+            return None
+        data = json.loads(job['result'])
+        if job['data_source']:
+            data['data_source'] = job['data_source']
+        return data
+
+    def status_counts(self):
+        """Πλήθος εργασιών ανά κατάσταση (για το /metrics)"""
+        conn = _connect(self.db_path)
+        rows = conn.execute('SELECT status, COUNT(*) AS total FROM jobs GROUP BY status').fetchall()
+        conn.close()
+        return {row['status']: row['total'] for row in rows}
+
+    def update_metrics(self):
+        counts = self.status_counts()
+        for status in (JOB_QUEUED, JOB_RUNNING, JOB_DONE, JOB_ERROR):
+            metrics.set_gauge(JOBS, counts.get(status, 0), status=status)
+
+    def mark_delivered(self, job_id):
+        """Επιστρέφει True μόνο την πρώτη φορά που παραδίδεται το αποτέλεσμα"""
+        conn = _connect(self.db_path)
+        updated = conn.execute(
+            'UPDATE jobs SET delivered = 1 WHERE id = ? AND delivered = 0', (job_id,)
+        ).rowcount
+        conn.commit()
+        conn.close()
+        return updated == 1
+
+    def sweep_uploads(self, upload_folder):
+        """Διαγραφή ανεβασμένων αρχείων που δεν ανήκουν σε εκκρεμή εργασία (π.χ. μετά
+        από crash). Σβήνονται μόνο αρχεία με όνομα του save_upload, ώστε ό,τι άλλο
+        υπάρχει στον φάκελο να μένει. Τα πολύ πρόσφατα αρχεία μένουν επίσης: μπορεί να
+        μην έχουν μπει ακόμα στην ουρά."""
+        if not os.path.isdir(upload_folder):
+            return 0
+        conn = _connect(self.db_path)
+        try:
+            pending = {row['file_path'] for row in conn.execute(
+                'SELECT file_path FROM jobs WHERE status IN (?, ?)', (JOB_QUEUED, JOB_RUNNING)
+            )}
+        except sqlite3.OperationalError as e:
+            # Πριν από το πρώτο 'flask migrate' δεν υπάρχει ουρά, άρα ούτε εκκρεμείς εργασίες
+            if 'no such table' not in str(e):
+                raise
+            pending = set()
+        finally:
+            conn.close()
+        cutoff = time.time() - self.stale_after
+        removed = 0
+        for entry in os.scandir(upload_folder):
+            if (entry.is_file() and UPLOAD_NAME.match(entry.name)
+                    and entry.path not in pending
+                    and os.path.join(upload_folder, entry.name) not in pending
+                    and entry.stat().st_mtime < cutoff):
+                _remove_upload(entry.path)
+                removed += 1
+        return removed
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+
+
+def save_upload(file, upload_folder):
+    """Αποθήκευση του ανεβασμένου αρχείου στον φάκελο των εργασιών για τον worker"""
+    stem, ext = os.path.splitext(file.filename)
+    safe_stem = secure_filename(stem) or 'upload'
+    timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+    file_path = os.path.join(upload_folder, f"{safe_stem}_{timestamp}_{uuid.uuid4().hex[:8]}{ext.lower()}")
+    file.save(file_path)
+    return file_path
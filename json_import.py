@@ -0,0 +1,126 @@
+import io
+import json
+
+from pension_calculator import calculate_greek_pension
+
+JSON_DATA_SOURCE = 'Αρχείο JSON'
+
+READ_CHUNK_SIZE = 64 * 1024
+# Μέγιστο μέγεθος ενός record: πάνω από αυτό το αρχείο θεωρείται άκυρο
+MAX_RECORD_CHARS = 1024 * 1024
+
+_WHITESPACE = ' \t\r\n'
+
+
+class JsonStreamError(ValueError):
+    pass
+
+
+def iter_json_records(stream, chunk_size=READ_CHUNK_SIZE):
+    """Lazy ανάγνωση records από binary stream, σε κομμάτια των chunk_size:
+    JSON array ([{...}, {...}]), NDJSON (ένα object ανά γραμμή) ή ένα μόνο object.
+    Στη μνήμη κρατιέται κάθε φορά μόνο το τρέχον record."""
+    text = io.TextIOWrapper(stream, encoding='utf-8-sig')
+    decoder = json.JSONDecoder()
+    buffer = ''
+    position = 0
+    eof = False
+    in_array = None
+    after_record = False
+
+    def fill():
+        nonlocal buffer, position, eof
+        chunk = text.read(chunk_size)
+        if not chunk:
+            eof = True
+            return False
+        buffer = buffer[position:] + chunk
+        position = 0
+        return True
+
+    while True:
+        # Παράλειψη κενών και, μέσα σε array, των διαχωριστικών ','
+        while True:
+            while position < len(buffer) and buffer[position] in _WHITESPACE:
+                position += 1
+            if position < len(buffer):
+                break
+            if not fill():
+                if in_array:
+                    raise JsonStreamError('Το JSON array δεν κλείνει με ]')
+                return
+
+        char = buffer[position]
+        if in_array is None:
+            in_array = char == '['
+            if in_array:
+                position += 1
+                continue
+        if in_array:
+            if char == ']':
+                return
+            if after_record:
+                if char != ',':
+                    raise JsonStreamError(f"Μη έγκυρο JSON array: αναμενόταν ',' αντί για {char!r}")
+                position += 1
+                after_record = False
+                continue
+
+        try:
+            record, end = decoder.raw_decode(buffer, position)
+        except json.JSONDecodeError as e:
+            if len(buffer) - position > MAX_RECORD_CHARS:
+                raise JsonStreamError(f'Πολύ μεγάλο JSON record στη θέση {e.pos}')
+            if eof or not fill():
+                raise JsonStreamError(f'Μη έγκυρο JSON: {e.msg}')
+            continue
+        position = end
+        after_record = True
+        yield record
+
+
+def iter_profiles(records):
+    """Records -> προφίλ. Ένα object {"profiles": [...]} (όπως στο /batch) ανοίγει σε προφίλ"""
+    for record in records:
+        if isinstance(record, dict) and isinstance(record.get('profiles'), list):
+            yield from record['profiles']
+        else:
+            yield record
+
+
+def profile_from_record(record):
+    """Ένα JSON object -> προφίλ, με τις προεπιλογές της φόρμας για ό,τι λείπει.
+    Το 'insurance_history' (λίστα περιόδων ή base64) περνά στον υπολογισμό σταδιοδρομίας."""
+    profile = {
+        'gender': record.get('gender', 'male'),
+        'birth_year': record.get('birth_year', 1980),
+        'current_age': record.get('current_age', 45),
+        'insurance_years': record.get('insurance_years', 20),
+        'salary': record.get('salary', 1500),
+        'heavy_work_years': record.get('heavy_work_years', 0),
+        'children': record.get('children', 0),
+        'fund': record.get('fund', 'ika'),
+        'data_source': JSON_DATA_SOURCE,
+    }
+    if record.get('insurance_history'):
+        profile['insurance_history'] = record['insurance_history']
+    return profile
+
+
+def iter_ndjson_results(profiles):
+    """Υπολογισμός κάθε προφίλ και μία γραμμή NDJSON ανά αποτέλεσμα (σφάλματα ανά record).
+    Κάθε record περνά από το profile_from_record, όπως και το μοναδικό record του /upload,
+    ώστε το ίδιο record να δίνει το ίδιο αποτέλεσμα όσα records κι αν έχει το αρχείο.
+    Αν το αρχείο χαλάει στη μέση, η τελευταία γραμμή περιγράφει το σφάλμα."""
+    try:
+        for index, record in enumerate(profiles):
+            try:
+                if not isinstance(record, dict):
+                    raise TypeError('το record δεν είναι JSON object')
+                result = calculate_greek_pension(profile_from_record(record))
+                result['index'] = index
+            except (KeyError, TypeError, ValueError) as e:
+                result = {'index': index, 'error': f'Μη έγκυρο προφίλ: {e}'}
+            yield json.dumps(result, ensure_ascii=False) + '\n'
+    except JsonStreamError as e:
+        yield json.dumps({'error': str(e)}, ensure_ascii=False) + '\n'
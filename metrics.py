@@ -0,0 +1,271 @@
+import json
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+from database import connect_sqlite
+
+logger = logging.getLogger(__name__)
+
+# Όρια (σε δευτερόλεπτα) των histograms χρόνου - από regex σε ms έως OCR πολλών σελίδων
+STAGE_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+STAGE_SECONDS = 'pension_stage_duration_seconds'
+PAGES = 'pension_pages_total'
+EXTRACTED_CHARS = 'pension_extracted_chars_total'
+EXTRACTED_FIELDS = 'pension_extracted_fields_total'
+EXTRACTION_CACHE = 'pension_extraction_cache_total'
+REPORT_CACHE = 'pension_report_cache_total'
+JOBS = 'pension_jobs'
+RULES_BACKFILL = 'pension_rules_backfill_rows'
+
+# (τύπος, περιγραφή) για τις γραμμές # HELP / # TYPE του /metrics
+METRIC_HELP = {
+    STAGE_SECONDS: ('histogram', 'Duration of each processing stage'),
+    PAGES: ('counter', 'Pages processed per extraction tier'),
+    EXTRACTED_CHARS: ('counter', 'Characters of text extracted per tier'),
+    EXTRACTED_FIELDS: ('counter', 'Fields found, by the tier that found them'),
+    EXTRACTION_CACHE: ('counter', 'Extraction cache lookups by result'),
+    REPORT_CACHE: ('counter', 'PDF report cache lookups by result'),
+    JOBS: ('gauge', 'Extraction jobs by status'),
+    RULES_BACKFILL: ('gauge', 'Progress of the stored calculations re-evaluation per rules version'),
+}
+
+
+def _label_key(labels):
+    return tuple(sorted((name, str(value)) for name, value in labels.items()))
+
+
+def _format_labels(label_key, extra=()):
+    pairs = list(label_key) + list(extra)
+    if not pairs:
+        return ''
+    escaped = (value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+               for _, value in pairs)
+    return '{' + ','.join(f'{name}="{value}"' for (name, _), value in zip(pairs, escaped)) + '}'
+
+
+def _format_value(value):
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class MetricsStore:
+    """Κοινό άθροισμα μετρητών και histograms όλων των processes σε ένα αρχείο SQLite.
+
+    Κάθε process προσθέτει εδώ ό,τι μέτρησε από την προηγούμενη φορά (Metrics.drain),
+    με ένα UPSERT ανά σειρά. Ένα histogram αποθηκεύεται ως μία γραμμή ανά bucket,
+    και το άθροισμα τιμών στη θέση μετά το +Inf."""
+
+    COUNTER = 'counter'
+    HISTOGRAM = 'histogram'
+
+    def __init__(self, path):
+        self.path = path
+        self._schema_ready = False
+
+    def _connect(self):
+        conn = connect_sqlite(self.path, timeout_ms=30000)
+        if not self._schema_ready:
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS metric_samples (
+                    kind TEXT NOT NULL,
+                    name TEXT NOT NULL,
+                    labels TEXT NOT NULL,
+                    slot INTEGER NOT NULL,
+                    value NOT NULL,
+                    PRIMARY KEY (kind, name, labels, slot)
+                )
+            ''')
+            conn.commit()
+            self._schema_ready = True
+        return conn
+
+    def clear(self):
+        conn = self._connect()
+        conn.execute('DELETE FROM metric_samples')
+        conn.commit()
+        conn.close()
+
+    def add(self, snapshot):
+        rows = [(self.COUNTER, name, json.dumps(labels), 0, value)
+                for (name, labels), value in snapshot['counters'].items()]
+        for (name, labels), values in snapshot['histograms'].items():
+            rows.extend((self.HISTOGRAM, name, json.dumps(labels), slot, value)
+                        for slot, value in enumerate(values) if value)
+        if not rows:
+            return
+        conn = self._connect()
+        try:
+            conn.execute('BEGIN IMMEDIATE')
+            conn.executemany('''
+                INSERT INTO metric_samples (kind, name, labels, slot, value) VALUES (?, ?, ?, ?, ?)
+                ON CONFLICT (kind, name, labels, slot) DO UPDATE SET value = value + excluded.value
+            ''', rows)
+            conn.commit()
+        finally:
+            conn.close()
+
+    def load(self, histogram_size):
+        """Το άθροισμα όλων των processes, στη μορφή του Metrics.drain"""
+        conn = self._connect()
+        try:
+            rows = conn.execute('SELECT kind, name, labels, slot, value FROM metric_samples').fetchall()
+        finally:
+            conn.close()
+        counters, histograms = {}, {}
+        for kind, name, labels, slot, value in rows:
+            key = (name, tuple(tuple(pair) for pair in json.loads(labels)))
+            if kind == self.COUNTER:
+                counters[key] = value
+            elif slot < histogram_size:
+                histogram = histograms.get(key)
+                if histogram is None:
+                    histogram = histograms[key] = [0] * (histogram_size - 1) + [0.0]
+                histogram[slot] = value
+        return {'counters': counters, 'histograms': histograms}
+
+
+class Metrics:
+    """Μετρήσεις χρόνου ανά στάδιο (histograms) και μετρητές, σε μορφή Prometheus.
+
+    Κάθε process έχει το δικό του registry. Οι workers της ουράς εργασιών
+    επιστρέφουν με drain() ό,τι μέτρησαν και το κύριο process το προσθέτει με merge().
+    Με πολλούς gunicorn workers, μετά το share() κάθε worker στέλνει ανά publish_interval
+    δευτερόλεπτα ό,τι μέτρησε σε κοινό MetricsStore, και το render() δείχνει το άθροισμα
+    όλων (των άλλων workers με καθυστέρηση έως publish_interval). Τα gauges μένουν ανά
+    process: υπολογίζονται από τη βάση τη στιγμή του scrape."""
+
+    def __init__(self, buckets=STAGE_BUCKETS):
+        self.buckets = tuple(buckets)
+        self._lock = threading.Lock()
+        self._counters = {}
+        self._gauges = {}
+        # (όνομα, labels) -> [πλήθος ανά bucket..., πλήθος +Inf, άθροισμα]
+        self._histograms = {}
+        self._store = None
+        self._store_pid = None
+
+    def inc(self, name, value=1, **labels):
+        key = (name, _label_key(labels))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def set_gauge(self, name, value, **labels):
+        with self._lock:
+            self._gauges[(name, _label_key(labels))] = value
+
+    def observe(self, name, value, **labels):
+        key = (name, _label_key(labels))
+        index = len(self.buckets)
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                index = i
+                break
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = [0] * (len(self.buckets) + 1) + [0.0]
+            histogram[index] += 1
+            histogram[-1] += value
+
+    @contextmanager
+    def timer(self, stage, **labels):
+        """Χρόνος ενός σταδίου στο pension_stage_duration_seconds{stage=...}"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(STAGE_SECONDS, time.perf_counter() - start, stage=stage, **labels)
+
+    def reset(self):
+        with self._lock:
+            self._counters = {}
+            self._gauges = {}
+            self._histograms = {}
+
+    def drain(self):
+        """Όσα μετρήθηκαν από την τελευταία κλήση (picklable), με μηδενισμό του registry"""
+        with self._lock:
+            snapshot = {'counters': self._counters, 'histograms': self._histograms}
+            self._counters = {}
+            self._histograms = {}
+        return snapshot
+
+    def share(self, store, publish_interval=5.0):
+        """Κοινό άθροισμα με τα υπόλοιπα processes (βλ. MetricsStore) - μετά το fork"""
+        self._store = store
+        self._store_pid = os.getpid()
+        thread = threading.Thread(target=self._publish_loop, args=(publish_interval,),
+                                  name='metrics-publisher', daemon=True)
+        thread.start()
+
+    def _publish_loop(self, interval):
+        while True:
+            time.sleep(interval)
+            self.publish()
+
+    def publish(self):
+        """Πρόσθεση των νέων μετρήσεων στο κοινό store. Τα processes της ουράς εργασιών
+        (fork του worker) δεν γράφουν: οι μετρήσεις τους επιστρέφουν με drain()."""
+        if self._store is None or self._store_pid != os.getpid():
+            return
+        snapshot = self.drain()
+        try:
+            self._store.add(snapshot)
+        except Exception as e:
+            logger.warning('Metrics publish failed: %s', e)
+            self.merge(snapshot)
+
+    def merge(self, snapshot):
+        """Πρόσθεση των μετρήσεων ενός άλλου process (βλ. drain)"""
+        if not snapshot:
+            return
+        with self._lock:
+            for key, value in snapshot['counters'].items():
+                self._counters[key] = self._counters.get(key, 0) + value
+            for key, values in snapshot['histograms'].items():
+                histogram = self._histograms.get(key)
+                if histogram is None:
+                    self._histograms[key] = list(values)
+                else:
+                    self._histograms[key] = [a + b for a, b in zip(histogram, values)]
+
+    def render(self):
+        """Κείμενο για το /metrics (Prometheus text exposition format 0.0.4)"""
+        shared = None
+        if self._store is not None and self._store_pid == os.getpid():
+            self.publish()
+            shared = self._store.load(len(self.buckets) + 2)
+        with self._lock:
+            counters = shared['counters'] if shared else self._counters
+            histograms = shared['histograms'] if shared else self._histograms
+            series = {}
+            for (name, labels), value in counters.items():
+                series.setdefault(name, []).append((labels, value))
+            for (name, labels), value in self._gauges.items():
+                series.setdefault(name, []).append((labels, value))
+            for (name, labels), histogram in histograms.items():
+                series.setdefault(name, []).append((labels, list(histogram)))
+
+        lines = []
+        for name in sorted(series):
+            metric_type, help_text = METRIC_HELP.get(name, ('untyped', name))
+            lines.append(f'# HELP {name} {help_text}')
+            lines.append(f'# TYPE {name} {metric_type}')
+            for labels, value in sorted(series[name]):
+                if metric_type != 'histogram':
+                    lines.append(f'{name}{_format_labels(labels)} {_format_value(value)}')
+                    continue
+                cumulative = 0
+                for bound, count in zip(self.buckets + ('+Inf',), value[:-1]):
+                    cumulative += count
+                    bucket_labels = _format_labels(labels, [('le', str(bound))])
+                    lines.append(f'{name}_bucket{bucket_labels} {cumulative}')
+                lines.append(f'{name}_sum{_format_labels(labels)} {_format_value(value[-1])}')
+                lines.append(f'{name}_count{_format_labels(labels)} {cumulative}')
+        return '\n'.join(lines) + '\n'
+
+
+metrics = Metrics()
@@ -0,0 +1,171 @@
+from database import SQLITE
+
+# Πεδία εισόδου ενός υπολογισμού και τα παράγωγα πεδία που προκύπτουν από αυτά
+INPUT_COLUMNS = [
+    'gender', 'birth_year', 'current_age', 'insurance_years', 'heavy_work_years',
+    'salary', 'fund', 'children'
+]
+DERIVED_COLUMNS = [
+    'basic_pension', 'national_pension', 'social_benefit', 'children_benefit',
+    'total_pension', 'replacement_rate', 'retirement_age', 'years_remaining',
+    'eligible_for_early', 'eligible_for_heavy', 'required_years_full',
+    'required_years_early', 'required_heavy_years'
+]
+# Ιστορικό περιόδων ασφάλισης (packed InsuranceHistory), μόνο για υπολογισμούς σταδιοδρομίας
+HISTORY_COLUMN = 'insurance_history'
+
+CREATE_USERS = '''
+    CREATE TABLE IF NOT EXISTS users (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        email TEXT UNIQUE NOT NULL,
+        password_hash TEXT NOT NULL,
+        full_name TEXT,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )
+'''
+
+CREATE_CALCULATIONS = '''
+    CREATE TABLE IF NOT EXISTS calculations (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        user_id INTEGER,
+        gender TEXT NOT NULL,
+        birth_year INTEGER NOT NULL,
+        current_age INTEGER NOT NULL,
+        insurance_years INTEGER NOT NULL,
+        heavy_work_years INTEGER DEFAULT 0,
+        salary REAL NOT NULL,
+        fund TEXT NOT NULL,
+        children INTEGER DEFAULT 0,
+        basic_pension REAL NOT NULL,
+        national_pension REAL NOT NULL,
+        social_benefit REAL NOT NULL,
+        children_benefit REAL NOT NULL,
+        total_pension REAL NOT NULL,
+        replacement_rate REAL NOT NULL,
+        retirement_age INTEGER NOT NULL,
+        years_remaining INTEGER NOT NULL,
+        eligible_for_early BOOLEAN NOT NULL,
+        eligible_for_heavy BOOLEAN NOT NULL,
+        required_years_full INTEGER NOT NULL,
+        required_years_early INTEGER NOT NULL,
+        required_heavy_years INTEGER NOT NULL,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        FOREIGN KEY (user_id) REFERENCES users (id)
+    )
+'''
+
+# Τα παράγωγα πεδία γίνονται προαιρετικά: με CALCULATION_STORAGE = 'inputs'
+# αποθηκεύονται μόνο οι είσοδοι + rules_version και τα υπόλοιπα υπολογίζονται στην ανάγνωση
+CREATE_CALCULATIONS_V3 = '''
+    CREATE TABLE calculations_v3 (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        user_id INTEGER,
+        gender TEXT NOT NULL,
+        birth_year INTEGER NOT NULL,
+        current_age INTEGER NOT NULL,
+        insurance_years INTEGER NOT NULL,
+        heavy_work_years INTEGER DEFAULT 0,
+        salary REAL NOT NULL,
+        fund TEXT NOT NULL,
+        children INTEGER DEFAULT 0,
+        basic_pension REAL,
+        national_pension REAL,
+        social_benefit REAL,
+        children_benefit REAL,
+        total_pension REAL,
+        replacement_rate REAL,
+        retirement_age INTEGER,
+        years_remaining INTEGER,
+        eligible_for_early BOOLEAN,
+        eligible_for_heavy BOOLEAN,
+        required_years_full INTEGER,
+        required_years_early INTEGER,
+        required_heavy_years INTEGER,
+        rules_version TEXT,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        FOREIGN KEY (user_id) REFERENCES users (id)
+    )
+'''
+
+# Πρόοδος του επανυπολογισμού ανά έκδοση κανόνων (βλ. rules_backfill)
+CREATE_RULES_BACKFILLS = '''
+    CREATE TABLE IF NOT EXISTS rules_backfills (
+        rules_version TEXT PRIMARY KEY,
+        status TEXT NOT NULL,
+        last_id INTEGER NOT NULL DEFAULT 0,
+        total INTEGER NOT NULL DEFAULT 0,
+        processed INTEGER NOT NULL DEFAULT 0,
+        updated INTEGER NOT NULL DEFAULT 0,
+        errors INTEGER NOT NULL DEFAULT 0,
+        started_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        updated_at TIMESTAMP,
+        finished_at TIMESTAMP
+    )
+'''
+
+CREATE_HISTORY_INDEX = '''
+    CREATE INDEX IF NOT EXISTS idx_calculations_user_created
+    ON calculations (user_id, created_at, id)
+'''
+
+
+def _optional_derived_columns(db, conn):
+    if db.backend == SQLITE:
+        # Το SQLite δεν αφαιρεί NOT NULL με ALTER - ο πίνακας ξαναχτίζεται
+        columns = ', '.join(['id', 'user_id'] + INPUT_COLUMNS + DERIVED_COLUMNS + ['created_at'])
+        db.run(conn, CREATE_CALCULATIONS_V3)
+        db.run(conn, f'INSERT INTO calculations_v3 ({columns}) SELECT {columns} FROM calculations')
+        db.run(conn, 'DROP TABLE calculations')
+        db.run(conn, 'ALTER TABLE calculations_v3 RENAME TO calculations')
+        db.run(conn, CREATE_HISTORY_INDEX)
+        return
+    for column in DERIVED_COLUMNS:
+        db.run(conn, f'ALTER TABLE calculations ALTER COLUMN {column} DROP NOT NULL')
+    db.run(conn, 'ALTER TABLE calculations ADD COLUMN rules_version TEXT')
+
+
+def _insurance_history_column(db, conn):
+    column_type = 'BLOB' if db.backend == SQLITE else 'BYTEA'
+    db.run(conn, f'ALTER TABLE calculations ADD COLUMN {HISTORY_COLUMN} {column_type}')
+
+
+# (έκδοση, περιγραφή, λίστα SQL ή συνάρτηση(db, conn)) - μόνο προσθήκες στο τέλος
+MIGRATIONS = [
+    (1, 'initial schema', [CREATE_USERS, CREATE_CALCULATIONS]),
+    (2, 'history index on (user_id, created_at)', [CREATE_HISTORY_INDEX]),
+    (3, 'optional derived columns and rules_version', _optional_derived_columns),
+    (4, 'insurance history blob', _insurance_history_column),
+    (5, 'rules backfill progress', [CREATE_RULES_BACKFILLS]),
+]
+
+
+def applied_versions(db):
+    db.execute('''
+        CREATE TABLE IF NOT EXISTS schema_migrations (
+            version INTEGER PRIMARY KEY,
+            name TEXT NOT NULL,
+            applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+    return {row['version'] for row in db.query_all('SELECT version FROM schema_migrations')}
+
+
+def migrate(db):
+    """Εφαρμογή των εκκρεμών migrations, η καθεμία σε δική της συναλλαγή.
+    Ασφαλές να τρέξει ταυτόχρονα από πολλούς workers: ο έλεγχος γίνεται μέσα στη συναλλαγή."""
+    done = applied_versions(db)
+    applied = []
+    for version, name, steps in MIGRATIONS:
+        if version in done:
+            continue
+        with db.transaction() as conn:
+            if db.run(conn, 'SELECT 1 FROM schema_migrations WHERE version = ?', (version,)).fetchone():
+                continue
+            if callable(steps):
+                steps(db, conn)
+            else:
+                for sql in steps:
+                    db.run(conn, sql)
+            db.run(conn, 'INSERT INTO schema_migrations (version, name) VALUES (?, ?)', (version, name))
+        applied.append(version)
+    return applied
@@ -0,0 +1,155 @@
+import os
+import threading
+from datetime import datetime
+
+from fpdf import FPDF
+
+from config import Config
+
+FONT_FAMILY = 'DejaVu'
+
+# Διάταξη της αναφοράς, ορισμένη μία φορά: (τίτλος ενότητας, [(ετικέτα, μορφή τιμής), ...])
+PERSONAL_SECTION = ('ΣΤΟΙΧΕΙΑ ΑΣΦΑΛΙΣΜΕΝΟΥ:', [
+    ('Φύλο', '{gender}'),
+    ('Έτος γέννησης', '{birth_year}'),
+    ('Τρέχουσα ηλικία', '{current_age} ετών'),
+    ('Έτη ασφάλισης', '{insurance_years}'),
+    ('Ημέρες ασφάλισης', '{insurance_days}'),
+    ('Έτη βαρέας εργασίας', '{heavy_work_years}'),
+    ('Μισθός', '{salary} €'),
+    ('Ταμείο', '{fund}'),
+    ('Παιδιά', '{children}'),
+])
+CALCULATION_SECTION = ('ΥΠΟΛΟΓΙΣΜΟΣ ΣΥΝΤΑΞΗΣ:', [
+    ('Βασική σύνταξη', '{basic_pension} €'),
+    ('Εθνική σύνταξη', '{national_pension} €'),
+    ('Επίδομα κοινωνικής ασφάλισης', '{social_benefit} €'),
+    ('Επίδομα τέκνων', '{children_benefit} €'),
+    ('ΣΥΝΟΛΙΚΗ ΣΥΝΤΑΞΗ', '{total_pension} €'),
+    ('Ποσοστό αντικατάστασης', '{replacement_rate}%'),
+    ('Ηλικία συνταξιοδότησης', '{retirement_age}'),
+    ('Έτη που απομένουν', '{years_remaining}'),
+])
+ELIGIBILITY_SECTION = ('ΔΙΚΑΙΟΛΟΓΗΣΗ:', [
+    ('Πλήρης σύνταξη', 'eligible_for_full'),
+    ('Προνομιακή σύνταξη', 'eligible_for_early'),
+    ('Σύνταξη βαρέας εργασίας', 'eligible_for_heavy'),
+])
+REQUIRED_SECTION = ('ΑΠΑΙΤΟΥΜΕΝΑ ΓΙΑ ΠΛΗΡΗ ΣΥΝΤΑΞΗ:', [
+    ('Επιπλέον έτη ασφάλισης', '{required_years_full}'),
+    ('Επιπλέον έτη βαρέας εργασίας', '{required_heavy_years}'),
+])
+
+
+class ReportRenderer:
+    """Δημιουργία αναφορών PDF στη μνήμη.
+
+    Οι μετρικές της γραμματοσειράς TTF (ανάλυση του αρχείου, το πιο ακριβό βήμα του
+    add_font) υπολογίζονται μία φορά ανά process και αντιγράφονται σε κάθε νέο έγγραφο.
+    Χωρίς DejaVu, γίνεται fallback στη βασική Arial (χωρίς ελληνικούς χαρακτήρες)."""
+
+    def __init__(self, font_path, bold_font_path):
+        self.font_path = font_path
+        self.bold_font_path = bold_font_path
+        self._fonts = None
+        self._font_files = None
+        self._lock = threading.Lock()
+
+    def _load_fonts(self):
+        with self._lock:
+            if self._fonts is not None:
+                return
+            fonts, font_files = {}, {}
+            if os.path.exists(self.font_path) and os.path.exists(self.bold_font_path):
+                template = FPDF()
+                template.add_font(FONT_FAMILY, '', self.font_path, uni=True)
+                template.add_font(FONT_FAMILY, 'B', self.bold_font_path, uni=True)
+                fonts, font_files = template.fonts, template.font_files
+            else:
+                print(f"⚠️  Report font not found: {self.font_path}")
+            self._font_files = font_files
+            self._fonts = fonts
+
+    def warm_up(self):
+        """Φόρτωση των γραμματοσειρών πριν από την πρώτη αναφορά (π.χ. πριν από το fork των workers)"""
+        if self._fonts is None:
+            self._load_fonts()
+
+    def _new_document(self):
+        if self._fonts is None:
+            self._load_fonts()
+        pdf = FPDF()
+        for fontkey, font in self._fonts.items():
+            # Το subset (χαρακτήρες που χρησιμοποιήθηκαν) είναι ανά έγγραφο
+            pdf.fonts[fontkey] = dict(font, subset=list(font['subset']))
+        pdf.font_files.update(self._font_files)
+        return pdf
+
+    def _text(self, text):
+        if self._fonts:
+            return text
+        return text.encode('latin-1', 'replace').decode('latin-1')
+
+    def _set_font(self, pdf, style, size):
+        if self._fonts:
+            # Η DejaVu φορτώνεται μόνο σε regular και bold - η πλάγια γίνεται regular
+            pdf.set_font(FONT_FAMILY, 'B' if style == 'B' else '', size)
+        else:
+            pdf.set_font('Arial', style, size)
+
+    def _line(self, pdf, height, text):
+        pdf.cell(200, height, self._text(text), 0, 1)
+
+    def _section(self, pdf, section, pension_data, title_size=12, size=11, height=8):
+        title, rows = section
+        self._set_font(pdf, 'B', title_size)
+        pdf.cell(200, 10 if title_size == 12 else height, self._text(title), 0, 1)
+        self._set_font(pdf, '', size)
+        for label, value_format in rows:
+            self._line(pdf, height, f'{label}: {value_format.format(**pension_data)}')
+
+    def render(self, pension_data):
+        """Η αναφορά ως bytes PDF"""
+        pdf = self._new_document()
+        pdf.add_page()
+        self._set_font(pdf, 'B', 16)
+        pdf.cell(200, 10, self._text('SYNTAXIOLOGOS - ΑΝΑΛΥΤΙΚΗ ΕΚΘΕΣΗ ΣΥΝΤΑΞΗΣ'), 0, 1, 'C')
+        pdf.ln(10)
+
+        title, rows = PERSONAL_SECTION
+        if not pension_data.get('insurance_days'):
+            rows = [row for row in rows if row[1] != '{insurance_days}']
+        self._set_font(pdf, 'B', 12)
+        pdf.cell(200, 10, self._text(title), 0, 1)
+        self._set_font(pdf, '', 11)
+        self._line(pdf, 8, f"Πηγή δεδομένων: {pension_data.get('data_source', 'Χειροκίνητη εισαγωγή')}")
+        for label, value_format in rows:
+            self._line(pdf, 8, f'{label}: {value_format.format(**pension_data)}')
+
+        pdf.ln(10)
+        self._section(pdf, CALCULATION_SECTION, pension_data)
+
+        pdf.ln(10)
+        title, rows = ELIGIBILITY_SECTION
+        self._section(pdf, (title, [
+            (label, 'ΝΑΙ' if pension_data[field] else 'ΟΧΙ') for label, field in rows
+        ]), pension_data)
+
+        if not pension_data['eligible_for_full']:
+            pdf.ln(5)
+            self._section(pdf, REQUIRED_SECTION, pension_data, title_size=11, size=10, height=6)
+
+        pdf.ln(15)
+        self._set_font(pdf, 'I', 10)
+        self._line(pdf, 8, f"Ημερομηνία υπολογισμού: {datetime.now().strftime('%d/%m/%Y %H:%M')}")
+        self._line(pdf, 8, "ΣΥΝΤΑΞΙΟΛΟΓΟΣ - Σύστημα Αυτόματων Υπολογισμών Σύνταξης")
+
+        # Το fpdf 1.7 επιστρέφει το έγγραφο ως str με bytes σε latin-1
+        return pdf.output(dest='S').encode('latin-1')
+
+
+report_renderer = ReportRenderer(Config.REPORT_FONT_PATH, Config.REPORT_BOLD_FONT_PATH)
+
+
+def create_pdf_report(pension_data):
+    return report_renderer.render(pension_data)
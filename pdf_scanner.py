@@ -0,0 +1,159 @@
+import re
+import zlib
+
+# Μέγεθος chunk αποσυμπίεσης και επικάλυψη, ώστε ένας αριθμός στο όριο δύο
+# chunks να μη χάνεται ούτε να διαβάζεται κομμένος (οι κανόνες ταιριάζουν λίγα bytes)
+CHUNK_SIZE = 256 * 1024
+OVERLAP = 64
+
+# Προστασία από "zip bombs": μέγιστα αποσυμπιεσμένα bytes ανά αρχείο
+MAX_DECOMPRESSED_BYTES = 64 * 1024 * 1024
+
+# Μέγιστο μήκος ενός literal string που συνεχίζεται στο επόμενο chunk
+MAX_STRING_BYTES = 64 * 1024
+
+# Πόσο πίσω από το 'stream' ψάχνουμε το dictionary του αντικειμένου
+STREAM_HEADER_LOOKBACK = 1024
+
+# Streams που δεν έχουν κείμενο σελίδας: εικόνες (και τα EXIF τους), XMP metadata,
+# ενσωματωμένες γραμματοσειρές (/Length1-3) και ICC profiles (/N)
+NON_TEXT_STREAMS = (b'/Image', b'/Metadata', b'/Length1', b'/Length2', b'/Length3', b'/N ')
+
+STREAM_START = re.compile(rb'(?<!end)stream\r?\n')
+STREAM_END = re.compile(rb'\r?\nendstream|endstream')
+# Literal string του content stream, π.χ. (8123) Tj, με escaped παρενθέσεις μέσα του
+LITERAL_STRING = re.compile(rb'\(((?:\\.|[^\\()])*)\)', re.S)
+
+
+def _find_first(regex, data, accept, found_key, found, lower=0, upper=None):
+    """Πρώτο αποδεκτό match που τελειώνει στο (lower, upper]. Ό,τι τελειώνει ως το
+    lower κρίθηκε ήδη στο προηγούμενο παράθυρο, και ό,τι περνά το upper μπορεί
+    να συνεχίζεται στο επόμενο chunk."""
+    for match in regex.finditer(data):
+        if match.end() <= lower:
+            continue
+        if upper is not None and match.end() > upper:
+            return
+        value = accept(match.group(1))
+        if value is not None:
+            found[found_key] = value
+            return
+
+
+def _scan_buffer(data, rules, found, lower=0, upper=None):
+    for key, (regex, accept) in rules.items():
+        if key not in found:
+            _find_first(regex, data, accept, key, found, lower, upper)
+
+
+def _scan_chunks(chunks, rules, found):
+    """Σάρωση ροής chunks σε παράθυρα με επικάλυψη. Σε κάθε παράθυρο κρίνονται μόνο
+    τα matches που τελειώνουν πριν από τα τελευταία OVERLAP bytes· η ουρά κρίνεται
+    στο επόμενο παράθυρο, μαζί με OVERLAP bytes πριν από αυτή για τα lookbehind."""
+    window = b''
+    decided = 0
+    for chunk in chunks:
+        window += chunk
+        limit = len(window) - OVERLAP
+        if limit > decided:
+            _scan_buffer(window, rules, found, decided, limit)
+            if len(found) == len(rules):
+                return
+            decided = limit
+        keep = max(0, decided - OVERLAP)
+        window = window[keep:]
+        decided -= keep
+    _scan_buffer(window, rules, found, decided)
+
+
+def _iter_streams(view):
+    """(αρχή, τέλος, dictionary) κάθε stream του PDF"""
+    position = 0
+    while True:
+        start = STREAM_START.search(view, position)
+        if not start:
+            return
+        end = STREAM_END.search(view, start.end())
+        if not end:
+            return
+        header = bytes(view[max(0, start.start() - STREAM_HEADER_LOOKBACK):start.start()])
+        object_start = header.rfind(b'obj')
+        if object_start != -1:
+            header = header[object_start:]
+        yield start.end(), end.start(), header
+        position = end.end()
+
+
+def _iter_text(chunks):
+    """Τα literal strings ((...)) ενός content stream, εκεί όπου βρίσκεται το κείμενο
+    της σελίδας, ένα κομμάτι ανά chunk. Ένα string που κόβεται στο όριο του chunk
+    συνεχίζεται στο επόμενο, και κάθε string τελειώνει σε κενό ώστε οι αριθμοί
+    δύο διαφορετικών strings να μην ενώνονται."""
+    pending = b''
+    for chunk in chunks:
+        data = pending + chunk
+        strings = []
+        end = 0
+        for match in LITERAL_STRING.finditer(data):
+            strings.append(match.group(1))
+            end = match.end()
+        open_string = data.find(b'(', end)
+        pending = data[open_string:] if open_string != -1 and len(data) - open_string <= MAX_STRING_BYTES else b''
+        if strings:
+            yield b' '.join(strings) + b' '
+
+
+def _iter_decompressed(view, start, end, budget):
+    """Lazy αποσυμπίεση ενός stream σε κομμάτια των CHUNK_SIZE bytes"""
+    decompressor = zlib.decompressobj()
+    produced = 0
+    for offset in range(start, end, CHUNK_SIZE):
+        data = view[offset:min(offset + CHUNK_SIZE, end)]
+        while data:
+            chunk = decompressor.decompress(data, CHUNK_SIZE)
+            data = decompressor.unconsumed_tail
+            if not chunk:
+                break
+            produced += len(chunk)
+            if produced > budget[0]:
+                budget[0] = 0
+                return
+            yield chunk
+        if decompressor.eof:
+            break
+    budget[0] -= produced
+
+
+def scan_pdf_bytes(buffer, rules, decode_streams=True):
+    """Πρώτη αποδεκτή τιμή για κάθε κανόνα (bytes regex, accept) στο κείμενο των content
+    streams ενός PDF (bytes/mmap/memoryview). Πρώτα τα streams χωρίς φίλτρο, χωρίς
+    αντιγραφή του αρχείου, και μόνο για ό,τι λείπει ακόμα τα FlateDecode streams.
+    Έξω από τα streams υπάρχει μόνο η δομή του PDF (μήκη, offsets) και όχι κείμενο."""
+    found = {}
+    view = memoryview(buffer)
+    try:
+        flate_streams = []
+        for start, end, header in _iter_streams(view):
+            if any(marker in header for marker in NON_TEXT_STREAMS):
+                continue
+            if b'/Filter' not in header:
+                _scan_chunks(_iter_text(bytes(view[offset:min(offset + CHUNK_SIZE, end)])
+                                        for offset in range(start, end, CHUNK_SIZE)), rules, found)
+                if len(found) == len(rules):
+                    return found
+            elif b'/FlateDecode' in header:
+                flate_streams.append((start, end))
+        if not decode_streams:
+            return found
+
+        budget = [MAX_DECOMPRESSED_BYTES]
+        for start, end in flate_streams:
+            try:
+                _scan_chunks(_iter_text(_iter_decompressed(view, start, end, budget)), rules, found)
+            except zlib.error:
+                continue
+            if len(found) == len(rules) or budget[0] <= 0:
+                break
+        return found
+    finally:
+        view.release()
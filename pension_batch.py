@@ -0,0 +1,271 @@
+import csv
+import io
+import json
+from itertools import compress, repeat
+from operator import eq, is_not, itemgetter, methodcaller
+
+from backends import available, optional_module
+from insurance_history import career_inputs
+from pension_calculator import calculate_greek_pension
+from pension_rules import RULES, MALE, OTHER_GENDER
+
+DEFAULT_DATA_SOURCE = 'Χειροκίνητη εισαγωγή'
+
+# Σειρά στηλών στην έξοδο CSV
+BATCH_OUTPUT_FIELDS = [
+    'gender', 'birth_year', 'current_age', 'insurance_years', 'heavy_work_years',
+    'salary', 'fund', 'children', 'basic_pension', 'national_pension', 'social_benefit',
+    'children_benefit', 'total_pension', 'replacement_rate', 'retirement_age',
+    'years_remaining', 'eligible_for_full', 'eligible_for_early', 'eligible_for_heavy',
+    'required_years_full', 'required_years_early', 'required_heavy_years',
+    'data_source', 'error'
+]
+
+
+def _parse_profile(profile):
+    """Ίδιες μετατροπές τύπων με το calculate_greek_pension"""
+    return (
+        profile['gender'],
+        int(profile['birth_year']),
+        int(profile['current_age']),
+        int(profile['insurance_years']),
+        int(profile.get('heavy_work_years', 0)),
+        float(profile['salary']),
+        profile['fund'],
+        int(profile.get('children', 0)),
+        profile.get('data_source', DEFAULT_DATA_SOURCE),
+    )
+
+
+# Στήλες εισόδου που επιστρέφονται όπως διαβάστηκαν
+INPUT_FIELDS = ('gender', 'birth_year', 'current_age', 'insurance_years', 'heavy_work_years',
+                'salary', 'fund', 'children', 'data_source')
+
+# Πεδία και σειρά κάθε εγγραφής, όπως στο calculate_greek_pension
+RECORD_FIELDS = (
+    'basic_pension', 'national_pension', 'social_benefit', 'children_benefit',
+    'total_pension', 'replacement_rate', 'retirement_age', 'years_remaining',
+    'eligible_for_full', 'eligible_for_early', 'eligible_for_heavy',
+    'required_years_full', 'required_years_early', 'required_heavy_years'
+) + INPUT_FIELDS
+
+# Δεκαδικά ψηφία των ποσών (round του calculate_pension_amounts)
+ROUNDED_FIELDS = {
+    'basic_pension': 2, 'national_pension': 2, 'social_benefit': 2,
+    'children_benefit': 2, 'total_pension': 2, 'replacement_rate': 1,
+}
+
+# Κάτω από αυτό το μέτρο το σφάλμα του x * 10**digits είναι πολύ μικρότερο από ROUND_MARGIN
+ROUND_EXACT_LIMIT = 2.0 ** 30
+ROUND_MARGIN = 1e-6
+
+
+def _input_columns(inputs):
+    """Οι στήλες εισόδου απευθείας από τα dicts, ένα np.fromiter ανά πεδίο,
+    με τις μετατροπές τύπων του calculate_greek_pension"""
+    np = optional_module('numpy')
+    count = len(inputs)
+
+    def numbers(values, convert, dtype):
+        return np.fromiter(map(convert, values), dtype=dtype, count=count)
+
+    return {
+        'gender': list(map(itemgetter('gender'), inputs)),
+        'birth_year': numbers(map(itemgetter('birth_year'), inputs), int, np.int64),
+        'current_age': numbers(map(itemgetter('current_age'), inputs), int, np.int64),
+        'insurance_years': numbers(map(itemgetter('insurance_years'), inputs), int, np.int64),
+        'heavy_work_years': numbers(map(methodcaller('get', 'heavy_work_years', 0), inputs), int, np.int64),
+        'salary': numbers(map(itemgetter('salary'), inputs), float, np.float64),
+        'fund': list(map(itemgetter('fund'), inputs)),
+        'children': numbers(map(methodcaller('get', 'children', 0), inputs), int, np.int64),
+        'data_source': list(map(methodcaller('get', 'data_source', DEFAULT_DATA_SOURCE), inputs)),
+    }
+
+
+def _vectorized_columns(inputs, rules=RULES):
+    """Υπολογισμός όλων των πεδίων για N προφίλ σε column-wise περάσματα"""
+    np = optional_module('numpy')
+    count = len(inputs['gender'])
+    birth_year = inputs['birth_year']
+    current_age = inputs['current_age']
+    insurance_years = inputs['insurance_years']
+    heavy_work_years = inputs['heavy_work_years']
+    salary = inputs['salary']
+    children = inputs['children']
+    is_male = np.fromiter(map(eq, inputs['gender'], repeat('male')), dtype=bool, count=count)
+    gender_codes = np.where(is_male, MALE, OTHER_GENDER)
+    tables = rules.arrays
+
+    # Ηλικία συνταξιοδότησης: ένα lookup στον πίνακα [φύλο, έτος γέννησης]
+    age_index = np.clip(birth_year - rules.first_birth_year, 0, tables['ages'].shape[1] - 1)
+    retirement_age = np.where(
+        heavy_work_years >= rules.heavy_work_years,
+        rules.heavy_work_age,
+        tables['ages'][gender_codes, age_index]
+    )
+    years_remaining = np.maximum(0, retirement_age - current_age)
+
+    eligible_for_full = (current_age >= retirement_age) & (insurance_years >= rules.min_insurance_years)
+    eligible_for_early = np.where(
+        heavy_work_years >= rules.heavy_work_years,
+        (current_age >= rules.heavy_early_age) & (insurance_years >= rules.heavy_early_insurance_years),
+        (current_age >= rules.early_age) & (insurance_years >= rules.early_insurance_years)
+    )
+    eligible_for_heavy = heavy_work_years >= rules.heavy_eligibility_years
+
+    # Ποσοστό αναπλήρωσης: ένα lookup στον πίνακα [ταμείο, έτη ασφάλισης]
+    fund_codes = np.fromiter(map(rules.fund_codes.get, inputs['fund'], repeat(rules.default_fund_code)),
+                             dtype=np.int64, count=count)
+    replacement_rate = np.where(
+        insurance_years < 0,
+        rules.min_rate,
+        tables['rates'][fund_codes, np.clip(insurance_years, 0, rules.max_rate_years)]
+    )
+
+    basic_pension = salary * replacement_rate
+    national_pension = np.where(insurance_years >= rules.national_pension_min_years, rules.national_pension, 0.0)
+    social_benefit = np.where(basic_pension + national_pension < rules.social_benefit_threshold,
+                              rules.social_benefit, 0.0)
+    children_benefit = children * rules.child_benefit
+
+    reduced = eligible_for_early & ~eligible_for_full
+    basic_pension = np.where(reduced, basic_pension * (1 - years_remaining * rules.early_reduction_per_year),
+                             basic_pension)
+
+    total_pension = basic_pension + national_pension + social_benefit + children_benefit
+
+    return {
+        'basic_pension': basic_pension,
+        'national_pension': national_pension,
+        'social_benefit': social_benefit,
+        'children_benefit': children_benefit,
+        'total_pension': total_pension,
+        'replacement_rate': replacement_rate * 100,
+        'retirement_age': retirement_age,
+        'years_remaining': years_remaining,
+        'eligible_for_full': eligible_for_full,
+        'eligible_for_early': eligible_for_early,
+        'eligible_for_heavy': eligible_for_heavy,
+        'required_years_full': np.maximum(0, rules.min_insurance_years - insurance_years),
+        'required_years_early': np.maximum(0, rules.early_insurance_years - insurance_years),
+        'required_heavy_years': np.maximum(0, rules.heavy_eligibility_years - heavy_work_years),
+    }
+
+
+def _round_column(values, digits):
+    """round(x, digits) για όλη τη στήλη, με ίδιο αποτέλεσμα με το round της Python.
+    Το rint(x * 10**digits) / 10**digits διαφέρει μόνο όταν το x * 10**digits είναι
+    (σχεδόν) στη μέση δύο ακεραίων ή πολύ μεγάλο/μη πεπερασμένο: εκεί μετρά το round."""
+    np = optional_module('numpy')
+    scale = 10 ** digits
+    scaled = values * scale
+    rounded = (np.rint(scaled) / scale).tolist()
+    with np.errstate(invalid='ignore'):
+        ambiguous = ~(np.abs(scaled) < ROUND_EXACT_LIMIT) | \
+            (np.abs(scaled - np.floor(scaled) - 0.5) < ROUND_MARGIN)
+    for index in np.flatnonzero(ambiguous).tolist():
+        rounded[index] = round(float(values[index]), digits)
+    return rounded
+
+
+def _columns_to_records(inputs, columns):
+    """Μετατροπή των στηλών σε dicts ίδιας μορφής με το calculate_greek_pension"""
+    lists = []
+    for name in RECORD_FIELDS:
+        values = columns[name] if name in columns else inputs[name]
+        if name in ROUNDED_FIELDS:
+            lists.append(_round_column(values, ROUNDED_FIELDS[name]))
+        else:
+            lists.append(values if isinstance(values, list) else values.tolist())
+    return [dict(zip(RECORD_FIELDS, row)) for row in zip(*lists)]
+
+
+def _vectorized_records(inputs):
+    """Εγγραφές με column-wise υπολογισμό, ή None χωρίς numpy ή όταν κάποιο προφίλ
+    δεν γίνεται στήλη (άκυρη τιμή, ακέραιος εκτός int64)"""
+    if not available('numpy'):
+        return None
+    try:
+        columns = _input_columns(inputs)
+    except (KeyError, TypeError, ValueError, OverflowError):
+        return None
+    return _columns_to_records(columns, _vectorized_columns(columns))
+
+
+def _checked(inputs):
+    """Τα inputs, αφού περάσουν τις μετατροπές τύπων του calculate_greek_pension"""
+    _parse_profile(inputs)
+    return inputs
+
+
+def _convert_rows(positions, rows, convert, results):
+    """Γραμμή-γραμμή convert: (θέσεις, τιμές) όσων πέρασαν, σφάλμα στο results για τα άλλα"""
+    converted_positions = []
+    converted = []
+    for position, row in zip(positions, rows):
+        try:
+            converted.append(convert(row))
+            converted_positions.append(position)
+        except (KeyError, TypeError, ValueError) as e:
+            results[position] = {'error': f'Μη έγκυρο προφίλ: {e}'}
+    return converted_positions, converted
+
+
+def calculate_pension_batch(profiles):
+    """Υπολογισμός σύνταξης για πολλά προφίλ μαζί.
+    Επιστρέφει μία εγγραφή ανά προφίλ, στη σειρά εισόδου· τα άκυρα προφίλ έχουν πεδίο 'error'."""
+    results = [None] * len(profiles)
+    positions = range(len(profiles))
+    try:
+        inputs = list(map(career_inputs, profiles))
+    except (KeyError, TypeError, ValueError):
+        # Άκυρο ιστορικό περιόδων σε κάποιο προφίλ: έλεγχος γραμμή-γραμμή
+        positions, inputs = _convert_rows(positions, profiles, career_inputs, results)
+
+    records = _vectorized_records(inputs)
+    if records is None:
+        # Κάποιο προφίλ είναι άκυρο (ή λείπει το numpy): έλεγχος γραμμή-γραμμή και
+        # ξανά column-wise μόνο με τα έγκυρα, αλλιώς βαθμωτός υπολογισμός
+        positions, inputs = _convert_rows(positions, inputs, _checked, results)
+        records = _vectorized_records(inputs)
+        if records is None:
+            records = list(map(calculate_greek_pension, inputs))
+
+    # Το career_inputs επιστρέφει νέο dict μόνο για προφίλ με ιστορικό περιόδων
+    for index in compress(range(len(inputs)), map(is_not, inputs, map(profiles.__getitem__, positions))):
+        if inputs[index].get('insurance_history'):
+            records[index]['insurance_history'] = inputs[index]['insurance_history']
+    if len(records) == len(profiles):
+        return records
+    for position, record in zip(positions, records):
+        results[position] = record
+    return results
+
+
+def compare_with_scalar(profiles):
+    """Έλεγχος ισοδυναμίας: επιστρέφει τις διαφορές batch vs calculate_greek_pension"""
+    mismatches = []
+    for i, (profile, batch_result) in enumerate(zip(profiles, calculate_pension_batch(profiles))):
+        if 'error' in batch_result:
+            continue
+        scalar_result = calculate_greek_pension(profile)
+        for field, value in scalar_result.items():
+            if batch_result.get(field) != value or type(batch_result.get(field)) is not type(value):
+                mismatches.append((i, field, value, batch_result.get(field)))
+    return mismatches
+
+
+def read_batch_profiles(file_content, filename):
+    """Ανάγνωση προφίλ από CSV ή JSON (λίστα ή {"profiles": [...]})"""
+    if filename.lower().endswith('.csv'):
+        return list(csv.DictReader(io.StringIO(file_content.decode('utf-8-sig'))))
+    data = json.loads(file_content.decode('utf-8'))
+    return data if isinstance(data, list) else data.get('profiles', [])
+
+
+def write_batch_csv(results):
+    output = io.StringIO()
+    writer = csv.DictWriter(output, fieldnames=BATCH_OUTPUT_FIELDS, extrasaction='ignore')
+    writer.writeheader()
+    writer.writerows(results)
+    return output.getvalue()
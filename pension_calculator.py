@@ -0,0 +1,123 @@
+from collections import namedtuple
+from functools import lru_cache
+
+from insurance_history import career_inputs
+from pension_rules import RULES
+
+def calculate_retirement_age(birth_year, gender, heavy_work_years):
+    return RULES.retirement_age(birth_year, gender, heavy_work_years)
+
+def calculate_replacement_rate(insurance_years, fund):
+    return RULES.replacement_rate(insurance_years, fund)
+
+def check_full_pension_eligibility(current_age, insurance_years, retirement_age):
+    return (current_age >= retirement_age and insurance_years >= RULES.min_insurance_years)
+
+def check_early_pension_eligibility(current_age, insurance_years, heavy_work_years):
+    if heavy_work_years >= RULES.heavy_work_years:
+        return (current_age >= RULES.heavy_early_age and insurance_years >= RULES.heavy_early_insurance_years)
+    return (current_age >= RULES.early_age and insurance_years >= RULES.early_insurance_years)
+
+def check_heavy_work_pension_eligibility(heavy_work_years):
+    return heavy_work_years >= RULES.heavy_eligibility_years
+
+def calculate_national_pension(insurance_years, basic_pension=None):
+    if insurance_years >= RULES.national_pension_min_years:
+        return RULES.national_pension
+    return 0.0
+
+def calculate_social_benefit(total_pension_before_benefits):
+    if total_pension_before_benefits < RULES.social_benefit_threshold:
+        return RULES.social_benefit
+    return 0.0
+
+def calculate_children_benefit(children):
+    return children * RULES.child_benefit
+
+def calculate_early_reduction(years_early):
+    return years_early * RULES.early_reduction_per_year
+
+# Τα μέρη του υπολογισμού που δεν εξαρτώνται από μισθό και παιδιά
+ProfileTerms = namedtuple('ProfileTerms', [
+    'retirement_age', 'years_remaining', 'eligible_for_full', 'eligible_for_early',
+    'eligible_for_heavy', 'replacement_rate', 'national_pension', 'reduction_rate'
+])
+
+@lru_cache(maxsize=4096)
+def calculate_profile_terms(gender, birth_year, current_age, insurance_years, heavy_work_years, fund):
+    """Ηλικία συνταξιοδότησης, δικαιώματα, ποσοστό αναπλήρωσης και εθνική σύνταξη (memoized)"""
+    retirement_age = calculate_retirement_age(birth_year, gender, heavy_work_years)
+    years_remaining = max(0, retirement_age - current_age)
+    
+    eligible_for_full = check_full_pension_eligibility(current_age, insurance_years, retirement_age)
+    eligible_for_early = check_early_pension_eligibility(current_age, insurance_years, heavy_work_years)
+    eligible_for_heavy = check_heavy_work_pension_eligibility(heavy_work_years)
+    
+    replacement_rate = calculate_replacement_rate(insurance_years, fund)
+    national_pension = calculate_national_pension(insurance_years)
+    
+    reduction_rate = None
+    if eligible_for_early and not eligible_for_full:
+        reduction_rate = calculate_early_reduction(years_remaining)
+    
+    return ProfileTerms(retirement_age, years_remaining, eligible_for_full, eligible_for_early,
+                        eligible_for_heavy, replacement_rate, national_pension, reduction_rate)
+
+def calculate_pension_amounts(terms, salary, children):
+    """Ποσά σύνταξης για συγκεκριμένο μισθό και αριθμό παιδιών"""
+    basic_pension = salary * terms.replacement_rate
+    
+    national_pension = terms.national_pension
+    social_benefit = calculate_social_benefit(basic_pension + national_pension)
+    children_benefit = calculate_children_benefit(children)
+    
+    if terms.reduction_rate is not None:
+        basic_pension *= (1 - terms.reduction_rate)
+    
+    total_pension = basic_pension + national_pension + social_benefit + children_benefit
+    
+    return {
+        'basic_pension': round(basic_pension, 2),
+        'national_pension': round(national_pension, 2),
+        'social_benefit': round(social_benefit, 2),
+        'children_benefit': round(children_benefit, 2),
+        'total_pension': round(total_pension, 2),
+        'replacement_rate': round(terms.replacement_rate * 100, 1),
+        'retirement_age': terms.retirement_age,
+        'years_remaining': terms.years_remaining,
+        'eligible_for_full': terms.eligible_for_full,
+        'eligible_for_early': terms.eligible_for_early,
+        'eligible_for_heavy': terms.eligible_for_heavy,
+    }
+
+def calculate_greek_pension(form_data):
+    # Με ιστορικό περιόδων, έτη ασφάλισης και μισθός προκύπτουν από όλη τη σταδιοδρομία
+    form_data = career_inputs(form_data)
+    gender = form_data['gender']
+    birth_year = int(form_data['birth_year'])
+    current_age = int(form_data['current_age'])
+    insurance_years = int(form_data['insurance_years'])
+    heavy_work_years = int(form_data.get('heavy_work_years', 0))
+    salary = float(form_data['salary'])
+    fund = form_data['fund']
+    children = int(form_data.get('children', 0))
+    
+    terms = calculate_profile_terms(gender, birth_year, current_age, insurance_years, heavy_work_years, fund)
+    result = calculate_pension_amounts(terms, salary, children)
+    result.update({
+        'required_years_full': max(0, RULES.min_insurance_years - insurance_years),
+        'required_years_early': max(0, RULES.early_insurance_years - insurance_years),
+        'required_heavy_years': max(0, RULES.heavy_eligibility_years - heavy_work_years),
+        'gender': gender,
+        'birth_year': birth_year,
+        'current_age': current_age,
+        'insurance_years': insurance_years,
+        'heavy_work_years': heavy_work_years,
+        'salary': salary,
+        'fund': fund,
+        'children': children,
+        'data_source': form_data.get('data_source', 'Χειροκίνητη εισαγωγή')
+    })
+    if form_data.get('insurance_history'):
+        result['insurance_history'] = form_data['insurance_history']
+    return result
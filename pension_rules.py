@@ -0,0 +1,111 @@
+import hashlib
+import json
+import os
+
+from backends import optional_module
+from config import Config
+
+MALE = 0
+OTHER_GENDER = 1
+
+
+class PensionRules:
+    """Κανόνες σύνταξης compiled σε πυκνούς πίνακες lookup - O(1) ανά υπολογισμό"""
+
+    def __init__(self, config):
+        self.version = config['version']
+        # Ετικέτα των αποθηκευμένων υπολογισμών: έκδοση + hash των πινάκων, ώστε αλλαγή
+        # συντελεστών ή ορίων ηλικίας να φαίνεται ακόμα κι αν δεν άλλαξε το 'version'
+        digest = hashlib.sha256(json.dumps(config, sort_keys=True).encode('utf-8')).hexdigest()
+        self.tag = f"{self.version}-{digest[:8]}"
+
+        rates = config['replacement_rates']
+        self.min_rate = rates['min_rate']
+        self.fund_codes = {fund: code for code, fund in enumerate(rates['funds'])}
+        self.default_fund_code = self.fund_codes[rates['default_fund']]
+        # Ένας πίνακας ανά ταμείο: θέση = έτη ασφάλισης, τιμή = ποσοστό αναπλήρωσης
+        self.max_rate_years = max(int(years) for table in rates['funds'].values() for years in table)
+        self.rate_tables = [
+            self._compile_rate_table(table) for table in rates['funds'].values()
+        ]
+
+        ages = config['retirement_age']
+        self.heavy_work_years = ages['heavy_work_years']
+        self.heavy_work_age = ages['heavy_work_age']
+        # Πίνακας ανά φύλο: θέση = έτος γέννησης - first_birth_year (με clamp στα άκρα)
+        brackets = sorted(ages['brackets'], key=lambda b: b['max_birth_year'])
+        self.first_birth_year = brackets[0]['max_birth_year']
+        last_birth_year = brackets[-1]['max_birth_year'] + 1
+        self.age_tables = (
+            self._compile_age_table(brackets, ages['default'], 'male', last_birth_year),
+            self._compile_age_table(brackets, ages['default'], 'female', last_birth_year),
+        )
+
+        eligibility = config['eligibility']
+        self.min_insurance_years = eligibility['min_insurance_years']
+        self.early_age = eligibility['early_age']
+        self.early_insurance_years = eligibility['early_insurance_years']
+        self.heavy_early_age = eligibility['heavy_early_age']
+        self.heavy_early_insurance_years = eligibility['heavy_early_insurance_years']
+        self.heavy_eligibility_years = eligibility['heavy_work_years']
+
+        benefits = config['benefits']
+        self.national_pension = benefits['national_pension']
+        self.national_pension_min_years = benefits['national_pension_min_years']
+        self.social_benefit = benefits['social_benefit']
+        self.social_benefit_threshold = benefits['social_benefit_threshold']
+        self.child_benefit = benefits['child_benefit']
+        self.early_reduction_per_year = benefits['early_reduction_per_year']
+
+        self._arrays = None
+
+    def _compile_rate_table(self, thresholds):
+        table = [self.min_rate] * (self.max_rate_years + 1)
+        for years, rate in sorted((int(years), rate) for years, rate in thresholds.items()):
+            for index in range(years, self.max_rate_years + 1):
+                table[index] = rate
+        return table
+
+    def _compile_age_table(self, brackets, default, gender, last_birth_year):
+        table = []
+        for birth_year in range(self.first_birth_year, last_birth_year + 1):
+            bracket = next((b for b in brackets if birth_year <= b['max_birth_year']), default)
+            table.append(bracket[gender])
+        return table
+
+    @classmethod
+    def load(cls, path):
+        with open(path, encoding='utf-8') as f:
+            return cls(json.load(f))
+
+    def fund_code(self, fund):
+        return self.fund_codes.get(fund, self.default_fund_code)
+
+    def replacement_rate(self, insurance_years, fund):
+        if insurance_years < 0:
+            return self.min_rate
+        return self.rate_tables[self.fund_code(fund)][min(int(insurance_years), self.max_rate_years)]
+
+    def retirement_age(self, birth_year, gender, heavy_work_years):
+        if heavy_work_years >= self.heavy_work_years:
+            return self.heavy_work_age
+        table = self.age_tables[MALE if gender == 'male' else OTHER_GENDER]
+        index = min(max(birth_year - self.first_birth_year, 0), len(table) - 1)
+        return table[index]
+
+    @property
+    def arrays(self):
+        """Οι ίδιοι πίνακες ως numpy arrays για τον vectorized υπολογισμό (lazy)"""
+        if self._arrays is None:
+            # Το numpy φορτώνεται μόνο εδώ: ο υπολογισμός ανά προφίλ δεν το χρειάζεται
+            np = optional_module('numpy')
+            self._arrays = {
+                'rates': np.array(self.rate_tables, dtype=np.float64),
+                'ages': np.array(self.age_tables, dtype=np.int64),
+            }
+        return self._arrays
+
+
+RULES_PATH = Config.PENSION_RULES_PATH or os.path.join(os.path.dirname(os.path.abspath(__file__)), 'pension_rules.json')
+
+RULES = PensionRules.load(RULES_PATH)
@@ -0,0 +1,88 @@
+import itertools
+
+from config import Config
+from insurance_history import career_inputs
+from pension_calculator import calculate_greek_pension
+
+# Μεταβλητές που μπορούν να σαρωθούν και ο τύπος τους
+SWEEP_VARIABLES = {
+    'salary': float,
+    'retirement_age': int,
+    'insurance_years': int,
+    'heavy_work_years': int,
+    'children': int,
+}
+
+
+def _sweep_values(name, spec):
+    """Τιμές μιας μεταβλητής: λίστα τιμών ή {"start", "stop", "step"} (το stop περιλαμβάνεται)"""
+    convert = SWEEP_VARIABLES[name]
+    if isinstance(spec, list):
+        return [convert(value) for value in spec]
+
+    start = convert(spec['start'])
+    stop = convert(spec.get('stop', start))
+    step = convert(spec.get('step', 1))
+    if step <= 0:
+        raise ValueError(f'Το βήμα της μεταβλητής {name} πρέπει να είναι θετικό')
+    if stop < start:
+        raise ValueError(f'Το stop της μεταβλητής {name} είναι μικρότερο από το start')
+
+    count = int((stop - start) / step + 1e-9) + 1
+    if count > Config.SCENARIO_MAX_POINTS:
+        raise ValueError(f'Πάρα πολλά σενάρια (μέγιστο {Config.SCENARIO_MAX_POINTS})')
+    # round() ώστε οι δεκαδικές τιμές να μη συσσωρεύουν σφάλμα (800.0, 850.0, ...)
+    return [convert(round(start + i * step, 2)) for i in range(count)]
+
+
+def _scenario_profile(base, scenario):
+    """Προφίλ ενός σημείου του πλέγματος. Η ηλικία συνταξιοδότησης σημαίνει συνέχιση
+    της εργασίας ως τότε: η τρέχουσα ηλικία και τα έτη ασφάλισης αυξάνονται ανάλογα"""
+    profile = dict(base)
+    profile.update(scenario)
+    if 'retirement_age' in scenario:
+        del profile['retirement_age']
+        extra_years = scenario['retirement_age'] - int(base['current_age'])
+        if extra_years < 0:
+            return None
+        profile['current_age'] = scenario['retirement_age']
+        profile['insurance_years'] = int(profile['insurance_years']) + extra_years
+    return profile
+
+
+def build_scenario_grid(sweep):
+    """Καρτεσιανό γινόμενο των τιμών όλων των μεταβλητών, με όριο SCENARIO_MAX_POINTS"""
+    unknown = set(sweep) - set(SWEEP_VARIABLES)
+    if unknown:
+        raise ValueError(f"Άγνωστες μεταβλητές σεναρίου: {', '.join(sorted(unknown))}")
+    if not sweep:
+        raise ValueError('Δεν δόθηκε μεταβλητή σεναρίου')
+
+    names = list(sweep)
+    values = [_sweep_values(name, sweep[name]) for name in names]
+    size = 1
+    for column in values:
+        size *= len(column)
+    if size > Config.SCENARIO_MAX_POINTS:
+        raise ValueError(f'Πάρα πολλά σενάρια: {size} (μέγιστο {Config.SCENARIO_MAX_POINTS})')
+    return [dict(zip(names, point)) for point in itertools.product(*values)]
+
+
+def run_scenarios(base, sweep):
+    """Υπολογισμός όλου του πλέγματος σεναρίων πάνω σε ένα βασικό προφίλ.
+    Τα μέρη που δεν εξαρτώνται από μισθό/παιδιά (ηλικία συνταξιοδότησης, δικαιώματα,
+    εθνική σύνταξη) υπολογίζονται μία φορά ανά συνδυασμό μέσω calculate_profile_terms."""
+    # Το ιστορικό περιόδων γίνεται μία φορά έτη ασφάλισης και μισθός, ώστε οι
+    # τιμές του σεναρίου να μην αντικαθίστανται από αυτό σε κάθε σημείο
+    base = dict(career_inputs(base))
+    base.pop('insurance_history', None)
+    results = []
+    for scenario in build_scenario_grid(sweep):
+        profile = _scenario_profile(base, scenario)
+        if profile is None:
+            results.append({'scenario': scenario, 'error': 'Η ηλικία συνταξιοδότησης είναι μικρότερη από την τρέχουσα'})
+            continue
+        result = calculate_greek_pension(profile)
+        result['scenario'] = scenario
+        results.append(result)
+    return results
@@ -0,0 +1,79 @@
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+
+from itsdangerous import BadSignature, URLSafeTimedSerializer
+
+from metrics import metrics, REPORT_CACHE
+
+
+def report_key(pension_data):
+    """Σταθερό hash του pension_data - ίδιος υπολογισμός, ίδια θέση στο cache"""
+    payload = json.dumps(pension_data, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+def report_etag(pdf_bytes):
+    """ETag από τα ίδια τα bytes: το PDF έχει ημερομηνία δημιουργίας, οπότε δύο
+    δημιουργίες από τα ίδια δεδομένα δεν είναι ίδιο έγγραφο"""
+    return hashlib.sha256(pdf_bytes).hexdigest()
+
+
+class ReportCache:
+    """Cache αναφορών PDF στη μνήμη, με δημιουργία μόνο όταν ζητηθεί λήψη.
+
+    Τα δεδομένα του υπολογισμού ταξιδεύουν υπογεγραμμένα μέσα στο link λήψης, οπότε
+    ο υπολογισμός δεν γράφει τίποτα· το link λήγει μετά από max_age δευτερόλεπτα.
+    Κάθε PDF κρατιέται ως (bytes, ETag) με κλειδί το hash του pension_data, έως
+    max_entries αναφορές / max_bytes (LRU)."""
+
+    def __init__(self, secret_key, max_entries=200, max_bytes=32 * 1024 * 1024, max_age=86400):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self._serializer = URLSafeTimedSerializer(secret_key, salt='pension-report')
+        self._entries = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+
+    def token_for(self, pension_data):
+        return self._serializer.dumps(pension_data)
+
+    def load_token(self, token):
+        """pension_data από το link λήψης, ή None αν η υπογραφή δεν είναι έγκυρη ή έληξε"""
+        try:
+            return self._serializer.loads(token, max_age=self.max_age)
+        except BadSignature:
+            return None
+
+    def etag_for(self, key):
+        """ETag της αποθηκευμένης αναφοράς, ή None αν δεν είναι στο cache"""
+        with self._lock:
+            entry = self._entries.get(key)
+            return entry[1] if entry is not None else None
+
+    def get_or_render(self, key, pension_data, render):
+        """(bytes, ETag) του PDF για το key· το render(pension_data) καλείται μόνο σε miss"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                metrics.inc(REPORT_CACHE, result='hit')
+                return entry
+        metrics.inc(REPORT_CACHE, result='miss')
+
+        # Η δημιουργία γίνεται εκτός lock· σε ταυτόχρονα misses κρατιέται το τελευταίο
+        pdf_bytes = render(pension_data)
+        entry = (pdf_bytes, report_etag(pdf_bytes))
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._size -= len(previous[0])
+            self._entries[key] = entry
+            self._size += len(pdf_bytes)
+            while len(self._entries) > 1 and (
+                    len(self._entries) > self.max_entries or self._size > self.max_bytes):
+                _, evicted = self._entries.popitem(last=False)
+                self._size -= len(evicted[0])
+        return entry
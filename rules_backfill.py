@@ -0,0 +1,124 @@
+import time
+from datetime import datetime
+
+from metrics import metrics, RULES_BACKFILL
+from migrations import DERIVED_COLUMNS
+from pension_batch import calculate_pension_batch
+from pension_rules import RULES
+
+BACKFILL_RUNNING = 'running'
+BACKFILL_DONE = 'done'
+
+# Γραμμή που υπολογίστηκε με άλλους κανόνες (ή πριν από το rules_version)
+_STALE = '(rules_version IS NULL OR rules_version != ?)'
+
+
+class RulesBackfill:
+    """Επανυπολογισμός των αποθηκευμένων υπολογισμών μετά από αλλαγή κανόνων.
+
+    Οι γραμμές με διαφορετικό rules_version διαβάζονται σε chunks κατά id και
+    υπολογίζονται με τον μαζικό υπολογισμό εκτός συναλλαγής. Κάθε chunk γράφεται
+    σε μία σύντομη συναλλαγή μαζί με το σημείο συνέχειας (rules_backfills.last_id),
+    και ακολουθεί μικρή παύση, ώστε οι εγγραφές των requests να μην περιμένουν.
+    Μετά από διακοπή, η επόμενη εκτέλεση συνεχίζει από το τελευταίο chunk. Μετά από
+    ολοκληρωμένο πέρασμα, η επόμενη εκτέλεση ξεκινά νέο από την αρχή: ξαναδοκιμάζει
+    τις γραμμές που απέτυχαν (κρατούν την παλιά ετικέτα) και όσες γράφτηκαν στο μεταξύ.
+    Οι γραμμές που αποθηκεύουν μόνο εισόδους (storage='inputs') υπολογίζονται στην
+    ανάγνωση, οπότε αλλάζει μόνο η ετικέτα τους."""
+
+    def __init__(self, db, rules_tag=None, chunk_size=500, pause=0.05):
+        self.db = db
+        self.rules_tag = rules_tag or RULES.tag
+        self.chunk_size = chunk_size
+        self.pause = pause
+        self._update_sql = (
+            f"UPDATE calculations SET {', '.join(f'{column} = ?' for column in DERIVED_COLUMNS)}, "
+            f"rules_version = ? WHERE id = ? AND {_STALE}"
+        )
+        self._tag_sql = f'UPDATE calculations SET rules_version = ? WHERE id = ? AND {_STALE}'
+
+    def status(self):
+        row = self.db.query_one('SELECT * FROM rules_backfills WHERE rules_version = ?', (self.rules_tag,))
+        return dict(row) if row is not None else None
+
+    def _count_stale(self, after_id):
+        row = self.db.query_one(
+            f'SELECT COUNT(*) AS total FROM calculations WHERE id > ? AND {_STALE}',
+            (after_id, self.rules_tag)
+        )
+        return row['total']
+
+    def start(self):
+        """Συνέχεια του τρέχοντος περάσματος, ή νέο πέρασμα από την αρχή πάνω σε όσες
+        γραμμές έχουν ακόμα άλλη ετικέτα. Οι μετρητές (processed, updated, errors)
+        είναι του τρέχοντος περάσματος."""
+        state = self.status()
+        if state is None:
+            self.db.execute(
+                'INSERT INTO rules_backfills (rules_version, status, total, updated_at) VALUES (?, ?, ?, ?)',
+                (self.rules_tag, BACKFILL_RUNNING, self._count_stale(0), datetime.now().isoformat())
+            )
+        elif state['status'] == BACKFILL_DONE:
+            now = datetime.now().isoformat()
+            self.db.execute(
+                'UPDATE rules_backfills SET status = ?, last_id = 0, total = ?, processed = 0, updated = 0, '
+                'errors = 0, started_at = ?, finished_at = NULL, updated_at = ? WHERE rules_version = ?',
+                (BACKFILL_RUNNING, self._count_stale(0), now, now, self.rules_tag)
+            )
+        return self.status()
+
+    def run_chunk(self, state):
+        """Ένα chunk: επιστρέφει την ενημερωμένη κατάσταση (status 'done' όταν τελειώσουν οι γραμμές)"""
+        rows = self.db.query_all(
+            f'SELECT * FROM calculations WHERE id > ? AND {_STALE} ORDER BY id LIMIT ?',
+            (state['last_id'], self.rules_tag, self.chunk_size)
+        )
+        now = datetime.now().isoformat()
+        if not rows:
+            self.db.execute(
+                'UPDATE rules_backfills SET status = ?, finished_at = ?, updated_at = ? WHERE rules_version = ?',
+                (BACKFILL_DONE, now, now, self.rules_tag)
+            )
+            return self.status()
+
+        rows = [dict(row) for row in rows]
+        stored = [row for row in rows if row['total_pension'] is not None]
+        results = calculate_pension_batch(stored)
+        errors = 0
+        with self.db.transaction() as conn:
+            for row, result in zip(stored, results):
+                if 'error' in result:
+                    # Η γραμμή μένει με την παλιά ετικέτα: το επόμενο πέρασμα την ξαναδοκιμάζει
+                    print(f"⚠️  Rules backfill: calculation {row['id']}: {result['error']}")
+                    errors += 1
+                    continue
+                values = tuple(result[column] for column in DERIVED_COLUMNS)
+                self.db.run(conn, self._update_sql, values + (self.rules_tag, row['id'], self.rules_tag))
+            for row in rows:
+                if row['total_pension'] is None:
+                    self.db.run(conn, self._tag_sql, (self.rules_tag, row['id'], self.rules_tag))
+            self.db.run(conn, '''
+                UPDATE rules_backfills
+                SET last_id = ?, processed = processed + ?, updated = updated + ?,
+                    errors = errors + ?, updated_at = ?
+                WHERE rules_version = ?
+            ''', (rows[-1]['id'], len(rows), len(rows) - errors, errors, now, self.rules_tag))
+        return self.status()
+
+    def run(self, progress=None):
+        """Όλα τα chunks ως το τέλος· progress(state) μετά από κάθε chunk"""
+        state = self.start()
+        while state['status'] != BACKFILL_DONE:
+            state = self.run_chunk(state)
+            if progress is not None:
+                progress(state)
+            if state['status'] != BACKFILL_DONE and self.pause:
+                time.sleep(self.pause)
+        return state
+
+    def update_metrics(self):
+        state = self.status()
+        if state is None:
+            return
+        for field in ('total', 'processed', 'updated', 'errors'):
+            metrics.set_gauge(RULES_BACKFILL, state[field], rules_version=self.rules_tag, state=field)
@@ -0,0 +1,18 @@
+"""Κοινή ρύθμιση των tests: όλα τα αρχεία της εφαρμογής (βάσεις, cache, uploads)
+σε προσωρινό φάκελο, πριν από το πρώτο import του config."""
+import atexit
+import os
+import shutil
+import sys
+import tempfile
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+WORK_DIR = tempfile.mkdtemp(prefix='pension-tests-')
+atexit.register(shutil.rmtree, WORK_DIR, True)
+
+os.environ.setdefault('DATABASE_URL', f"sqlite:///{os.path.join(WORK_DIR, 'app.db')}")
+os.environ.setdefault('EXTRACTION_CACHE_PATH', os.path.join(WORK_DIR, 'extraction_cache.db'))
+os.environ.setdefault('METRICS_DB_PATH', os.path.join(WORK_DIR, 'metrics.db'))
+os.environ.setdefault('IMPORT_RESULTS_DIR', os.path.join(WORK_DIR, 'import_results'))
+os.environ.setdefault('JOB_UPLOAD_FOLDER', os.path.join(WORK_DIR, 'uploads'))
+sys.path.insert(0, REPO_DIR)
@@ -0,0 +1,98 @@
+"""Migrations του σχήματος και keyset pagination του ιστορικού υπολογισμών."""
+import pytest
+
+import migrations
+from calculation_store import STORAGE_INPUTS, CalculationStore, decode_cursor
+from database import Database
+from migrations import CREATE_CALCULATIONS, CREATE_USERS, MIGRATIONS, migrate
+from pension_calculator import calculate_greek_pension
+
+PROFILE = {
+    'gender': 'male', 'birth_year': 1962, 'current_age': 62, 'insurance_years': 33,
+    'heavy_work_years': 0, 'salary': 1400.0, 'fund': 'ika', 'children': 0,
+}
+
+
+@pytest.fixture
+def db(tmp_path):
+    database = Database(f"sqlite:///{tmp_path / 'history.db'}")
+    yield database
+    database.close()
+
+
+def _pages(store, user_id, limit):
+    pages, cursor = [], None
+    while True:
+        rows, cursor = store.history_page(user_id, cursor, limit=limit)
+        pages.append([row['id'] for row in rows])
+        if cursor is None:
+            return pages
+
+
+def test_fresh_database_applies_all_once(db):
+    assert migrate(db) == [version for version, _, _ in MIGRATIONS]
+    assert migrate(db) == []
+    index = db.query_one("SELECT name FROM sqlite_master WHERE name = 'idx_calculations_user_created'")
+    assert index is not None
+
+
+def test_existing_rows_survive_rebuild(db):
+    """Βάση από την εποχή της έκδοσης 1: ο πίνακας ξαναχτίζεται χωρίς απώλειες"""
+    db.executescript([CREATE_USERS, CREATE_CALCULATIONS])
+    columns = migrations.INPUT_COLUMNS + migrations.DERIVED_COLUMNS
+    result = calculate_greek_pension(PROFILE)
+    db.execute(f"INSERT INTO calculations (user_id, {', '.join(columns)}) "
+               f"VALUES (7, {', '.join('?' * len(columns))})", tuple(result[column] for column in columns))
+    migrate(db)
+    rows, _ = CalculationStore(db).history_page(7)
+    assert len(rows) == 1 and rows[0]['total_pension'] == result['total_pension']
+    assert rows[0]['rules_version'] is None and rows[0]['insurance_history'] is None
+
+
+def test_failed_migration_is_not_recorded(db, monkeypatch):
+    def broken(db, conn):
+        db.run(conn, 'CREATE TABLE half_done (id INTEGER)')
+        raise RuntimeError('boom')
+
+    monkeypatch.setattr(migrations, 'MIGRATIONS', MIGRATIONS + [(99, 'broken', broken)])
+    with pytest.raises(RuntimeError):
+        migrate(db)
+    assert db.query_one("SELECT name FROM sqlite_master WHERE name = 'half_done'") is None
+    monkeypatch.setattr(migrations, 'MIGRATIONS', MIGRATIONS)
+    assert migrate(db) == []
+
+
+@pytest.mark.parametrize('storage', ['full', STORAGE_INPUTS])
+def test_pages_cover_history_newest_first(db, storage):
+    migrate(db)
+    store = CalculationStore(db, storage)
+    result = calculate_greek_pension(PROFILE)
+    ids = [store.save(1, result) for _ in range(23)]
+    store.save(2, result)
+    # Ίδιο created_at για πολλές γραμμές: η σειρά κρίνεται από το id
+    db.execute("UPDATE calculations SET created_at = '2025-01-01 10:00:00' WHERE id % 3 = 0")
+
+    pages = _pages(store, 1, limit=5)
+    assert [len(page) for page in pages] == [5, 5, 5, 5, 3]
+    seen = [calculation_id for page in pages for calculation_id in page]
+    assert sorted(seen) == ids
+    ordered = db.query_all('SELECT id FROM calculations WHERE user_id = 1 ORDER BY created_at DESC, id DESC')
+    assert seen == [row['id'] for row in ordered]
+    rows, _ = store.history_page(1, limit=1)
+    assert rows[0]['total_pension'] == result['total_pension']
+
+
+def test_exact_page_has_no_next_cursor(db):
+    migrate(db)
+    store = CalculationStore(db)
+    for _ in range(4):
+        store.save(1, calculate_greek_pension(PROFILE))
+    assert _pages(store, 1, limit=4) == [[4, 3, 2, 1]]
+    assert store.history_page(3) == ([], None)
+
+
+def test_invalid_cursor(db):
+    migrate(db)
+    with pytest.raises(ValueError):
+        CalculationStore(db).history_page(1, 'not-a-cursor')
+    assert decode_cursor('2025-01-01 10:00:00|42') == ('2025-01-01 10:00:00', 42)
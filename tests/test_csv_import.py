@@ -0,0 +1,92 @@
+"""Εισαγωγή CSV προτύπου: ανάγνωση σε chunks, μία γραμμή αποτελέσματος ανά γραμμή
+εισόδου και σφάλματα στη γραμμή που τα προκάλεσε."""
+import csv
+import io
+import os
+
+import pytest
+
+from config import Config
+from csv_import import CSV_TEMPLATE_COLUMNS, import_template_csv, profile_from_template_row
+from pension_calculator import calculate_greek_pension
+
+
+def _row(index, **overrides):
+    row = {
+        # Το 10ο ψηφίο (φύλο) είναι το τελευταίο ψηφίο του index
+        'amka': f'0101601{index:03d}1',
+        'first_name': 'ΓΙΩΡΓΟΣ', 'last_name': 'ΠΑΠΑΔΟΠΟΥΛΟΣ',
+        'birth_date': f'{1955 + index % 25}-03-15', 'start_date': '1990-01-01', 'end_date': '2024-12-31',
+        'employer': 'ΑΕ', 'insurance_days': str(3000 + 97 * index), 'salary_amount': f'{900 + index},50',
+        'fund_code': 'IKA',
+    }
+    row.update(overrides)
+    return row
+
+
+def _csv(rows, columns=CSV_TEMPLATE_COLUMNS):
+    text = io.StringIO()
+    writer = csv.DictWriter(text, fieldnames=columns, extrasaction='ignore')
+    writer.writeheader()
+    writer.writerows(rows)
+    return io.BytesIO(text.getvalue().encode('utf-8-sig'))
+
+
+def _import(rows, chunk_size=4):
+    output = io.StringIO()
+    summary = import_template_csv(_csv(rows), output, chunk_size=chunk_size)
+    output.seek(0)
+    return summary, list(csv.DictReader(output))
+
+
+def test_every_row_across_chunks():
+    rows = [_row(index) for index in range(11)]
+    summary, results = _import(rows)
+    assert summary['rows'] == 11 and summary['errors'] == 0
+    assert [result['row'] for result in results] == [str(line) for line in range(2, 13)]
+    for row, result in zip(rows, results):
+        expected = calculate_greek_pension(profile_from_template_row(row))
+        assert result['amka'] == row['amka'] and not result['error']
+        assert float(result['total_pension']) == expected['total_pension']
+        assert result['gender'] == expected['gender'] and result['fund'] == 'ika'
+    assert summary['first_profile'] == profile_from_template_row(rows[0])
+
+
+@pytest.mark.parametrize('overrides', [
+    {'amka': '123'},
+    {'birth_date': '15/03/1960'},
+    {'insurance_days': 'πολλές'},
+    {'salary_amount': '-100'},
+    {'salary_amount': ''},
+])
+def test_bad_row_keeps_its_place(overrides):
+    rows = [_row(0), _row(1, **overrides), _row(2)]
+    summary, results = _import(rows, chunk_size=2)
+    assert summary['rows'] == 3 and summary['errors'] == 1
+    assert [bool(result['error']) for result in results] == [False, True, False]
+    assert results[1]['row'] == '3' and not results[1]['total_pension']
+
+
+def test_missing_template_columns():
+    stream = _csv([_row(0)], columns=['amka', 'birth_date', 'salary_amount'])
+    with pytest.raises(ValueError):
+        import_template_csv(stream, io.StringIO())
+
+
+def test_endpoint_reports_counts_and_leaves_no_files():
+    from app import app
+
+    client = app.test_client()
+    upload = _csv([_row(0), _row(1, amka='x'), _row(2)])
+    response = client.post('/import/csv', data={'file': (upload, 'people.csv')},
+                           content_type='multipart/form-data')
+    assert response.status_code == 200
+    assert response.headers['X-Import-Rows'] == '3' and response.headers['X-Import-Errors'] == '1'
+    assert len(list(csv.DictReader(io.StringIO(response.get_data(as_text=True))))) == 3
+    response.close()
+
+    bad = _csv([_row(0)], columns=['amka', 'first_name'])
+    response = client.post('/import/csv', data={'file': (bad, 'people.csv')},
+                           content_type='multipart/form-data')
+    assert response.status_code == 400 and 'error' in response.get_json()
+    assert os.listdir(Config.IMPORT_RESULTS_DIR) == []
@@ -0,0 +1,112 @@
+"""Ο efka_extractor δίνει ό,τι και τα αρχικά διαδοχικά re.search της ανάλυσης e-ΕΦΚΑ,
+εκτός από τις δύο τεκμηριωμένες διαφορές (τονισμένες ετικέτες, 'FEMALE')."""
+import random
+import re
+from datetime import datetime
+
+import pytest
+
+from efka_patterns import EfkaFieldExtractor, efka_extractor
+
+# Τα αρχικά patterns, ένα re.search ανά pattern με σειρά προτεραιότητας
+ORIGINAL_PATTERNS = {
+    'insurance_days': [r'ΗΜΕΡΕΣ[\s:]*(\d{4,5})', r'(\d{4,5})\s*ΗΜΕΡ', r'DAYS[\s:]*(\d{4,5})',
+                       r'INSURANCE[\s:]*(\d{4,5})', r'(\d{4,5})'],
+    'salary': [r'ΜΙΣΘΟΣ[\s:]*(\d+[,.]?\d*)', r'(\d{3,4}[,.]\d{2})\s*ΕΥΡ', r'SALARY[\s:]*(\d+[,.]?\d*)',
+               r'(\d{3,4}[,.]\d{2})\s*EURO', r'(\d{3,4}[,.]\d{2})'],
+    'birth_year': [r'ΓΕΝΝΗΣΗΣ[\s:]*(\d{4})', r'BIRTH[\s:]*(\d{4})', r'(19[5-9]\d)'],
+}
+ORIGINAL_RANGES = {
+    'insurance_days': (int, 1000, 40000),
+    'salary': (lambda raw: float(raw.replace(',', '.')), 100, 10000),
+    'birth_year': (int, 1950, 2000),
+}
+
+LABELS = ['ΗΜΕΡΕΣ', 'ΗΜΕΡ', 'ΗΜΕΡΕΣ ΑΣΦΑΛΙΣΗΣ', 'DAYS', 'INSURANCE', 'ΜΙΣΘΟΣ', 'ΕΥΡΩ', 'ΕΥΡ',
+          'SALARY', 'EURO', 'ΓΕΝΝΗΣΗΣ', 'BIRTH', 'ΑΡΣΕΝ', 'MALE', 'ΘΗΛΥ', 'ΕΤΟΣ', 'ΠΕΡΙΟΔΟΣ']
+SEPARATORS = ['', ' ', ':', ': ', '\n', '  ', ' ' * 50, '/', '-']
+
+
+def original_analysis(text, fixed_gender=False):
+    """Η ανάλυση πριν από τον efka_extractor (με fixed_gender, το 'FEMALE' δεν μετρά ως 'MALE')"""
+    data = {}
+    clean_text = text.upper().replace('\n', ' ')
+    for field, patterns in ORIGINAL_PATTERNS.items():
+        parse, low, high = ORIGINAL_RANGES[field]
+        for pattern in patterns:
+            match = re.search(pattern, clean_text)
+            if match and low <= parse(match.group(1)) <= high:
+                data[field] = parse(match.group(1))
+                break
+    if 'insurance_days' in data:
+        data['insurance_years'] = round(data['insurance_days'] / 365, 1)
+    if 'birth_year' in data:
+        data['current_age'] = datetime.now().year - data['birth_year']
+    male_text = clean_text.replace('FEMALE', '') if fixed_gender else clean_text
+    if 'ΑΡΣΕΝ' in clean_text or 'MALE' in male_text:
+        data['gender'] = 'male'
+    elif 'ΘΗΛΥ' in clean_text or 'FEMALE' in clean_text:
+        data['gender'] = 'female'
+    return data
+
+
+def _number(rng):
+    digits = ''.join(rng.choice('0123456789') for _ in range(rng.randint(1, 7)))
+    if rng.random() < 0.3:
+        digits += rng.choice(',.') + ''.join(rng.choice('0123456789') for _ in range(rng.randint(0, 3)))
+    if rng.random() < 0.3:
+        digits = rng.choice(['19', '195', '196', '197', '198', '199']) + digits[:rng.randint(0, 2)]
+    return digits
+
+
+def fuzzed_text(rng, labels):
+    parts = []
+    for _ in range(rng.randint(1, 14)):
+        token = rng.choice(labels) if rng.random() < 0.5 else _number(rng)
+        if rng.random() < 0.2:
+            token = token.lower()
+        parts.append(token)
+        parts.append(rng.choice(SEPARATORS))
+    return ''.join(parts)
+
+
+def _accented(rng, text):
+    accents = {'Η': 'Ή', 'Ε': 'Έ', 'Α': 'Ά', 'Ι': 'Ί', 'Υ': 'Ύ', 'Ο': 'Ό', 'η': 'ή', 'ε': 'έ'}
+    return ''.join(accents[char] if char in accents and rng.random() < 0.3 else char for char in text)
+
+
+def test_equivalent_to_original_regexes():
+    rng = random.Random(6)
+    for _ in range(20000):
+        text = fuzzed_text(rng, LABELS)
+        assert efka_extractor.extract(text)[0] == original_analysis(text), text
+
+
+def test_documented_differences_only():
+    """Με τονισμένες ετικέτες και 'FEMALE': ίδια με τα αρχικά πάνω στο κείμενο χωρίς τόνους"""
+    rng = random.Random(7)
+    labels = LABELS + ['FEMALE', 'FEMALES']
+    for _ in range(20000):
+        text = _accented(rng, fuzzed_text(rng, labels))
+        expected = original_analysis(EfkaFieldExtractor.normalize(text), fixed_gender=True)
+        assert efka_extractor.extract(text)[0] == expected, text
+
+
+@pytest.mark.parametrize('text, expected', [
+    # Το πρώτο match του γενικού αριθμού είναι εκτός ορίων: δεν ψάχνεται επόμενος
+    ('ΚΩΔ 45000 ΕΤΟΣ 1957', {'insurance_days': None, 'birth_year': 1957}),
+    # Η σειρά των κανόνων κερδίζει τη θέση στο κείμενο
+    ('DAYS 2000 ΗΜΕΡΕΣ 3000', {'insurance_days': 3000}),
+    ('SALARY 900 ΜΙΣΘΟΣ 1200,50', {'salary': 1200.5}),
+    ('ΗΜΕΡΕΣ 99999 DAYS 5000', {'insurance_days': 5000}),
+    ('ΦΥΛΟ: FEMALE', {'gender': 'female'}),
+    ('Ημέρες ασφάλισης 7000 ΗΜΈΡΕΣ 8000', {'insurance_days': 8000}),
+])
+def test_priority_and_first_match(text, expected):
+    data, _ = efka_extractor.extract(text)
+    assert {field: data.get(field) for field in expected} == expected
+
+
+def test_far_trailing_label():
+    data, best = efka_extractor.extract('ΣΥΝΟΛΟ 6500' + ' ' * 200 + 'ΗΜΕΡΕΣ')
+    assert data['insurance_days'] == 6500 and best['insurance_days'].position == 7
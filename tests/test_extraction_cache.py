@@ -0,0 +1,92 @@
+"""Cache εξαγωγής με κλειδί (hash περιεχομένου, έκδοση extractor): επιτυχίες, λήξη,
+όρια μεγέθους και συμπεριφορά όταν το cache δεν είναι διαθέσιμο."""
+import pytest
+
+import file_processor
+from extraction_cache import ExtractionCache, content_hash, file_content_hash
+from file_processor import FileProcessor
+
+FIELDS = {'insurance_days': 8123, 'salary': 1450.5, 'source': 'pdf_text'}
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return ExtractionCache(str(tmp_path / 'cache.db'), evict_every=1000)
+
+
+def test_hit_only_for_same_content_and_version(cache):
+    digest = content_hash(b'%PDF-1.4 one')
+    cache.put(digest, 'v1', FIELDS)
+    assert cache.get(digest, 'v1') == FIELDS
+    assert cache.get(digest, 'v2') is None
+    assert cache.get(content_hash(b'%PDF-1.4 two'), 'v1') is None
+
+
+def test_file_hash_matches_content_hash(tmp_path, monkeypatch):
+    monkeypatch.setattr('extraction_cache.HASH_CHUNK_SIZE', 7)
+    content = b'%PDF-1.4\n' + bytes(range(256)) * 3
+    path = tmp_path / 'scan.pdf'
+    path.write_bytes(content)
+    assert file_content_hash(str(path)) == content_hash(content)
+
+
+def test_expired_entries_miss_and_are_evicted(cache):
+    cache.put('a', 'v1', FIELDS)
+    cache.max_age_seconds = -1
+    assert cache.get('a', 'v1') is None
+    cache.evict()
+    cache.max_age_seconds = 3600
+    assert cache.get('a', 'v1') is None
+
+
+def test_eviction_keeps_most_recently_used(cache):
+    cache.max_entries = 2
+    for digest in ('a', 'b', 'c'):
+        cache.put(digest, 'v1', FIELDS)
+    cache.get('a', 'v1')
+    cache.evict()
+    assert cache.get('a', 'v1') == FIELDS
+    assert cache.get('c', 'v1') == FIELDS
+    assert cache.get('b', 'v1') is None
+
+
+def test_eviction_by_size(cache):
+    cache.put('a', 'v1', FIELDS)
+    cache.put('b', 'v1', FIELDS)
+    cache.max_bytes = len(str(FIELDS)) + 10
+    cache.get('b', 'v1')
+    cache.evict()
+    assert cache.get('b', 'v1') == FIELDS
+    assert cache.get('a', 'v1') is None
+
+
+def test_processor_runs_once_per_content(cache, monkeypatch):
+    monkeypatch.setattr(file_processor, 'extraction_cache', cache)
+    calls = []
+
+    def processor(content):
+        calls.append(content)
+        return dict(FIELDS)
+
+    for _ in range(3):
+        assert FileProcessor._process_cached(b'same', processor, 'extract_pdf') == FIELDS
+    assert len(calls) == 1
+
+
+def test_fallback_results_are_not_cached(cache, monkeypatch):
+    monkeypatch.setattr(file_processor, 'extraction_cache', cache)
+    calls = []
+
+    def processor(content):
+        calls.append(content)
+        return {'source': 'ocr_fallback'}
+
+    FileProcessor._process_cached(b'broken', processor, 'extract_pdf')
+    FileProcessor._process_cached(b'broken', processor, 'extract_pdf')
+    assert len(calls) == 2
+
+
+def test_unavailable_cache_does_not_block_extraction(tmp_path, monkeypatch):
+    # Η "βάση" είναι φάκελος: κάθε get/put αποτυγχάνει
+    monkeypatch.setattr(file_processor, 'extraction_cache', ExtractionCache(str(tmp_path)))
+    assert FileProcessor._process_cached(b'content', lambda content: dict(FIELDS), 'extract_pdf') == FIELDS
@@ -0,0 +1,76 @@
+"""Επεξεργασία αρχείων από τον δίσκο μέσω mmap: ίδια αποτελέσματα με τα bytes,
+χωρίς αντίγραφο του περιεχομένου."""
+import io
+import json
+import mmap
+import os
+
+import pytest
+from werkzeug.datastructures import FileStorage
+
+import file_processor
+from file_processor import FileProcessor, map_file
+from jobs import UPLOAD_NAME, save_upload
+
+CSV_TEXT = ('amka,birth_date,insurance_days,salary_amount,fund_code\n'
+            '12345678901,1961-05-20,9000,"1450,30",OAEE\n')
+JSON_TEXT = json.dumps([{'gender': 'female', 'birth_year': 1966, 'salary': 1700}])
+
+
+def _write(tmp_path, name, content):
+    path = tmp_path / name
+    path.write_bytes(content)
+    return str(path)
+
+
+def test_map_file_reads_in_place(tmp_path):
+    path = _write(tmp_path, 'a.pdf', b'%PDF-1.4 data')
+    with map_file(path) as buffer:
+        assert isinstance(buffer, mmap.mmap) and buffer[:8] == b'%PDF-1.4'
+    assert buffer.closed
+
+
+def test_map_empty_and_missing_file(tmp_path):
+    with map_file(_write(tmp_path, 'empty.pdf', b'')) as buffer:
+        assert buffer == b''
+    with pytest.raises(FileNotFoundError):
+        with map_file(str(tmp_path / 'missing.pdf')):
+            pass
+
+
+@pytest.mark.parametrize('name, content', [('people.csv', CSV_TEXT), ('people.json', JSON_TEXT)])
+def test_path_and_bytes_agree(tmp_path, name, content):
+    data = content.encode('utf-8')
+    path = _write(tmp_path, name, data)
+    assert FileProcessor.process_path(path, name) == FileProcessor.process_file(data, name)
+
+
+def test_pdf_extractors_get_mapping_and_path(tmp_path, monkeypatch):
+    seen = {}
+
+    def process_pdf(file_content, file_path=None):
+        seen.update(content=type(file_content), path=file_path)
+        return {'source': 'test'}
+
+    monkeypatch.setattr(FileProcessor, 'process_pdf', staticmethod(process_pdf))
+    monkeypatch.setattr(file_processor.extraction_cache, 'get', lambda *args: None)
+    monkeypatch.setattr(file_processor.extraction_cache, 'put', lambda *args: None)
+    path = _write(tmp_path, 'scan.pdf', b'%PDF-1.4 ' + os.urandom(4096))
+    assert FileProcessor.process_path(path, 'scan.pdf') == {'source': 'test'}
+    assert seen == {'content': mmap.mmap, 'path': path}
+
+
+def test_unsupported_and_broken_files(tmp_path):
+    with pytest.raises(Exception, match='Μη υποστηριζόμενη'):
+        FileProcessor.process_path(_write(tmp_path, 'notes.txt', b'text'), 'notes.txt')
+    with pytest.raises(Exception, match='JSON'):
+        FileProcessor.process_path(_write(tmp_path, 'bad.json', b'[{"salary": '), 'bad.json')
+
+
+def test_save_upload_spools_with_job_name(tmp_path):
+    upload = FileStorage(io.BytesIO(b'%PDF-1.4'), filename='Βεβαίωση ΕΦΚΑ.PDF')
+    path = save_upload(upload, str(tmp_path))
+    assert os.path.dirname(path) == str(tmp_path) and path.endswith('.pdf')
+    assert UPLOAD_NAME.match(os.path.basename(path))
+    with open(path, 'rb') as f:
+        assert f.read() == b'%PDF-1.4'
@@ -0,0 +1,154 @@
+"""Ουρά εργασιών εξαγωγής: ανάληψη, επανεκκίνηση χαμένων εργασιών και καθαρισμός
+του φακέλου των ανεβασμένων αρχείων."""
+import json
+import os
+import time
+from concurrent.futures import Future
+from datetime import datetime, timedelta
+
+import pytest
+
+from jobs import JOB_DONE, JOB_ERROR, JOB_QUEUED, JOB_RUNNING, JobQueue, _connect, _execute_job
+
+OLD = time.time() - 3600
+
+
+def _touch(folder, name, mtime=OLD):
+    path = os.path.join(folder, name)
+    with open(path, 'wb') as f:
+        f.write(b'%PDF-1.4\n')
+    os.utime(path, (mtime, mtime))
+    return path
+
+
+@pytest.fixture
+def queue(tmp_path):
+    job_queue = JobQueue(str(tmp_path / 'jobs.db'), stale_after=60)
+    job_queue.init_schema()
+    return job_queue
+
+
+def test_sweep_removes_only_orphaned_job_uploads(queue, tmp_path):
+    folder = str(tmp_path)
+    orphan = _touch(folder, 'scan_20251027_002559_a1b2c3d4.pdf')
+    recent = _touch(folder, 'scan_20251027_002600_b1b2c3d4.pdf', mtime=time.time())
+    sample = _touch(folder, 'greek_pension_1_20251027_002559.pdf')
+    pending = _touch(folder, 'scan_20251027_002601_c1b2c3d4.pdf')
+    queue._dispatch = lambda job_id: None
+    queue.enqueue(pending, 'scan.pdf')
+
+    assert queue.sweep_uploads(folder) == 1
+    assert not os.path.exists(orphan)
+    assert all(os.path.exists(path) for path in (recent, sample, pending))
+
+
+def test_sweep_before_migrations(tmp_path):
+    folder = str(tmp_path / 'uploads')
+    os.makedirs(folder)
+    orphan = _touch(folder, 'scan_20251027_002559_a1b2c3d4.pdf')
+    assert JobQueue(str(tmp_path / 'fresh.db'), stale_after=60).sweep_uploads(folder) == 1
+    assert not os.path.exists(orphan)
+
+
+def test_sweep_missing_folder(queue, tmp_path):
+    assert queue.sweep_uploads(str(tmp_path / 'missing')) == 0
+
+
+def test_repository_samples_survive_sweep(queue, tmp_path):
+    """Τα δείγματα του uploads/ (benchmarks) δεν έχουν όνομα του save_upload"""
+    samples = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'uploads')
+    names = sorted(name for name in os.listdir(samples) if name.endswith('.pdf')) \
+        if os.path.isdir(samples) else []
+    if not names:
+        pytest.skip('no samples')
+    folder = str(tmp_path / 'samples')
+    os.makedirs(folder)
+    for name in names:
+        _touch(folder, name)
+    queue.stale_after = 0
+    assert queue.sweep_uploads(folder) == 0
+    assert sorted(os.listdir(folder)) == names
+
+
+def test_queued_job_status(queue, tmp_path):
+    queue._dispatch = lambda job_id: None
+    job_id = queue.enqueue(_touch(str(tmp_path), 'a_20251027_002559_a1b2c3d4.pdf'), 'a.pdf')
+    assert queue.get_status(job_id)['status'] == JOB_QUEUED
+
+
+class _RecordingExecutor:
+    """Κρατά τις υποβολές αντί να τις τρέχει σε process pool"""
+
+    def __init__(self):
+        self.submitted = []
+
+    def submit(self, function, *args):
+        self.submitted.append(args[-1])
+        return Future()
+
+
+def _enqueue_json(queue, folder, record):
+    path = os.path.join(folder, 'profile_20251027_002559_a1b2c3d4.json')
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(record, f)
+    queue._dispatch = lambda job_id: None
+    return queue.enqueue(path, 'profile.json'), path
+
+
+def _set_running(queue, job_id, started_at):
+    conn = _connect(queue.db_path)
+    conn.execute('UPDATE jobs SET status = ?, started_at = ? WHERE id = ?',
+                 (JOB_RUNNING, started_at.isoformat(), job_id))
+    conn.commit()
+    conn.close()
+
+
+def test_job_runs_once_and_removes_upload(queue, tmp_path):
+    job_id, path = _enqueue_json(queue, str(tmp_path), {'gender': 'female', 'birth_year': 1962})
+    _execute_job(queue.db_path, job_id)
+    assert queue.get_status(job_id)['status'] == JOB_DONE
+    result = queue.get_result(job_id)
+    assert result['gender'] == 'female' and result['birth_year'] == 1962
+    assert not os.path.exists(path)
+
+    # Δεύτερη ανάληψη της ίδιας εργασίας (π.χ. διπλή υποβολή): δεν ξανατρέχει
+    finished_at = queue.get_status(job_id)['finished_at']
+    _execute_job(queue.db_path, job_id)
+    assert queue.get_status(job_id)['finished_at'] == finished_at
+
+
+def test_failed_job_records_error(queue, tmp_path):
+    path = _touch(str(tmp_path), 'notes_20251027_002559_a1b2c3d4.txt')
+    queue._dispatch = lambda job_id: None
+    job_id = queue.enqueue(path, 'notes.txt')
+    _execute_job(queue.db_path, job_id)
+    status = queue.get_status(job_id)
+    assert status['status'] == JOB_ERROR and status['error']
+    assert queue.get_result(job_id) is None
+    assert not os.path.exists(path)
+
+
+def test_running_job_is_not_claimed_again(queue, tmp_path):
+    job_id, path = _enqueue_json(queue, str(tmp_path), {'gender': 'male'})
+    _set_running(queue, job_id, datetime.now())
+    _execute_job(queue.db_path, job_id)
+    assert queue.get_status(job_id)['status'] == JOB_RUNNING
+    assert os.path.exists(path)
+
+
+def test_resume_requeues_only_stale_running_jobs(queue, tmp_path):
+    stale, _ = _enqueue_json(queue, str(tmp_path), {'gender': 'male'})
+    recent = queue.enqueue(_touch(str(tmp_path), 'b_20251027_002559_b1b2c3d4.pdf'), 'b.pdf')
+    waiting = queue.enqueue(_touch(str(tmp_path), 'c_20251027_002559_c1b2c3d4.pdf'), 'c.pdf')
+    _set_running(queue, stale, datetime.now() - timedelta(seconds=queue.stale_after + 5))
+    _set_running(queue, recent, datetime.now())
+
+    queue._executor = _RecordingExecutor()
+    queue.resume_pending()
+    assert sorted(queue._executor.submitted) == sorted([stale, waiting])
+    assert queue.get_status(stale)['status'] == JOB_QUEUED
+    assert queue.get_status(recent)['status'] == JOB_RUNNING
+
+    # Η εργασία που ξαναμπήκε στην ουρά ολοκληρώνεται κανονικά
+    _execute_job(queue.db_path, stale)
+    assert queue.get_status(stale)['status'] == JOB_DONE
@@ -0,0 +1,115 @@
+"""Εισαγωγή JSON: ανάγνωση records σε κομμάτια και ίδια αποτελέσματα για το ίδιο
+record, είτε είναι μόνο του στο αρχείο είτε μαζί με άλλα."""
+import io
+import json
+
+import pytest
+
+from json_import import (
+    JsonStreamError, iter_json_records, iter_ndjson_results, iter_profiles, profile_from_record
+)
+from pension_calculator import calculate_greek_pension
+
+RECORDS = [
+    {'gender': 'female'},
+    {'salary': 2000},
+    {'gender': 'male', 'birth_year': 1960, 'current_age': 64, 'insurance_years': 35,
+     'salary': 1800.5, 'fund': 'oaee', 'children': 2},
+    {'birth_year': 1958, 'insurance_history': [
+        {'year': 2005, 'month': 1, 'days': 300, 'earnings': 18000.0}]},
+]
+
+
+def _stream(text):
+    return io.BytesIO(text.encode('utf-8'))
+
+
+def _results(records):
+    stream = _stream(json.dumps(records))
+    return [json.loads(line) for line in iter_ndjson_results(iter_profiles(iter_json_records(stream)))]
+
+
+def _single(record):
+    """Ο δρόμος του /upload για αρχείο με ένα μόνο record"""
+    return calculate_greek_pension(profile_from_record(record))
+
+
+@pytest.mark.parametrize('record', RECORDS)
+def test_same_record_same_result_alone_or_in_many(record):
+    alone = _single(record)
+    (streamed_alone,) = _results([record])
+    many = _results([record] + RECORDS)
+    for streamed in (streamed_alone, many[0]):
+        assert 'error' not in streamed
+        streamed.pop('index')
+        assert streamed == alone
+
+
+def test_partial_records_get_form_defaults():
+    results = _results(RECORDS[:2])
+    assert [result.get('error') for result in results] == [None, None]
+    assert results[0]['gender'] == 'female' and results[0]['birth_year'] == 1980
+    assert results[1]['salary'] == 2000.0
+
+
+def test_upload_and_import_endpoints_agree():
+    from app import app
+
+    client = app.test_client()
+    payload = json.dumps(RECORDS[:2]).encode('utf-8')
+    response = client.post('/import/json', data=payload, content_type='application/json')
+    streamed = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+    upload = client.post('/upload', data={'file': (io.BytesIO(payload), 'profiles.json')},
+                         content_type='multipart/form-data')
+    uploaded = [json.loads(line) for line in upload.get_data(as_text=True).splitlines()]
+    assert streamed == uploaded
+    assert [result['index'] for result in streamed] == [0, 1]
+    assert all('error' not in result for result in streamed)
+
+
+@pytest.mark.parametrize('text', [
+    json.dumps(RECORDS),
+    '\n'.join(json.dumps(record) for record in RECORDS),
+    json.dumps({'profiles': RECORDS}),
+])
+def test_record_formats(text):
+    records = list(iter_profiles(iter_json_records(_stream(text), chunk_size=7)))
+    assert records == RECORDS
+
+
+def test_single_object():
+    assert list(iter_json_records(_stream(json.dumps(RECORDS[2])))) == [RECORDS[2]]
+
+
+def test_non_object_record_is_a_row_error():
+    results = _results([RECORDS[0], 42])
+    assert 'error' not in results[0]
+    assert results[1]['index'] == 1 and 'error' in results[1]
+
+
+def test_truncated_array_ends_with_stream_error():
+    text = json.dumps(RECORDS)[:-1]
+    lines = [json.loads(line) for line in iter_ndjson_results(iter_json_records(_stream(text), chunk_size=16))]
+    assert len(lines) == len(RECORDS) + 1
+    assert 'index' not in lines[-1] and 'error' in lines[-1]
+
+
+def test_missing_separator_is_rejected():
+    with pytest.raises(JsonStreamError):
+        list(iter_json_records(_stream('[{"a": 1} {"b": 2}]')))
+
+
+def test_oversized_record_is_rejected(monkeypatch):
+    import json_import
+
+    monkeypatch.setattr(json_import, 'MAX_RECORD_CHARS', 64)
+    text = json.dumps([RECORDS[0], {'name': 'Α' * 200}])
+    with pytest.raises(JsonStreamError, match='μεγάλο'):
+        list(iter_json_records(_stream(text), chunk_size=16))
+
+
+def test_broken_ndjson_line_keeps_earlier_results():
+    text = json.dumps(RECORDS[0]) + '\n{"salary": 1500,\n' + json.dumps(RECORDS[1]) + '\n'
+    lines = [json.loads(line) for line in iter_ndjson_results(iter_json_records(_stream(text)))]
+    assert lines[0]['index'] == 0 and 'error' not in lines[0]
+    assert len(lines) == 2 and 'index' not in lines[1] and 'error' in lines[1]
@@ -0,0 +1,80 @@
+"""Basic patterns σε raw PDF bytes: μόνο το κείμενο των content streams (χωρίς φίλτρο
+και FlateDecode), ολόκληροι αριθμοί και όριο στα αποσυμπιεσμένα bytes."""
+import zlib
+
+import pdf_scanner
+from file_processor import BASIC_BYTE_PATTERNS
+from pdf_scanner import scan_pdf_bytes
+
+
+def _pdf(*streams):
+    """Ελάχιστο PDF με ένα αντικείμενο ανά (dictionary, περιεχόμενο) stream"""
+    parts = [b'%PDF-1.4\n']
+    for number, (dictionary, body) in enumerate(streams, start=1):
+        parts.append(b'%d 0 obj\n<< %s /Length %d >>\nstream\n%s\nendstream\nendobj\n'
+                     % (number, dictionary, len(body), body))
+    parts.append(b'trailer\n<< /Size 12345 /Width 1957 >>\nstartxref\n2594\n%%EOF\n')
+    return b''.join(parts)
+
+
+def _plain(body):
+    return b'', body
+
+
+def _flate(body):
+    return b'/Filter /FlateDecode', zlib.compress(body)
+
+
+def test_plain_content_stream():
+    content = b'BT /F1 12 Tf 72 712 Td (Days: 8123) Tj (Salary 1450,50 EUR) Tj (Birth 1968) Tj ET'
+    assert scan_pdf_bytes(_pdf(_plain(content)), BASIC_BYTE_PATTERNS) == {
+        'insurance_days': 8123, 'salary': 1450.5, 'birth_year': 1968}
+
+
+def test_digit_boundaries():
+    """Αριθμοί μέσα σε μεγαλύτερες σειρές ψηφίων δεν διαβάζονται κομμένοι"""
+    content = b'BT (AMKA 123456 8123) Tj (1234,567 12,3456 1450,50) Tj (19575 21968 1968) Tj ET'
+    assert scan_pdf_bytes(_pdf(_plain(content)), BASIC_BYTE_PATTERNS) == {
+        'insurance_days': 8123, 'salary': 1450.5, 'birth_year': 1968}
+
+
+def test_strings_do_not_join():
+    assert scan_pdf_bytes(_pdf(_plain(b'BT [(81)-250(23)] TJ ET')), BASIC_BYTE_PATTERNS) == {}
+
+
+def test_structure_and_binary_streams_are_ignored():
+    """Μήκη/offsets του PDF, εικόνες και metadata δεν είναι κείμενο σελίδας"""
+    pdf = _pdf((b'/Type /XObject /Subtype /Image /Filter /DCTDecode', b'\xff\xd8(2023:08:10 1450,50)'),
+               (b'/Type /Metadata /Subtype /XML', b'(http://www.w3.org/1999/02/22-rdf-syntax-ns)'),
+               _plain(b'BT 211.08 0 0 211.08 0 0 cm 8123 Tw ET'))
+    assert scan_pdf_bytes(pdf, BASIC_BYTE_PATTERNS) == {}
+
+
+def test_flate_stream():
+    pdf = _pdf(_plain(b'BT (Days 8123) Tj ET'), _flate(b'BT (Birth 1968) Tj (1450.50) Tj ET'))
+    assert scan_pdf_bytes(pdf, BASIC_BYTE_PATTERNS) == {
+        'insurance_days': 8123, 'salary': 1450.5, 'birth_year': 1968}
+    assert scan_pdf_bytes(pdf, BASIC_BYTE_PATTERNS, decode_streams=False) == {'insurance_days': 8123}
+
+
+def test_number_across_chunk_boundary(monkeypatch):
+    monkeypatch.setattr(pdf_scanner, 'CHUNK_SIZE', 8)
+    content = b'BT 72 712 Td (Days 123456 8123) Tj ET'
+    for stream in (_plain(content), _flate(content)):
+        assert scan_pdf_bytes(_pdf(stream), BASIC_BYTE_PATTERNS) == {'insurance_days': 8123}
+
+
+def test_inflate_cap(monkeypatch):
+    monkeypatch.setattr(pdf_scanner, 'MAX_DECOMPRESSED_BYTES', 4096)
+    near = _flate(b' ' * 1000 + b'BT (Days 8123) Tj ET')
+    far = _flate(b' ' * 5000 + b'BT (Birth 1968) Tj ET')
+    assert scan_pdf_bytes(_pdf(near), BASIC_BYTE_PATTERNS) == {'insurance_days': 8123}
+    assert scan_pdf_bytes(_pdf(far), BASIC_BYTE_PATTERNS) == {}
+    # Το όριο είναι ανά αρχείο: μετά από ένα μεγάλο stream δεν αποσυμπιέζεται άλλο
+    assert scan_pdf_bytes(_pdf(_flate(b' ' * 5000), near), BASIC_BYTE_PATTERNS) == {}
+
+
+def test_default_inflate_cap_stops_zip_bomb():
+    bomb = _flate(b' ' * (pdf_scanner.MAX_DECOMPRESSED_BYTES + 1024))
+    assert len(bomb[1]) < 1024 * 1024
+    assert scan_pdf_bytes(_pdf(bomb, _flate(b'BT (Days 8123) Tj ET')), BASIC_BYTE_PATTERNS) == {}
@@ -0,0 +1,153 @@
+"""Ισοδυναμία του μαζικού υπολογισμού (calculate_pension_batch) με τον
+υπολογισμό ανά προφίλ (calculate_greek_pension): ίδιες τιμές και ίδιοι τύποι."""
+import itertools
+import os
+import random
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pension_batch  # noqa: E402
+from backends import available  # noqa: E402
+from pension_batch import calculate_pension_batch, compare_with_scalar  # noqa: E402
+from pension_calculator import calculate_greek_pension  # noqa: E402
+from pension_rules import RULES  # noqa: E402
+
+FUNDS = sorted(RULES.fund_codes) + ['άγνωστο']
+GENDERS = ['male', 'female', 'other']
+
+
+def _profile(**overrides):
+    profile = {
+        'gender': 'male', 'birth_year': 1965, 'current_age': 60, 'insurance_years': 30,
+        'heavy_work_years': 0, 'salary': 1200.0, 'fund': 'ika', 'children': 0,
+    }
+    profile.update(overrides)
+    return profile
+
+
+def _random_profiles(seed, count):
+    rnd = random.Random(seed)
+    profiles = []
+    for _ in range(count):
+        birth_year = rnd.randint(1940, 2005)
+        profiles.append({
+            'gender': rnd.choice(GENDERS),
+            'birth_year': birth_year,
+            'current_age': max(18, 2025 - birth_year + rnd.randint(-2, 2)),
+            'insurance_years': rnd.randint(0, 45),
+            'heavy_work_years': rnd.choice([0, 0, rnd.randint(0, 30)]),
+            'salary': rnd.choice([0.0, round(rnd.uniform(300, 6000), 2)]),
+            'fund': rnd.choice(FUNDS),
+            'children': rnd.randint(0, 4),
+        })
+    return profiles
+
+
+def _threshold_values(*thresholds):
+    return sorted({value + delta for value in thresholds for delta in (-1, 0, 1) if value + delta >= 0})
+
+
+def _boundary_profiles():
+    """Τιμές γύρω από κάθε όριο των κανόνων, σε όλα τα ταμεία"""
+    brackets = [RULES.first_birth_year, RULES.first_birth_year + 10]
+    ages = _threshold_values(RULES.heavy_early_age, RULES.heavy_work_age, RULES.early_age, 60, 62, 65, 67)
+    years = _threshold_values(RULES.min_insurance_years, RULES.national_pension_min_years,
+                              RULES.heavy_early_insurance_years, RULES.early_insurance_years,
+                              20, 30, RULES.max_rate_years)
+    heavy = _threshold_values(RULES.heavy_work_years, RULES.heavy_eligibility_years) + [0]
+
+    profiles = []
+    for fund, gender in itertools.product(FUNDS, GENDERS):
+        for birth_year in _threshold_values(*brackets):
+            for current_age in ages:
+                profiles.append(_profile(fund=fund, gender=gender, birth_year=birth_year,
+                                         current_age=current_age))
+        for insurance_years in years:
+            for heavy_work_years in heavy:
+                profiles.append(_profile(fund=fund, gender=gender, insurance_years=insurance_years,
+                                         heavy_work_years=heavy_work_years, current_age=56))
+        for salary in (0.0, 0.01, 999.99, 1000.0, 1600.0):
+            for children in (0, 1, 3):
+                profiles.append(_profile(fund=fund, gender=gender, salary=salary, children=children))
+    return profiles
+
+
+@pytest.fixture(params=[True, False], ids=['numpy', 'scalar'])
+def batch_backend(request, monkeypatch):
+    if request.param and not available('numpy'):
+        pytest.skip('numpy not available')
+    if not request.param:
+        monkeypatch.setattr(pension_batch, 'available', lambda *names: False)
+    return request.param
+
+
+@pytest.mark.parametrize('seed', [1, 2, 3])
+def test_random_profiles_match_scalar(batch_backend, seed):
+    assert compare_with_scalar(_random_profiles(seed, 500)) == []
+
+
+def test_boundary_profiles_match_scalar(batch_backend):
+    profiles = _boundary_profiles()
+    assert len(profiles) > 1000
+    assert compare_with_scalar(profiles) == []
+
+
+def test_string_inputs_match_scalar(batch_backend):
+    """Προφίλ από CSV: όλες οι τιμές ως κείμενο"""
+    profiles = [{key: str(value) for key, value in profile.items()} for profile in _random_profiles(4, 100)]
+    assert compare_with_scalar(profiles) == []
+
+
+def test_every_field_matches_scalar(batch_backend):
+    profiles = _random_profiles(5, 50) + _boundary_profiles()[:50]
+    for profile, batch_result in zip(profiles, calculate_pension_batch(profiles)):
+        assert batch_result == calculate_greek_pension(profile)
+
+
+def test_insurance_history_matches_scalar(batch_backend):
+    history = [{'year': year, 'month': month, 'days': 25, 'earnings': 1500.0 + year}
+               for year in range(1995, 2024) for month in (1, 7)]
+    profiles = [_profile(insurance_history=history), _profile(insurance_history=[])]
+    results = calculate_pension_batch(profiles)
+    assert results[0] == calculate_greek_pension(profiles[0])
+    assert results[0]['insurance_history'] == calculate_greek_pension(profiles[0])['insurance_history']
+    assert results[1] == calculate_greek_pension(profiles[1])
+
+
+def test_invalid_profiles_keep_position(batch_backend):
+    profiles = [_profile(), {'gender': 'male'}, _profile(salary='όχι αριθμός'), _profile(children=2)]
+    results = calculate_pension_batch(profiles)
+    assert 'error' not in results[0] and 'error' not in results[3]
+    assert 'error' in results[1] and 'error' in results[2]
+    assert results[3] == calculate_greek_pension(profiles[3])
+
+
+def test_empty_batch():
+    assert calculate_pension_batch([]) == []
+
+
+def test_round_column_matches_round():
+    np = pytest.importorskip('numpy')
+    rnd = random.Random(6)
+    values = [0.125, 2.675, 1.005, -1.005, 0.5, -0.004, 1e12 + 0.005, 2.0 ** 40 + 0.5, 1e300,
+              float('inf'), -float('inf')]
+    values += [rnd.uniform(-1e4, 1e4) for _ in range(5000)] + [rnd.randint(0, 10 ** 6) / 1000 for _ in range(5000)]
+    for digits in (1, 2):
+        assert pension_batch._round_column(np.array(values), digits) == [round(value, digits) for value in values]
+
+
+def test_huge_integers_fall_back_to_scalar(batch_backend):
+    profiles = [_profile(), _profile(children=2 ** 70)]
+    assert compare_with_scalar(profiles) == []
+
+
+def test_invalid_history_keeps_position(batch_backend):
+    history = [{'year': 2000, 'month': 1, 'days': 25, 'earnings': 1500.0}]
+    profiles = [_profile(insurance_history=history), _profile(insurance_history='%%%'), _profile(children=1)]
+    results = calculate_pension_batch(profiles)
+    assert 'error' in results[1]
+    assert results[0] == calculate_greek_pension(profiles[0])
+    assert results[2] == calculate_greek_pension(profiles[2])
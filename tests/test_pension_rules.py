@@ -0,0 +1,79 @@
+"""Κανόνες σύνταξης compiled σε πίνακες lookup: ίδια αποτελέσματα με τους αρχικούς
+κανόνες (dict + sort σε κάθε κλήση) και νέα ετικέτα όταν αλλάζουν οι πίνακες."""
+import copy
+import json
+
+import pytest
+
+from pension_rules import RULES, RULES_PATH, PensionRules
+
+ORIGINAL_FUND_RATES = {
+    'ika': {40: 0.80, 35: 0.70, 30: 0.60, 25: 0.50, 20: 0.45, 15: 0.40},
+    'efka': {40: 0.80, 35: 0.70, 30: 0.60, 25: 0.50, 20: 0.45, 15: 0.40},
+    'oaee': {40: 0.65, 35: 0.55, 30: 0.45, 25: 0.40, 20: 0.35, 15: 0.30},
+    'etaa': {40: 0.70, 35: 0.60, 30: 0.50, 25: 0.45, 20: 0.40, 15: 0.35},
+    'other': {40: 0.75, 35: 0.65, 30: 0.55, 25: 0.45, 20: 0.40, 15: 0.35},
+}
+
+
+def original_replacement_rate(insurance_years, fund):
+    rates = ORIGINAL_FUND_RATES.get(fund, ORIGINAL_FUND_RATES['ika'])
+    for years_threshold, rate in sorted(rates.items(), reverse=True):
+        if insurance_years >= years_threshold:
+            return rate
+    return 0.25
+
+
+def original_retirement_age(birth_year, gender, heavy_work_years):
+    if heavy_work_years >= 15:
+        return 58
+    if birth_year <= 1955:
+        return 65 if gender == 'male' else 60
+    elif birth_year <= 1965:
+        return 67 if gender == 'male' else 62
+    else:
+        return 67
+
+
+def _config():
+    with open(RULES_PATH, encoding='utf-8') as f:
+        return json.load(f)
+
+
+@pytest.mark.parametrize('fund', sorted(ORIGINAL_FUND_RATES) + ['άγνωστο'])
+def test_replacement_rate_matches_original(fund):
+    for insurance_years in [-3, -0.5] + list(range(0, 61)) + [14.9, 15.0, 34.99, 40.5, 1000]:
+        assert RULES.replacement_rate(insurance_years, fund) == original_replacement_rate(insurance_years, fund)
+
+
+def test_retirement_age_matches_original():
+    for birth_year in range(1900, 2031):
+        for gender in ('male', 'female', 'other'):
+            for heavy_work_years in (0, 14, 15, 30):
+                assert RULES.retirement_age(birth_year, gender, heavy_work_years) == \
+                    original_retirement_age(birth_year, gender, heavy_work_years)
+
+
+def test_arrays_match_tables():
+    np = pytest.importorskip('numpy')
+    assert np.array_equal(RULES.arrays['rates'], np.array(RULES.rate_tables))
+    assert np.array_equal(RULES.arrays['ages'], np.array(RULES.age_tables))
+
+
+def test_changed_rate_changes_table_and_tag():
+    config = _config()
+    changed = copy.deepcopy(config)
+    changed['replacement_rates']['funds']['oaee']['40'] = 0.7
+    rules = PensionRules(changed)
+    assert rules.replacement_rate(42, 'oaee') == 0.7
+    assert rules.replacement_rate(39, 'oaee') == RULES.replacement_rate(39, 'oaee')
+    # Ίδιο 'version', διαφορετικοί πίνακες: διαφορετική ετικέτα για το rules-backfill
+    assert rules.version == RULES.version and rules.tag != RULES.tag
+    assert PensionRules(config).tag == RULES.tag
+
+
+def test_incomplete_config_is_rejected():
+    config = _config()
+    del config['eligibility']['early_age']
+    with pytest.raises(KeyError):
+        PensionRules(config)
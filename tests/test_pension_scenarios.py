@@ -0,0 +1,70 @@
+"""Σενάρια "τι θα γινόταν αν": πλέγμα τιμών, ίδια αποτελέσματα με τον υπολογισμό
+ανά προφίλ και όρια στο μέγεθος του πλέγματος."""
+import pytest
+
+from config import Config
+from pension_calculator import calculate_greek_pension
+from pension_scenarios import build_scenario_grid, run_scenarios
+
+BASE = {
+    'gender': 'female', 'birth_year': 1965, 'current_age': 60, 'insurance_years': 28,
+    'heavy_work_years': 0, 'salary': 1300.0, 'fund': 'ika', 'children': 1,
+}
+
+
+def test_grid_is_cartesian_product_in_order():
+    grid = build_scenario_grid({'salary': {'start': 800, 'stop': 1000, 'step': 100}, 'children': [0, 2]})
+    assert grid == [{'salary': s, 'children': c} for s in (800.0, 900.0, 1000.0) for c in (0, 2)]
+
+
+def test_decimal_steps_do_not_drift():
+    grid = build_scenario_grid({'salary': {'start': 800, 'stop': 801, 'step': 0.1}})
+    assert [point['salary'] for point in grid] == [round(800 + i / 10, 2) for i in range(11)]
+
+
+def test_each_scenario_matches_single_calculation():
+    results = run_scenarios(BASE, {'salary': [900, 2500], 'retirement_age': [62, 67]})
+    assert len(results) == 4
+    for result in results:
+        scenario = result.pop('scenario')
+        extra = scenario['retirement_age'] - BASE['current_age']
+        profile = dict(BASE, salary=scenario['salary'], current_age=scenario['retirement_age'],
+                       insurance_years=BASE['insurance_years'] + extra)
+        assert result == calculate_greek_pension(profile)
+
+
+def test_past_retirement_age_is_a_point_error():
+    results = run_scenarios(BASE, {'retirement_age': [58, 65]})
+    assert 'error' in results[0] and results[0]['scenario'] == {'retirement_age': 58}
+    assert 'error' not in results[1]
+
+
+@pytest.mark.parametrize('sweep', [
+    {},
+    {'age': [60]},
+    {'salary': {'start': 1000, 'stop': 900, 'step': 100}},
+    {'salary': {'start': 800, 'stop': 900, 'step': 0}},
+])
+def test_invalid_sweeps(sweep):
+    with pytest.raises(ValueError):
+        build_scenario_grid(sweep)
+
+
+def test_grid_size_limit(monkeypatch):
+    monkeypatch.setattr(Config, 'SCENARIO_MAX_POINTS', 20)
+    assert len(build_scenario_grid({'children': list(range(4)), 'salary': list(range(5))})) == 20
+    with pytest.raises(ValueError):
+        build_scenario_grid({'children': list(range(3)), 'salary': list(range(7))})
+    with pytest.raises(ValueError):
+        build_scenario_grid({'salary': {'start': 0, 'stop': 1000, 'step': 1}})
+
+
+def test_endpoint_rejects_oversized_sweep(monkeypatch):
+    from app import app
+
+    monkeypatch.setattr(Config, 'SCENARIO_MAX_POINTS', 5)
+    client = app.test_client()
+    response = client.post('/scenarios', json={'profile': BASE, 'sweep': {'children': list(range(6))}})
+    assert response.status_code == 400 and 'error' in response.get_json()
+    response = client.post('/scenarios', json={'profile': BASE, 'sweep': {'children': [0, 2]}})
+    assert response.get_json()['count'] == 2
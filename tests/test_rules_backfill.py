@@ -0,0 +1,93 @@
+"""Επανυπολογισμός μετά από αλλαγή κανόνων: σε chunks, με συνέχεια μετά από
+διακοπή και επανάληψη των γραμμών που απέτυχαν."""
+import pytest
+
+import rules_backfill
+from calculation_store import STORAGE_INPUTS, CalculationStore
+from database import Database
+from migrations import migrate
+from pension_calculator import calculate_greek_pension
+from rules_backfill import BACKFILL_DONE, BACKFILL_RUNNING, RulesBackfill
+
+TAG = 'test-rules-2'
+
+
+def _profile(index):
+    return {
+        'gender': 'male' if index % 2 else 'female', 'birth_year': 1958 + index % 10,
+        'current_age': 60 + index % 8, 'insurance_years': 20 + index % 15, 'heavy_work_years': 0,
+        'salary': 900.0 + 50 * index, 'fund': 'ika', 'children': index % 3,
+    }
+
+
+@pytest.fixture
+def db(tmp_path):
+    database = Database(f"sqlite:///{tmp_path / 'backfill.db'}")
+    migrate(database)
+    store = CalculationStore(database)
+    for index in range(10):
+        store.save(1, calculate_greek_pension(_profile(index)))
+    # Παράγωγα πεδία «παλιών κανόνων», που ο επανυπολογισμός πρέπει να διορθώσει
+    database.execute('UPDATE calculations SET total_pension = 0, basic_pension = 0')
+    yield database
+    database.close()
+
+
+def _rows(db):
+    return [dict(row) for row in db.query_all('SELECT * FROM calculations ORDER BY id')]
+
+
+def _assert_recomputed(row):
+    expected = calculate_greek_pension(row)
+    assert row['rules_version'] == TAG
+    assert (row['total_pension'], row['basic_pension']) == (expected['total_pension'], expected['basic_pension'])
+
+
+def test_full_run_recomputes_and_tags(db):
+    CalculationStore(db, STORAGE_INPUTS).save(1, _profile(11))
+    progress = []
+    state = RulesBackfill(db, TAG, chunk_size=4, pause=0).run(progress.append)
+    assert state['status'] == BACKFILL_DONE
+    assert (state['total'], state['processed'], state['updated'], state['errors']) == (11, 11, 11, 0)
+    assert [step['last_id'] for step in progress] == [4, 8, 11, 11]
+    rows = _rows(db)
+    for row in rows[:10]:
+        _assert_recomputed(row)
+    assert rows[10]['rules_version'] == TAG and rows[10]['total_pension'] is None
+
+    # Νέο πέρασμα χωρίς γραμμές με άλλη ετικέτα
+    assert RulesBackfill(db, TAG, pause=0).run()['total'] == 0
+
+
+def test_resume_after_interruption(db):
+    first = RulesBackfill(db, TAG, chunk_size=3, pause=0)
+    state = first.run_chunk(first.start())
+    assert (state['status'], state['last_id'], state['processed']) == (BACKFILL_RUNNING, 3, 3)
+
+    # Νέα διεργασία: συνεχίζει από το last_id, χωρίς να ξαναπιάσει τις πρώτες γραμμές
+    progress = []
+    state = RulesBackfill(db, TAG, chunk_size=3, pause=0).run(progress.append)
+    assert progress[0]['last_id'] == 6
+    assert (state['status'], state['processed'], state['updated'], state['total']) == (BACKFILL_DONE, 10, 10, 10)
+    for row in _rows(db):
+        _assert_recomputed(row)
+
+
+def test_failed_rows_are_retried_next_pass(db, monkeypatch):
+    calculate = rules_backfill.calculate_pension_batch
+
+    def failing(rows):
+        return [{'error': 'boom'} if row['id'] in (2, 7) else result
+                for row, result in zip(rows, calculate(rows))]
+
+    monkeypatch.setattr(rules_backfill, 'calculate_pension_batch', failing)
+    state = RulesBackfill(db, TAG, chunk_size=4, pause=0).run()
+    assert (state['status'], state['updated'], state['errors']) == (BACKFILL_DONE, 8, 2)
+    failed = [row for row in _rows(db) if row['rules_version'] != TAG]
+    assert [row['id'] for row in failed] == [2, 7] and all(row['total_pension'] == 0 for row in failed)
+
+    monkeypatch.setattr(rules_backfill, 'calculate_pension_batch', calculate)
+    state = RulesBackfill(db, TAG, chunk_size=4, pause=0).run()
+    assert (state['total'], state['processed'], state['updated'], state['errors']) == (2, 2, 2, 0)
+    for row in _rows(db):
+        _assert_recomputed(row)
@@ -0,0 +1,95 @@
+"""WriteBehindWriter: εγγραφή σε batches, επανάληψη σε σφάλμα και εγγραφή
+γραμμή-γραμμή όταν το batch αποτυγχάνει οριστικά."""
+import pytest
+
+from calculation_store import CalculationStore, WriteBehindWriter
+from database import Database
+from migrations import migrate
+from pension_calculator import calculate_greek_pension
+
+PROFILE = {
+    'gender': 'female', 'birth_year': 1963, 'current_age': 61, 'insurance_years': 30,
+    'heavy_work_years': 0, 'salary': 1250.0, 'fund': 'ika', 'children': 2,
+}
+
+
+class _FlakyStore(CalculationStore):
+    """Το save_many αποτυγχάνει τις πρώτες batch_failures φορές· το save για τους bad_users"""
+
+    def __init__(self, db, batch_failures=0, bad_users=()):
+        super().__init__(db)
+        self.batch_failures = batch_failures
+        self.bad_users = set(bad_users)
+        self.batch_calls = 0
+
+    def save_many(self, calculations):
+        self.batch_calls += 1
+        if self.batch_calls <= self.batch_failures:
+            raise RuntimeError('database is locked')
+        return super().save_many(calculations)
+
+    def save(self, user_id, pension_data):
+        if user_id in self.bad_users:
+            raise ValueError('bad row')
+        return super().save(user_id, pension_data)
+
+
+@pytest.fixture
+def db(tmp_path):
+    database = Database(f"sqlite:///{tmp_path / 'writer.db'}")
+    migrate(database)
+    yield database
+    database.close()
+
+
+def _writer(store, retries=3):
+    # Μεγάλο διάστημα: οι εγγραφές γίνονται μόνο με flush/close μέσα στο test
+    return WriteBehindWriter(store, max_batch=1000, flush_interval=60, retries=retries, retry_delay=0)
+
+
+def _user_ids(db):
+    return [row['user_id'] for row in db.query_all('SELECT user_id FROM calculations ORDER BY id')]
+
+
+def test_batch_ids_in_order(db):
+    store = _FlakyStore(db)
+    writer = _writer(store)
+    result = calculate_greek_pension(PROFILE)
+    futures = [writer.save(user_id, result) for user_id in (1, 2, 3)]
+    writer.flush()
+    assert [future.result(timeout=1) for future in futures] == [1, 2, 3]
+    assert store.batch_calls == 1 and _user_ids(db) == [1, 2, 3]
+    writer.close()
+
+
+def test_transient_failure_is_retried_without_duplicates(db):
+    store = _FlakyStore(db, batch_failures=2)
+    writer = _writer(store)
+    futures = [writer.save(user_id, calculate_greek_pension(PROFILE)) for user_id in (1, 2)]
+    writer.flush()
+    assert [future.result(timeout=1) for future in futures] == [1, 2]
+    assert store.batch_calls == 3 and _user_ids(db) == [1, 2]
+    writer.close()
+
+
+def test_bad_row_does_not_lose_the_others(db):
+    store = _FlakyStore(db, batch_failures=10, bad_users={2})
+    writer = _writer(store, retries=2)
+    futures = [writer.save(user_id, calculate_greek_pension(PROFILE)) for user_id in (1, 2, 3)]
+    writer.flush()
+    assert store.batch_calls == 2
+    assert futures[0].result(timeout=1) == 1 and futures[2].result(timeout=1) == 2
+    with pytest.raises(ValueError):
+        futures[1].result(timeout=1)
+    assert _user_ids(db) == [1, 3]
+    writer.close()
+
+
+def test_close_writes_pending_and_later_saves_directly(db):
+    writer = _writer(CalculationStore(db))
+    pending = writer.save(1, calculate_greek_pension(PROFILE))
+    writer.close()
+    assert pending.result(timeout=1) == 1
+    after = writer.save(2, calculate_greek_pension(PROFILE))
+    assert after.done() and after.result() == 2
+    assert _user_ids(db) == [1, 2]